@@ -1,24 +1,136 @@
+import importlib
+import threading
+
+import click
 from flask import Flask
-from flask_migrate import Migrate
+from flask.cli import ScriptInfo
 
 from .config import Config
-from .extensions import db, ma, jwt
-from .auth.views import auth_bp
-from .events.views import events_bp
-from flask_cors import CORS
+from .extensions import db, ma, jwt, admission
+
+# (module, blueprint, url prefix); modules are imported on the first request, see ``BlueprintLoader``.
+BLUEPRINTS = (
+    ('backend.auth.views', 'auth_bp', '/auth'),
+    ('backend.events.views', 'events_bp', '/events'),
+    ('backend.archive.views', 'archive_bp', '/archive'),
+    ('backend.batch.views', 'batch_bp', '/batch'),
+    ('backend.jobs.views', 'jobs_bp', '/jobs'),
+    ('backend.checkin.views', 'checkin_bp', '/checkin'),
+    ('backend.notifications.views', 'notifications_bp', '/notifications'),
+    ('backend.dedupe.views', 'dedupe_bp', '/dedupe'),
+    ('backend.forecasting.views', 'forecasting_bp', '/forecasting'),
+    ('backend.feeds.views', 'feeds_bp', '/feeds'),
+)
+
+# (command, module, group, help); a module is imported once a command of its group is looked up.
+CLI_GROUPS = (
+    ('archive', 'backend.archive.cli', 'archive_cli', 'Move finished events out of the hot tables.'),
+    ('jobs', 'backend.jobs.worker', 'jobs_cli', 'Background job workers.'),
+    ('shards', 'backend.sharding.cli', 'shards_cli', 'Event data shards.'),
+    ('dedupe', 'backend.dedupe.cli', 'dedupe_cli', 'Duplicate participants.'),
+    ('forecast', 'backend.forecasting.cli', 'forecast_cli', 'Catering forecasts.'),
+)
+
+
+def _load(module_name, attribute):
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+class LazyGroup(click.Group):
+    """
+    A command group whose commands are those of ``attribute`` in ``module_name``, which is only imported
+    once a command of the group is looked up, so other commands and web workers never load it.
+    """
+
+    def __init__(self, name, module_name, attribute, **kwargs):
+        super().__init__(name, **kwargs)
+        self.module_name = module_name
+        self.attribute = attribute
+
+    def _commands(self, ctx):
+        return _load(self.module_name, self.attribute)
+
+    def list_commands(self, ctx):
+        return self._commands(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, cmd_name):
+        return self._commands(ctx).get_command(ctx, cmd_name)
+
+
+class MigrateGroup(LazyGroup):
+    """
+    The ``flask db`` command group. Flask-Migrate, and with it Alembic, is only imported once a ``db``
+    command is actually looked up, so web workers, job workers and tests never load it.
+    """
+
+    def __init__(self):
+        super().__init__('db', 'flask_migrate.cli', 'db', help='Perform database migrations.')
+
+    def _commands(self, ctx):
+        from flask_migrate import Migrate
+
+        app = ctx.ensure_object(ScriptInfo).load_app()
+        if 'migrate' not in app.extensions:
+            Migrate(app, db)
+        return super()._commands(ctx)
+
+
+class BlueprintLoader:
+    """
+    Wraps ``app.wsgi_app``: the first request imports the view modules and registers their blueprints, so
+    processes that never serve a request (CLI commands, job workers) do not import them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if not self.loaded:
+                for module_name, blueprint, url_prefix in BLUEPRINTS:
+                    self.app.register_blueprint(_load(module_name, blueprint), url_prefix=url_prefix)
+                self.loaded = True
+
+    def __call__(self, environ, start_response):
+        if not self.loaded:
+            self.load()
+        return self.wsgi_app(environ, start_response)
+
+
+def create_app(config=Config):
+    """
+    Creates and configures the Flask application. Logging is left to the process entry point
+    (``backend.wsgi``).
+
+    Args:
+        config: Configuration object or class, ``Config`` by default.
+
+    Returns:
+        Flask: The application.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)
+
+    db.init_app(app)
+    ma.init_app(app)
+    jwt.init_app(app)
+    admission.init_app(app)
+
+    from backend.checkin.roster import checkin_writer
 
+    checkin_writer.init_app(app)
 
-app = Flask(__name__)
-app.config.from_object(Config)
+    from flask_cors import CORS
 
-db.init_app(app)
-ma.init_app(app)
-jwt.init_app(app)
-migrate = Migrate(app, db)
-CORS(app, supports_credentials=True, origins="http://localhost:3000", allow_headers=["Authorization", "Content-Type"])
+    CORS(app, supports_credentials=True, origins="http://localhost:3000",
+         allow_headers=["Authorization", "Content-Type"])
 
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(events_bp, url_prefix='/events')
+    app.wsgi_app = BlueprintLoader(app)
+    for name, module_name, group, help_text in CLI_GROUPS:
+        app.cli.add_command(LazyGroup(name, module_name, group, help=help_text))
+    app.cli.add_command(MigrateGroup())
 
-if __name__ == '__main__':
-    app.run(debug=True)
+    return app
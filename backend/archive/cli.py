@@ -0,0 +1,57 @@
+import logging
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from backend.extensions import db
+from backend.forecasting.history import refresh_history
+from backend.sharding.routing import shard_names, sharding_enabled, use_shard
+from backend.util.db import commit_section
+from .db_utils import archive_events, get_finished_event_ids
+from .export import export_year
+
+logger = logging.getLogger(__name__)
+
+archive_cli = AppGroup('archive', help='Move finished events out of the hot tables.')
+
+
+@archive_cli.command('run')
+@click.option('--older-than-days', type=int, default=None, help='Archive events that ended this many days ago.')
+@click.option('--batch-size', type=int, default=500, help='Events moved per transaction.')
+def run_archive(older_than_days, batch_size):
+    """Move finished events and their rows into the archive tables, on every shard."""
+    if older_than_days is None:
+        older_than_days = current_app.config['ARCHIVE_AFTER_DAYS']
+    before = datetime.utcnow() - timedelta(days=older_than_days)
+
+    total = 0
+    for shard in shard_names():
+        while True:
+            use_shard(shard)
+            event_ids = get_finished_event_ids(before, batch_size)
+            db.session.commit()
+            if not event_ids:
+                break
+
+            # The move locks keep a concurrent ``flask shards move`` from copying half archived events.
+            use_shard(shard, event_ids if sharding_enabled() else ())
+            with commit_section():
+                moved = archive_events(event_ids)
+            total += len(event_ids)
+            logger.info("Archived %d events on shard %s: %s", len(event_ids), shard, moved)
+
+    click.echo(f'Archived {total} events that ended before {before.isoformat()}')
+
+
+@archive_cli.command('export')
+@click.argument('year', type=int)
+@click.option('--purge', is_flag=True, help='Delete exported rows from the archive tables.')
+def run_export(year, purge):
+    """Export archived events of YEAR to Parquet files."""
+    if purge:
+        # The catering history has to learn from the rows before they only exist in the files.
+        refresh_history()
+    exported = export_year(year, purge=purge)
+    click.echo(f'Exported {year}: {exported}')
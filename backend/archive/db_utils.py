@@ -0,0 +1,61 @@
+from sqlalchemy import delete, func, insert, select
+
+from backend.extensions import db
+from backend.events.models import Event, EventParticipant, MealsOnEvent, ParticipantMealsOnEvent
+from .models import ArchivedEvent, ArchivedEventParticipant, ArchivedMealsOnEvent, ArchivedParticipantMealsOnEvent
+
+
+def get_finished_event_ids(before, limit):
+    """
+    Returns ids of non-template events that ended before the given (naive UTC) timestamp.
+    """
+    return db.session.scalars(
+        select(Event.id)
+        .where(func.upper(Event.period) < before, Event.is_template.is_(False))
+        .order_by(Event.id)
+        .limit(limit)
+    ).all()
+
+
+def archive_events(event_ids):
+    """
+    Moves events and all their rows from the hot tables into the archive tables.
+
+    Every table is moved with a single ``DELETE ... RETURNING`` feeding an ``INSERT ... SELECT``,
+    children first. Must be called inside a ``commit_section`` so the move is atomic.
+
+    Returns:
+        dict: Number of moved rows per hot table.
+    """
+    meal_ids = select(MealsOnEvent.id).where(MealsOnEvent.event_id.in_(event_ids))
+
+    return {
+        'participant_meals_on_event': _move(
+            ParticipantMealsOnEvent, ArchivedParticipantMealsOnEvent,
+            ParticipantMealsOnEvent.meal_id.in_(meal_ids),
+            event_id=(
+                select(MealsOnEvent.event_id)
+                .where(MealsOnEvent.id == ParticipantMealsOnEvent.meal_id)
+                .scalar_subquery()
+            ),
+        ),
+        'meals_on_event': _move(MealsOnEvent, ArchivedMealsOnEvent, MealsOnEvent.event_id.in_(event_ids)),
+        'event_participants': _move(
+            EventParticipant, ArchivedEventParticipant, EventParticipant.event_id.in_(event_ids)
+        ),
+        'events': _move(Event, ArchivedEvent, Event.id.in_(event_ids)),
+    }
+
+
+def _move(model, archive_model, criteria, **computed):
+    columns = [column.name for column in archive_model.__table__.columns if column.name != 'archived_at']
+    returning = [
+        computed[name].label(name) if name in computed else model.__table__.c[name]
+        for name in columns
+    ]
+
+    moved = delete(model).where(criteria).returning(*returning).cte('moved')
+    stmt = insert(archive_model).from_select(columns, select(*[moved.c[name] for name in columns]))
+
+    # Without preserve_rowcount, psycopg 3 reports -1 for INSERTs.
+    return db.session.execute(stmt.execution_options(preserve_rowcount=True)).rowcount
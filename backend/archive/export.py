@@ -0,0 +1,159 @@
+"""
+Export of archived events to Parquet files, one directory per event year.
+
+``pyarrow`` is imported lazily so the web workers do not pay for it unless the archive is used.
+"""
+import os
+
+from flask import current_app
+from sqlalchemy import delete, extract, select
+
+from backend.extensions import db
+from backend.sharding.routing import shard_names, use_shard
+from backend.util.db import pipeline
+from .models import ArchivedEvent, ArchivedEventParticipant, ArchivedMealsOnEvent, ArchivedParticipantMealsOnEvent
+
+ARCHIVE_TABLES = {
+    'events': ArchivedEvent,
+    'event_participants': ArchivedEventParticipant,
+    'meals_on_event': ArchivedMealsOnEvent,
+    'participant_meals_on_event': ArchivedParticipantMealsOnEvent,
+}
+
+EXPORT_BATCH_SIZE = 10000
+
+
+def year_dir(year):
+    return os.path.join(current_app.config['ARCHIVE_DIR'], str(year))
+
+
+def archive_file(year, table_name):
+    return os.path.join(year_dir(year), f'{table_name}.parquet')
+
+
+def purge_marker(year):
+    """
+    Present once rows of ``year`` were purged from the archive tables, so its files hold rows found nowhere else.
+    """
+    return os.path.join(year_dir(year), 'PURGED')
+
+
+def list_archived_years():
+    archive_dir = current_app.config['ARCHIVE_DIR']
+    if not os.path.isdir(archive_dir):
+        return []
+
+    return sorted(
+        int(name) for name in os.listdir(archive_dir)
+        if name.isdigit() and os.path.exists(archive_file(name, 'events'))
+    )
+
+
+def _event_ids_of_year(year):
+    return select(ArchivedEvent.id).where(extract('year', ArchivedEvent.date) == year)
+
+
+def _year_criteria(model, year):
+    if model is ArchivedEvent:
+        return extract('year', ArchivedEvent.date) == year
+    return model.event_id.in_(_event_ids_of_year(year))
+
+
+def export_year(year, purge=False):
+    """
+    Writes every archived row of events dated in ``year`` to zstd-compressed Parquet files.
+
+    Files are rebuilt from the archive tables of every shard, so re-running an export is idempotent; each
+    file is written next to its target and moved into place atomically. With ``purge`` the exported rows are
+    deleted from the archive tables afterwards, leaving the files as the only copy: once a year was purged,
+    later exports keep the rows of the existing files that are no longer in the tables, and replace those
+    that are (archived later, or updated by a participant merge).
+
+    Returns:
+        dict: Number of exported rows per table.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    os.makedirs(year_dir(year), exist_ok=True)
+    merge = os.path.exists(purge_marker(year))
+    exported = {}
+
+    for table_name, model in ARCHIVE_TABLES.items():
+        columns = list(model.__table__.columns)
+        schema = pa.schema([(column.name, _arrow_type(pa, column)) for column in columns])
+        target = archive_file(year, table_name)
+        tmp_target = f'{target}.tmp'
+
+        # Sorting by event keeps each event in few row groups, so filtered reads can skip the rest.
+        order_column = ArchivedEvent.id if model is ArchivedEvent else model.event_id
+
+        rows = 0
+        exported_ids = []
+        with pq.ParquetWriter(tmp_target, schema, compression='zstd') as writer:
+            for shard in shard_names():
+                use_shard(shard)
+                result = db.session.execute(
+                    select(*columns).where(_year_criteria(model, year)).order_by(order_column),
+                    execution_options={'yield_per': EXPORT_BATCH_SIZE},
+                )
+                for partition in result.partitions():
+                    batch = pa.RecordBatch.from_pylist([row._asdict() for row in partition], schema=schema)
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+                    if merge:
+                        exported_ids.extend(batch.column('id').to_pylist())
+
+            if merge and os.path.exists(target):
+                # Purged rows only exist in the current file.
+                exported_ids = pa.array(exported_ids, type=pa.int64())
+                for batch in pq.ParquetFile(target).iter_batches(batch_size=EXPORT_BATCH_SIZE):
+                    kept = batch.filter(pc.invert(pc.is_in(batch.column('id'), value_set=exported_ids)))
+                    writer.write_batch(kept.cast(schema))
+                    rows += kept.num_rows
+        os.replace(tmp_target, target)
+        exported[table_name] = rows
+
+    if purge:
+        # Marked before deleting, so an interrupted purge is merged as well on the next export.
+        with open(purge_marker(year), 'w'):
+            pass
+        for shard in shard_names():
+            use_shard(shard)
+            with pipeline():
+                for model in reversed(ARCHIVE_TABLES.values()):
+                    db.session.execute(
+                        delete(model).where(_year_criteria(model, year)),
+                        execution_options={'synchronize_session': False},
+                    )
+            db.session.commit()
+
+    return exported
+
+
+def _arrow_type(pa, column):
+    python_type = column.type.python_type
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is str:
+        return pa.string()
+    return pa.timestamp('us')
+
+
+def read_archive(year, table_name, filters=None, columns=None):
+    """
+    Reads rows from one archived Parquet file, pushing ``filters`` down to row groups.
+
+    Returns:
+        list: Rows as dicts, or None if the year has not been exported.
+    """
+    import pyarrow.parquet as pq
+
+    path = archive_file(year, table_name)
+    if not os.path.exists(path):
+        return None
+
+    return pq.read_table(path, columns=columns, filters=filters).to_pylist()
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Integer, BigInteger, Boolean, Unicode, DateTime, UnicodeText, func
+
+from backend.util.db import CreateModifyMixin
+from backend.extensions import db
+
+
+class ArchivedMixin(CreateModifyMixin):
+    """
+    Archive rows keep their original ids and audit columns; there are no foreign keys, so hot rows
+    they pointed at (participants) may change or disappear independently.
+    """
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class ArchivedEvent(db.Model, ArchivedMixin):
+    __tablename__ = 'events_archive'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(Unicode(255), nullable=False)
+    description = Column(UnicodeText, nullable=True)
+    date = Column(DateTime, nullable=False, index=True)
+    duration = Column(Integer, nullable=False)
+    location = Column(Unicode(255), nullable=False)
+    is_template = Column(Boolean, nullable=False)
+
+
+class ArchivedEventParticipant(db.Model, ArchivedMixin):
+    __tablename__ = 'event_participants_archive'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    event_id = Column(Integer, nullable=False, index=True)
+    participant_id = Column(Integer, nullable=False)
+    days_in_event = Column(Integer, nullable=False)
+    attendance_mask = Column(BigInteger, nullable=False)
+    is_event_organizer = Column(Boolean, nullable=False)
+    checked_in_at = Column(DateTime, nullable=True)
+
+
+class ArchivedMealsOnEvent(db.Model, ArchivedMixin):
+    __tablename__ = 'meals_on_event_archive'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(Unicode(100), nullable=False)
+    meal_type = Column(Unicode(50), nullable=False)
+    is_vegetarian = Column(Boolean, nullable=False)
+    event_id = Column(Integer, nullable=False, index=True)
+
+
+class ArchivedParticipantMealsOnEvent(db.Model, ArchivedMixin):
+    __tablename__ = 'participant_meals_on_event_archive'
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    meal_id = Column(Integer, nullable=False)
+    day = Column(Integer, nullable=False)
+    participant_id = Column(Integer, nullable=False)
+    is_special_request = Column(Boolean, nullable=True)
+    # Denormalized from the meal so archived plans can be selected per event.
+    event_id = Column(Integer, nullable=False, index=True)
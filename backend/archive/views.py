@@ -0,0 +1,57 @@
+import logging
+from flask import Blueprint, jsonify
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+
+from .export import list_archived_years, read_archive
+
+logger = logging.getLogger(__name__)
+
+EVENT_LIST_COLUMNS = ['id', 'name', 'date', 'duration', 'location']
+
+
+def _dump_rows(rows):
+    return [
+        {key: value.isoformat() if hasattr(value, 'isoformat') else value for key, value in row.items()}
+        for row in rows
+    ]
+
+
+class ArchivedYearsView(MethodView):
+    @jwt_required()
+    def get(self):
+        return jsonify(list_archived_years()), 200
+
+
+class ArchivedEventsView(MethodView):
+    @jwt_required()
+    def get(self, year):
+        events = read_archive(year, 'events', columns=EVENT_LIST_COLUMNS)
+        if events is None:
+            return jsonify({"message": "Year not archived"}), 404
+
+        return jsonify(_dump_rows(sorted(events, key=lambda event: event['date']))), 200
+
+
+class ArchivedEventView(MethodView):
+    @jwt_required()
+    def get(self, year, event_id):
+        by_event = [('event_id', '=', event_id)]
+        events = read_archive(year, 'events', filters=[('id', '=', event_id)])
+        if not events:
+            return jsonify({"message": "Archived event not found"}), 404
+
+        logger.debug("Reading archived event %s from %s", event_id, year)
+        event_data = _dump_rows(events)[0]
+        event_data['participants'] = _dump_rows(read_archive(year, 'event_participants', filters=by_event))
+        event_data['meals'] = _dump_rows(read_archive(year, 'meals_on_event', filters=by_event))
+        event_data['participant_meals'] = _dump_rows(
+            read_archive(year, 'participant_meals_on_event', filters=by_event)
+        )
+        return jsonify(event_data), 200
+
+
+archive_bp = Blueprint('archive', __name__)
+archive_bp.add_url_rule('/years', view_func=ArchivedYearsView.as_view('archived_years_view'))
+archive_bp.add_url_rule('/<int:year>/events', view_func=ArchivedEventsView.as_view('archived_events_view'))
+archive_bp.add_url_rule('/<int:year>/events/<int:event_id>', view_func=ArchivedEventView.as_view('archived_event_view'))
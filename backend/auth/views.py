@@ -12,7 +12,6 @@ from .db_utils import create_user, get_user_by_filters
 from .ma_schemas import RegisterSchema, LoginSchema
 from .models import User
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -0,0 +1,15 @@
+from marshmallow import Schema, fields, validate
+
+BATCH_MAX_REQUESTS = 50
+
+
+class SubRequestSchema(Schema):
+    id = fields.String(required=True)
+    method = fields.String(load_default='GET', validate=validate.OneOf(['GET']))
+    path = fields.String(required=True)
+
+
+class BatchSchema(Schema):
+    requests = fields.List(
+        fields.Nested(SubRequestSchema()), required=True, validate=validate.Length(min=1, max=BATCH_MAX_REQUESTS)
+    )
@@ -0,0 +1,113 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from flask import Blueprint, jsonify, current_app, request
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+from sqlalchemy import text
+from werkzeug.exceptions import HTTPException
+
+from backend.extensions import db
+from backend.sharding.routing import shard_engine, shard_names, shard_of, use_shard
+from backend.sharding.session import DEFAULT_SHARD
+from backend.util.db import pin_transaction
+from backend.util.jwt import get_verified_jwt, use_verified_jwt
+from backend.util.ma_validation import validate_request
+from .ma_schemas import BatchSchema
+
+logger = logging.getLogger(__name__)
+
+BATCHABLE_BLUEPRINTS = ('events',)
+SNAPSHOT_ID_RE = re.compile(r'^[0-9A-F-]+$')
+
+
+def _begin_snapshot_transaction(snapshot_id=None, shard=DEFAULT_SHARD):
+    """
+    Starts the session's transaction on a shard as ``REPEATABLE READ READ ONLY``, optionally importing a
+    snapshot exported by another transaction so both see exactly the same data.
+    """
+    bind_arguments = {'bind': shard_engine(shard)}
+    db.session.connection(
+        bind_arguments=bind_arguments,
+        execution_options={'isolation_level': 'REPEATABLE READ', 'postgresql_readonly': True},
+    )
+    if snapshot_id is not None:
+        db.session.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"), bind_arguments=bind_arguments)
+    pin_transaction()
+
+
+def _export_snapshot(shard):
+    _begin_snapshot_transaction(shard=shard)
+    snapshot_id = db.session.execute(
+        text('SELECT pg_export_snapshot()'), bind_arguments={'bind': shard_engine(shard)}
+    ).scalar()
+    if not SNAPSHOT_ID_RE.match(snapshot_id):
+        raise ValueError(f'Unexpected snapshot id: {snapshot_id}')
+    return snapshot_id
+
+
+def _dispatch(app, sub_request, verified_jwt, snapshots):
+    """
+    Runs one sub-request through its ``events_bp`` view in a fresh request context, reading the snapshot
+    of the primary and of the shard its event is on. It runs as the batch's already verified token.
+    """
+    url = urlsplit(sub_request['path'])
+    with app.test_request_context(url.path, method=sub_request['method'], query_string=url.query):
+        use_verified_jwt(verified_jwt)
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            if request.blueprint not in BATCHABLE_BLUEPRINTS:
+                return {"id": sub_request['id'], "status": 404, "body": {"message": "Not batchable"}}
+
+            event_id = request.view_args.get('event_id')
+            shard = DEFAULT_SHARD if event_id is None else shard_of(event_id)
+            use_shard(shard)
+            for snapshot_shard in dict.fromkeys([DEFAULT_SHARD, shard]):
+                _begin_snapshot_transaction(snapshots[snapshot_shard], snapshot_shard)
+            view = app.view_functions[request.url_rule.endpoint]
+            response = app.make_response(app.ensure_sync(view)(**request.view_args))
+        except HTTPException as err:
+            return {"id": sub_request['id'], "status": err.code, "body": {"message": err.description}}
+        except Exception:
+            logger.exception("Batch sub-request %s failed", sub_request['id'])
+            return {"id": sub_request['id'], "status": 500, "body": {"message": "Internal server error"}}
+
+        return {"id": sub_request['id'], "status": response.status_code, "body": response.get_json()}
+
+
+class BatchView(MethodView):
+    @jwt_required()
+    @validate_request(BatchSchema())
+    def post(self, param):
+        """
+        Runs up to ``BATCH_MAX_REQUESTS`` GET requests against the events API in one round trip.
+
+        All sub-requests read from one exported snapshot, so they see a consistent state of the
+        database even when they run concurrently on separate pooled connections. With shards there is one
+        snapshot per shard, taken one after the other; sub-requests that read all shards (the event lists)
+        read them outside the snapshots. The token is verified once, here, and the sub-requests run as it.
+        """
+        app = current_app._get_current_object()
+        sub_requests = param['requests']
+        verified_jwt = get_verified_jwt()
+        logger.debug("Running batch of %d requests", len(sub_requests))
+
+        # The exporting transactions must stay open until every worker has imported the snapshots.
+        try:
+            snapshots = {shard: _export_snapshot(shard) for shard in shard_names()}
+            workers = min(app.config['BATCH_MAX_WORKERS'], len(sub_requests))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                responses = list(executor.map(
+                    lambda sub_request: _dispatch(app, sub_request, verified_jwt, snapshots), sub_requests
+                ))
+        finally:
+            db.session.rollback()
+
+        return jsonify({"responses": responses}), 200
+
+
+batch_bp = Blueprint('batch', __name__)
+batch_bp.add_url_rule('', view_func=BatchView.as_view('batch_view'))
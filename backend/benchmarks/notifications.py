@@ -0,0 +1,102 @@
+"""
+Throughput of the notification sender against a local SMTP stand-in.
+
+Starts a minimal SMTP server on a free local port that accepts and counts every message, then sends
+personalized notifications to fake recipients through ``SMTPPool`` in batches, the way the fan-out job
+does (without the database):
+
+    python -m backend.benchmarks.notifications --recipients 50000 --connections 4
+"""
+import argparse
+import socket
+import socketserver
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+
+from backend.notifications.jobs import _send
+from backend.notifications.rendering import render_event_template
+from backend.notifications.smtp import SMTPPool
+
+Recipient = namedtuple('Recipient', 'participant_id email first_name last_name days_in_event meal_count')
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.received = 0
+        self.lock = threading.Lock()
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 localhost stand-in')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command in (b'EHLO', b'HELO'):
+                self.reply('250 localhost')
+            elif command == b'DATA':
+                self.reply('354 end with <CRLF>.<CRLF>')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                with self.server.lock:
+                    self.server.received += 1
+                self.reply('250 queued')
+            elif command == b'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, default=10000)
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=200)
+    args = parser.parse_args()
+
+    server = SMTPStandIn()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    event = SimpleNamespace(name='Summer Camp', date=datetime(2026, 7, 1, 9), location='Lake $ide', duration=5)
+    meals = [SimpleNamespace(name='Pasta', meal_type='lunch', is_vegetarian=True)]
+    template = render_event_template('meal_plan_confirmation', 'events@localhost', event=event, meals=meals)
+    recipients = [
+        Recipient(i, f'participant{i}@example.com', f'First{i}', f'Last{i}', 3, 9)
+        for i in range(args.recipients)
+    ]
+    batches = [recipients[i:i + args.batch_size] for i in range(0, len(recipients), args.batch_size)]
+
+    pool = SMTPPool('127.0.0.1', server.server_address[1], args.connections)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        outcomes = [outcome for batch in executor.map(lambda b: _send(pool, template, b), batches) for outcome in batch]
+    elapsed = time.perf_counter() - started
+    pool.close()
+    server.shutdown()
+
+    failed = sum(1 for _, error in outcomes if error)
+    print(f'{len(outcomes)} notifications over {args.connections} connections in {elapsed:.2f} s '
+          f'({len(outcomes) / elapsed:.0f}/s), {failed} failed, {server.received} received')
+    assert server.received == len(outcomes) - failed
+
+
+if __name__ == '__main__':
+    main()
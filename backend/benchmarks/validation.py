@@ -0,0 +1,44 @@
+"""
+Microbenchmark of request validation on meal-plan payloads.
+
+Compares a plain ``schema.load`` with the compiled loader used by ``validate_request``:
+
+    python -m backend.benchmarks.validation --items 1000
+"""
+import argparse
+import timeit
+
+from backend.events.ma_schemas import ParticipantListOfMealsOnEventSchema
+from backend.util.ma_compiled import compile_schema
+
+
+def meals_payload(items):
+    return {
+        "meals": [
+            {"meal_id": item % 7 + 1, "day": item % 5 + 1, "participant_id": 42, "is_special_request": item % 3 == 0}
+            for item in range(items)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    schema = ParticipantListOfMealsOnEventSchema()
+    compiled = compile_schema(schema)
+    payload = meals_payload(args.items)
+    assert compiled(payload) == schema.load(payload)
+
+    marshmallow_time = min(timeit.repeat(lambda: schema.load(payload), number=args.repeat, repeat=3)) / args.repeat
+    compiled_time = min(timeit.repeat(lambda: compiled(payload), number=args.repeat, repeat=3)) / args.repeat
+
+    print(f'{args.items} meal items')
+    print(f'  schema.load: {marshmallow_time * 1000:8.3f} ms')
+    print(f'  compiled:    {compiled_time * 1000:8.3f} ms  ({marshmallow_time / compiled_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
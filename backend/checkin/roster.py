@@ -0,0 +1,284 @@
+"""
+In-memory check-in state of a worker process.
+
+``RosterIndex`` keeps, per event, the enrolment ids and who has checked in. It is warmed with one narrow
+query on first use, then kept current incrementally: this worker's own check-ins are applied directly,
+check-ins made by other workers are pulled every ``CHECKIN_ROSTER_SYNC_SECONDS``, and the enrolment list
+is reloaded every ``CHECKIN_ROSTER_RELOAD_SECONDS`` to pick up removals. The ``CHECKIN_ROSTER_MAX_EVENTS``
+most recently used events are kept.
+
+``CheckinWriter`` persists check-in timestamps behind the request, in batches of one ``UPDATE`` per shard.
+Two workers accepting the same participant at once both answer success; the database keeps the first
+timestamp. A check-in whose write failed ``CHECKIN_WRITE_ATTEMPTS`` times is dropped and logged. Queued check-ins are written before the process exits, also when it is stopped with SIGTERM.
+"""
+import atexit
+import logging
+import queue
+import signal
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, Integer, column, select, update, values
+
+from backend.extensions import db
+from backend.events.models import EventParticipant
+from backend.sharding.routing import shard_of, use_shard
+
+logger = logging.getLogger(__name__)
+
+# Queued by ``_drain`` to wake the writer up from waiting for a batch.
+_STOP = object()
+
+
+class EventRoster:
+    def __init__(self, event_id):
+        self.event_id = event_id
+        self.enrolled = set()
+        self.checked_in = {}
+        # Held while the roster is loaded or refreshed, so only requests for this event wait for it.
+        self.lock = threading.Lock()
+        self.loaded = False
+
+    def reload(self, rows):
+        self.enrolled = {event_participant_id for event_participant_id, _ in rows}
+        self.checked_in = {
+            event_participant_id: checked_in_at for event_participant_id, checked_in_at in rows if checked_in_at
+        }
+        now = time.monotonic()
+        self.synced_at = now
+        self.reloaded_at = now
+        self.synced_db_time = datetime.utcnow()
+        self.loaded = True
+
+
+class RosterIndex:
+    def __init__(self):
+        # Least recently used first.
+        self._rosters = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _load(event_id, since=None):
+        stmt = (
+            select(EventParticipant.id, EventParticipant.checked_in_at)
+            .where(EventParticipant.event_id == event_id)
+        )
+        if since is not None:
+            stmt = stmt.where(EventParticipant.checked_in_at >= since)
+        return db.session.execute(stmt).all()
+
+    def get(self, event_id, config):
+        """
+        Returns the event's roster, loading or refreshing it when it is due.
+        """
+        with self._lock:
+            roster = self._rosters.get(event_id)
+            if roster is None:
+                roster = self._rosters[event_id] = EventRoster(event_id)
+                while len(self._rosters) > config['CHECKIN_ROSTER_MAX_EVENTS']:
+                    self._rosters.popitem(last=False)
+            else:
+                self._rosters.move_to_end(event_id)
+
+        now = time.monotonic()
+        with roster.lock:
+            if not roster.loaded:
+                # Left unloaded if this fails, so the next request tries again.
+                roster.reload(self._load(event_id))
+            elif now - roster.reloaded_at >= config['CHECKIN_ROSTER_RELOAD_SECONDS']:
+                pending = dict(roster.checked_in)
+                roster.reload(self._load(event_id))
+                # Keep check-ins accepted here that the writer has not flushed yet.
+                for event_participant_id, checked_in_at in pending.items():
+                    if event_participant_id in roster.enrolled:
+                        roster.checked_in.setdefault(event_participant_id, checked_in_at)
+            elif now - roster.synced_at >= config['CHECKIN_ROSTER_SYNC_SECONDS']:
+                # Other workers flush their check-ins with a delay, so look back a little further.
+                since = roster.synced_db_time - timedelta(seconds=config['CHECKIN_FLUSH_INTERVAL'] + 5)
+                roster.synced_db_time = datetime.utcnow()
+                for event_participant_id, checked_in_at in self._load(event_id, since):
+                    roster.checked_in.setdefault(event_participant_id, checked_in_at)
+                roster.synced_at = now
+        return roster
+
+    def is_enrolled(self, roster, event_participant_id):
+        if event_participant_id in roster.enrolled:
+            return True
+
+        # Enrolled after the roster was loaded: one point lookup, then remembered.
+        found = db.session.scalar(
+            select(EventParticipant.id).where(
+                EventParticipant.id == event_participant_id, EventParticipant.event_id == roster.event_id
+            )
+        )
+        if found is not None:
+            with roster.lock:
+                roster.enrolled.add(event_participant_id)
+        return found is not None
+
+    @staticmethod
+    def check_in(roster, event_participant_id):
+        """
+        Marks a participant as checked in.
+
+        Returns:
+            tuple: ``(accepted, checked_in_at)``; on a repeated scan ``accepted`` is False and the
+            time of the first check-in is returned.
+        """
+        with roster.lock:
+            checked_in_at = roster.checked_in.get(event_participant_id)
+            if checked_in_at is not None:
+                return False, checked_in_at
+            checked_in_at = roster.checked_in[event_participant_id] = datetime.utcnow()
+        return True, checked_in_at
+
+
+class CheckinWriter:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._app = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        """
+        Drains the queue on SIGTERM, which ends the process without running ``atexit`` handlers, then hands
+        the signal on to the handler installed before. Signal handlers can only be installed from the main
+        thread; elsewhere this does nothing.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        previous = signal.getsignal(signal.SIGTERM)
+        if previous in (signal.SIG_IGN, None):
+            return
+
+        def on_sigterm(signum, frame):
+            self._drain()
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                raise SystemExit(128 + signum)
+
+        signal.signal(signal.SIGTERM, on_sigterm)
+
+    def submit(self, app, event_id, event_participant_id, checked_in_at):
+        self._queue.put((event_id, event_participant_id, checked_in_at, 0))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._app = app
+                    self._thread = threading.Thread(
+                        target=self._run, args=(app,), daemon=True, name='checkin-writer'
+                    )
+                    self._thread.start()
+                    atexit.register(self._drain)
+
+    def _take_batch(self, max_size, timeout):
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                break
+            batch.append(item)
+        return batch
+
+    @staticmethod
+    def _write(batch):
+        by_event = defaultdict(list)
+        for event_id, event_participant_id, checked_in_at, _ in batch:
+            by_event[event_id].append((event_participant_id, checked_in_at))
+        by_shard = defaultdict(dict)
+        for event_id, rows in by_event.items():
+            by_shard[shard_of(event_id)][event_id] = rows
+
+        # A shard that fails fails the whole batch; writing a check-in twice keeps the first timestamp.
+        for shard, events in by_shard.items():
+            use_shard(shard, events)
+            checkins = values(
+                column('id', Integer), column('checked_in_at', DateTime), name='checkins'
+            ).data([row for rows in events.values() for row in rows])
+            db.session.execute(
+                update(EventParticipant)
+                .where(EventParticipant.id == checkins.c.id, EventParticipant.checked_in_at.is_(None))
+                .values(checked_in_at=checkins.c.checked_in_at, version=EventParticipant.version + 1)
+            )
+            db.session.commit()
+
+    def _write_batch(self, batch, max_attempts):
+        """
+        Writes a batch, or when that fails its check-ins one by one, so a bad row only holds back itself.
+        Check-ins that failed are queued again, and dropped once they failed ``max_attempts`` times.
+
+        Returns:
+            bool: Whether every check-in was written.
+        """
+        try:
+            self._write(batch)
+            return True
+        except Exception:
+            db.session.rollback()
+            logger.exception('Writing %d check-ins failed, writing them one by one', len(batch))
+
+        dropped = []
+        for item in batch:
+            try:
+                self._write([item])
+            except Exception:
+                db.session.rollback()
+                event_id, event_participant_id, checked_in_at, attempts = item
+                if attempts + 1 < max_attempts:
+                    self._queue.put((event_id, event_participant_id, checked_in_at, attempts + 1))
+                else:
+                    dropped.append((event_id, event_participant_id, str(checked_in_at)))
+        if dropped:
+            logger.error(
+                'Dropped %d check-ins that failed %d times (event, enrolment, time): %s',
+                len(dropped), max_attempts, dropped,
+            )
+        return False
+
+    def _run(self, app):
+        with app.app_context():
+            while not self._stopping.is_set():
+                batch = self._take_batch(app.config['CHECKIN_FLUSH_SIZE'], app.config['CHECKIN_FLUSH_INTERVAL'])
+                if not batch:
+                    continue
+                try:
+                    if not self._write_batch(batch, app.config['CHECKIN_WRITE_ATTEMPTS']):
+                        time.sleep(app.config['CHECKIN_FLUSH_INTERVAL'])
+                finally:
+                    db.session.remove()
+
+    def _drain(self):
+        # Let the writer finish the batch it is holding, then write whatever is left here. Runs on SIGTERM
+        # and again at exit, when there is nothing left.
+        if self._thread is None:
+            return
+        app = self._app
+        self._stopping.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout=app.config['CHECKIN_FLUSH_INTERVAL'] + 10)
+        batch = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                batch.append(item)
+        if batch:
+            # No later attempt: what fails now is dropped.
+            with app.app_context():
+                self._write_batch(batch, 1)
+            logger.info('Wrote %d queued check-ins before exiting', len(batch))
+
+
+roster_index = RosterIndex()
+checkin_writer = CheckinWriter()
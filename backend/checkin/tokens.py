@@ -0,0 +1,29 @@
+from flask import current_app
+from itsdangerous import URLSafeSerializer, BadSignature
+
+CHECKIN_SALT = 'event-checkin'
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CHECKIN_SALT)
+
+
+def make_checkin_token(event_id, event_participant_id):
+    """
+    Signs the enrolment ids into a compact URL-safe token, meant to be rendered as a QR code.
+    """
+    return _serializer().dumps([event_id, event_participant_id])
+
+
+def read_checkin_token(token):
+    """
+    Verifies a check-in token without touching the database.
+
+    Returns:
+        tuple: ``(event_id, event_participant_id)``, or None if the signature is invalid.
+    """
+    try:
+        event_id, event_participant_id = _serializer().loads(token)
+    except (BadSignature, TypeError, ValueError):
+        return None
+    return event_id, event_participant_id
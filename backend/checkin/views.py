@@ -0,0 +1,78 @@
+import logging
+from flask import Blueprint, jsonify, current_app
+from flask.views import MethodView
+from marshmallow import Schema, fields
+from flask_jwt_extended import jwt_required
+
+from backend.events.models import EventParticipant
+from backend.sharding.routing import handle_event_moved, route_by_event_id
+from backend.sharding.session import EventMoved
+from backend.util.ma_validation import validate_request
+from .roster import roster_index, checkin_writer
+from .tokens import make_checkin_token, read_checkin_token
+
+logger = logging.getLogger(__name__)
+
+
+class CheckinSchema(Schema):
+    token = fields.String(required=True)
+
+
+class CheckinTokenView(MethodView):
+    @jwt_required()
+    def get(self, event_id, event_participant_id):
+        EventParticipant.query.filter_by(event_id=event_id, id=event_participant_id).first_or_404()
+        return jsonify({"token": make_checkin_token(event_id, event_participant_id)}), 200
+
+
+class CheckinView(MethodView):
+    @jwt_required()
+    @validate_request(CheckinSchema())
+    def post(self, event_id, param):
+        ids = read_checkin_token(param['token'])
+        if ids is None or ids[0] != event_id:
+            return jsonify({"message": "Invalid check-in token"}), 400
+        event_participant_id = ids[1]
+
+        roster = roster_index.get(event_id, current_app.config)
+        if not roster_index.is_enrolled(roster, event_participant_id):
+            return jsonify({"message": "Participant is not enrolled in this event"}), 404
+
+        accepted, checked_in_at = roster_index.check_in(roster, event_participant_id)
+        if not accepted:
+            return jsonify({
+                "message": "Participant already checked in",
+                "event_participant_id": event_participant_id,
+                "checked_in_at": checked_in_at.isoformat()
+            }), 409
+
+        checkin_writer.submit(current_app._get_current_object(), event_id, event_participant_id, checked_in_at)
+        logger.debug("Participant %s checked in to event %s", event_participant_id, event_id)
+
+        return jsonify({
+            "message": "Checked in",
+            "event_participant_id": event_participant_id,
+            "checked_in_at": checked_in_at.isoformat(),
+            "checked_in": len(roster.checked_in)
+        }), 200
+
+
+class CheckinStatsView(MethodView):
+    @jwt_required()
+    def get(self, event_id):
+        roster = roster_index.get(event_id, current_app.config)
+        return jsonify({
+            "enrolled": len(roster.enrolled),
+            "checked_in": len(roster.checked_in)
+        }), 200
+
+
+checkin_bp = Blueprint('checkin', __name__)
+checkin_bp.url_value_preprocessor(route_by_event_id)
+checkin_bp.register_error_handler(EventMoved, handle_event_moved)
+checkin_bp.add_url_rule('/events/<int:event_id>', view_func=CheckinView.as_view('checkin_view'))
+checkin_bp.add_url_rule('/events/<int:event_id>/stats', view_func=CheckinStatsView.as_view('checkin_stats_view'))
+checkin_bp.add_url_rule(
+    '/events/<int:event_id>/participants/<int:event_participant_id>/token',
+    view_func=CheckinTokenView.as_view('checkin_token_view')
+)
@@ -4,10 +4,41 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+def _database_url(url, driver):
+    # DATABASE_URL may name any PostgreSQL driver; DB_DRIVER decides which one is used.
+    if not url or driver == 'psycopg2':
+        return url
+    _, separator, rest = url.partition('://')
+    return f'postgresql+{driver}{separator}{rest}'
+
+
+def _engine_options(driver, prepare_threshold):
+    if driver != 'psycopg':
+        return {}
+    # psycopg 3 prepares a query server side once it ran ``prepare_threshold`` times on a connection.
+    # DB_PREPARE_THRESHOLD=0 turns that off, which pgbouncer in transaction pooling mode requires.
+    return {'connect_args': {'prepare_threshold': prepare_threshold}}
+
+
+def _shard_urls(shards, driver):
+    # "name=url,name=url", in the order the shards were added.
+    urls = {}
+    for entry in filter(None, (entry.strip() for entry in (shards or '').split(','))):
+        name, _, url = entry.partition('=')
+        urls[name.strip()] = _database_url(url.strip(), driver)
+    return urls
+
+
+def _shard_binds(shards, engine_options):
+    # Flask-SQLAlchemy only applies SQLALCHEMY_ENGINE_OPTIONS to the primary database.
+    return {name: {'url': url, **engine_options} for name, url in shards.items()}
+
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'secret')
     DEBUG = os.getenv('DEBUG', 'False')
     FLASK_ENV = os.getenv('FLASK_ENV', 'production')
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
     # JWT
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'secret')
@@ -16,6 +47,87 @@ class Config:
     JWT_BLACKLIST_ENABLED = True
     JWT_BLACKLIST_TOKEN_CHECKS = ['access', 'refresh']
 
-    # Database
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
+    # Database: DB_DRIVER is 'psycopg2' or 'psycopg' (psycopg 3, with prepared statements and pipelines)
+    DB_DRIVER = os.getenv('DB_DRIVER', 'psycopg2')
+    DB_PREPARE_THRESHOLD = int(os.getenv('DB_PREPARE_THRESHOLD', 2)) or None
+    SQLALCHEMY_DATABASE_URI = _database_url(os.getenv('DATABASE_URL'), DB_DRIVER)
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(DB_DRIVER, DB_PREPARE_THRESHOLD)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Sharding: the data of each event lives on one shard, the primary database ('default') or one of
+    # DATABASE_SHARDS ("name=url,name=url"). Shards may only be appended, as a shard's position sets the
+    # offset of its id sequences (see `flask shards init`). New events go to SHARD_NEW_EVENTS, or any shard.
+    SHARDS = _shard_urls(os.getenv('DATABASE_SHARDS'), DB_DRIVER)
+    SQLALCHEMY_BINDS = _shard_binds(SHARDS, SQLALCHEMY_ENGINE_OPTIONS)
+    SHARD_NEW_EVENTS = [name for name in os.getenv('SHARD_NEW_EVENTS', '').split(',') if name]
+    SHARD_ID_STRIDE = int(os.getenv('SHARD_ID_STRIDE', 64))
+    SHARD_MOVE_GRACE_SECONDS = float(os.getenv('SHARD_MOVE_GRACE_SECONDS', 2))
+
+    # Admission control: (tokens per second, burst) per JWT identity and endpoint, concurrent requests
+    # per worker and the longest a request may wait for a slot (seconds), per route class.
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'True') == 'True'
+    RATELIMIT_STORAGE_URL = os.getenv('RATELIMIT_STORAGE_URL')
+    RATELIMIT_STORAGE_RETRY_SECONDS = 30
+    RATELIMIT_RATES = {'auth': (0.2, 5), 'write': (5, 20), 'read': (20, 60)}
+    ADMISSION_CONCURRENCY = {'auth': 2, 'write': 4, 'read': 16}
+    ADMISSION_QUEUE_BUDGET = {'auth': 2.0, 'write': 1.0, 'read': 0.5}
+
+    # Optimistic concurrency: reject writes to versioned resources without If-Match (428)
+    REQUIRE_IF_MATCH = os.getenv('REQUIRE_IF_MATCH', 'False') == 'True'
+
+    # Request validation
+    MAX_JSON_BODY_BYTES = int(os.getenv('MAX_JSON_BODY_BYTES', 2 * 1024 * 1024))
+    # Enforced by Werkzeug while reading the body, also for chunked requests without a Content-Length
+    MAX_CONTENT_LENGTH = MAX_JSON_BODY_BYTES
+    MAX_JSON_LIST_ITEMS = int(os.getenv('MAX_JSON_LIST_ITEMS', 5000))
+
+    # Archive
+    ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', os.path.join(os.path.dirname(__file__), 'instance', 'archive'))
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 30))
+
+    # Batch requests
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+
+    # Background jobs
+    JOBS_WORKER_PROCESSES = int(os.getenv('JOBS_WORKER_PROCESSES', 2))
+    # Events with more enrolments than this are deleted by a background job
+    EVENT_DELETE_SYNC_MAX_PARTICIPANTS = int(os.getenv('EVENT_DELETE_SYNC_MAX_PARTICIPANTS', 200))
+
+    # Check-in
+    CHECKIN_FLUSH_INTERVAL = float(os.getenv('CHECKIN_FLUSH_INTERVAL', 0.5))
+    CHECKIN_FLUSH_SIZE = int(os.getenv('CHECKIN_FLUSH_SIZE', 500))
+    # Writes of a check-in before it is dropped and logged
+    CHECKIN_WRITE_ATTEMPTS = int(os.getenv('CHECKIN_WRITE_ATTEMPTS', 3))
+    CHECKIN_ROSTER_SYNC_SECONDS = float(os.getenv('CHECKIN_ROSTER_SYNC_SECONDS', 2))
+    CHECKIN_ROSTER_RELOAD_SECONDS = float(os.getenv('CHECKIN_ROSTER_RELOAD_SECONDS', 60))
+    # Events whose roster a worker keeps in memory, least recently used dropped first
+    CHECKIN_ROSTER_MAX_EVENTS = int(os.getenv('CHECKIN_ROSTER_MAX_EVENTS', 1000))
+
+    # Notifications
+    SMTP_HOST = os.getenv('SMTP_HOST', 'localhost')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 25))
+    SMTP_USERNAME = os.getenv('SMTP_USERNAME')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'False') == 'True'
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'events@localhost')
+    NOTIFY_SMTP_CONNECTIONS = int(os.getenv('NOTIFY_SMTP_CONNECTIONS', 4))
+    NOTIFY_BATCH_SIZE = int(os.getenv('NOTIFY_BATCH_SIZE', 200))
+
+    # Duplicate participants: lowest match score, and rows paired within a blocking key (see backend.dedupe)
+    DEDUPE_MATCH_THRESHOLD = float(os.getenv('DEDUPE_MATCH_THRESHOLD', 0.8))
+    DEDUPE_WINDOW = int(os.getenv('DEDUPE_WINDOW', 10))
+
+    # Catering forecasts: days with rates of their own, meals of prior per rate, and the age (days) at
+    # which a past event weighs half (see backend.forecasting)
+    FORECAST_MAX_DAY = int(os.getenv('FORECAST_MAX_DAY', 7))
+    FORECAST_PRIOR_WEIGHT = float(os.getenv('FORECAST_PRIOR_WEIGHT', 50))
+    FORECAST_HALF_LIFE_DAYS = float(os.getenv('FORECAST_HALF_LIFE_DAYS', 365))
+
+    # Calendar feeds: cached in Redis (FEED_CACHE_URL) for all workers, or else per process, where writes
+    # of other processes only show after FEED_CACHE_LOCAL_SECONDS (see backend.feeds.cache)
+    FEED_CACHE_URL = os.getenv('FEED_CACHE_URL')
+    FEED_CACHE_SECONDS = int(os.getenv('FEED_CACHE_SECONDS', 86400))
+    FEED_CACHE_LOCAL_SECONDS = int(os.getenv('FEED_CACHE_LOCAL_SECONDS', 60))
+    FEED_CACHE_LOCAL_MAX_ENTRIES = int(os.getenv('FEED_CACHE_LOCAL_MAX_ENTRIES', 10000))
+    FEED_CACHE_RETRY_SECONDS = 30
+    FEED_UID_DOMAIN = os.getenv('FEED_UID_DOMAIN', 'events.localhost')
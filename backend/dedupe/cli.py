@@ -0,0 +1,29 @@
+import json
+
+import click
+from flask.cli import AppGroup
+
+from .engine import find_duplicates
+from .merge import merge_participants
+
+dedupe_cli = AppGroup('dedupe', help='Duplicate participants.')
+
+
+@dedupe_cli.command('run')
+@click.option('--threshold', type=float, help='Lowest match score (DEDUPE_MATCH_THRESHOLD).')
+@click.option('--window', type=int, help='Rows paired within a blocking key (DEDUPE_WINDOW).')
+@click.option('--merge', is_flag=True, help='Merge every cluster into its oldest participant.')
+def run_dedupe(threshold, window, merge):
+    """Find duplicate participants, printed as one JSON cluster per line, and optionally merge them."""
+    clusters = find_duplicates(threshold=threshold, window=window)
+    for cluster in clusters:
+        click.echo(json.dumps(cluster))
+    click.echo(f'{len(clusters)} clusters, {sum(len(cluster["duplicate_ids"]) for cluster in clusters)} duplicates',
+               err=True)
+
+    if merge and clusters:
+        counts = merge_participants({
+            duplicate_id: cluster['survivor_id'] for cluster in clusters for duplicate_id in cluster['duplicate_ids']
+        })
+        for table, (moved, dropped) in counts.items():
+            click.echo(f'{table}: {moved} rows moved, {dropped} duplicate rows dropped', err=True)
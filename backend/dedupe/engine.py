@@ -0,0 +1,246 @@
+"""
+Duplicate search over participants.
+
+Comparing all pairs of a million participants is out of the question, so candidates are only paired
+within blocks: participants sharing a blocking key. The normalized ``email_key`` and the phonetic
+``name_key`` are stored and indexed (kept by the ``participants_blocking_keys`` trigger, see its
+migration); the search adds one name together with the other name's initial, which survives a typo in the
+other name. Rows are loaded in name order, and within a block every row is paired with the next
+``DEDUPE_WINDOW`` rows only (sorted neighbourhood), which bounds the work in big blocks such as common names.
+
+Candidate pairs are scored with NumPy, whole arrays at a time. Names and email local parts are reduced to
+64-bit masks of their character bigrams, so a pair's similarity is the Dice coefficient of two masks, from
+popcounts. Pairs sharing an email key score ``0.5 + 0.5 * name``, others ``0.7 * name + 0.3 * email``; the
+name similarity also compares first and last names swapped.
+
+NumPy is imported lazily so the web workers only load it when duplicates are looked up.
+"""
+import logging
+import unicodedata
+from zlib import crc32
+
+from flask import current_app
+from sqlalchemy import func, or_, select
+
+from backend.extensions import db
+from backend.events.models import Participant
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 10000
+SCORE_BATCH_SIZE = 1 << 20
+
+
+class ParticipantColumns:
+    """
+    The participants to compare, as arrays indexed by row position.
+    """
+
+    def __init__(self, rows):
+        import numpy as np
+
+        ids, first, last, local, email_keys, name_keys, last_keys, first_keys = [], [], [], [], [], [], [], []
+        signatures = {}
+        for row in rows:
+            ids.append(row.id)
+            first.append(_signature(row.first_name, signatures))
+            last.append(_signature(row.last_name, signatures))
+            local.append(_signature(row.email.split('@')[0], signatures))
+            # Hashes compare like the keys and fit an integer array; 0 stands for no key.
+            email_keys.append(hash(row.email_key) if row.email_key else 0)
+            name_keys.append(hash(row.name_key) if row.name_key and row.name_key.strip() else 0)
+            # A typo in one name changes its phonetic code, so the other name and an initial block as well.
+            first_name, last_name = row.first_name.lower(), row.last_name.lower()
+            last_keys.append(hash((last_name, first_name[:1])) if last_name else 0)
+            first_keys.append(hash((first_name, last_name[:1])) if first_name else 0)
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.first = np.array(first, dtype=np.uint64)
+        self.last = np.array(last, dtype=np.uint64)
+        self.local = np.array(local, dtype=np.uint64)
+        self.email_keys = np.array(email_keys, dtype=np.int64)
+        self.blocking_keys = [
+            self.email_keys,
+            *(np.array(keys, dtype=np.int64) for keys in (name_keys, last_keys, first_keys)),
+        ]
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _signature(text, cache):
+    """
+    Mask with one of 64 bits set per character bigram of the lowercased text without accents, padded to
+    count its ends.
+    """
+    signature = cache.get(text)
+    if signature is None:
+        folded = ''.join(char for char in unicodedata.normalize('NFKD', text.lower()) if not unicodedata.combining(char))
+        padded = f' {folded} '
+        signature = 0
+        for i in range(len(padded) - 1):
+            signature |= 1 << (crc32(padded[i:i + 2].encode()) & 63)
+        cache[text] = signature
+    return signature
+
+
+def _popcount(values):
+    import numpy as np
+
+    byte_counts = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+    return byte_counts[values.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+def _dice(a, b):
+    import numpy as np
+
+    return 2 * _popcount(a & b) / np.maximum(_popcount(a) + _popcount(b), 1)
+
+
+def score_pairs(columns, left, right):
+    """
+    Scores pairs of participants.
+
+    Args:
+        columns (ParticipantColumns): The participants.
+        left (ndarray): Row positions of the first participant of every pair.
+        right (ndarray): Row positions of the second.
+
+    Returns:
+        ndarray: Scores between 0 and 1.
+    """
+    import numpy as np
+
+    name = np.maximum(
+        _dice(columns.first[left], columns.first[right]) + _dice(columns.last[left], columns.last[right]),
+        _dice(columns.first[left], columns.last[right]) + _dice(columns.last[left], columns.first[right]),
+    ) / 2
+    email = _dice(columns.local[left], columns.local[right])
+    same_email = columns.email_keys[left] == columns.email_keys[right]
+    return np.where(same_email, 0.5 + 0.5 * name, 0.7 * name + 0.3 * email)
+
+
+def _block_pairs(keys, window):
+    """
+    Yields pairs of row positions that share a key and are at most ``window`` rows apart within their block,
+    one array pair per distance.
+    """
+    import numpy as np
+
+    # Stable, so rows keep their name order within a block.
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    for distance in range(1, window + 1):
+        same = (sorted_keys[:-distance] == sorted_keys[distance:]) & (sorted_keys[distance:] != 0)
+        yield order[:-distance][same], order[distance:][same]
+
+
+def _clusters(ids, left, right, scores):
+    """
+    Groups matched pairs into connected clusters; the oldest participant (lowest id) of each survives.
+    """
+    parent = {}
+
+    def root(node):
+        while parent.get(node, node) != node:
+            parent[node] = parent.get(parent[node], parent[node])
+            node = parent[node]
+        return node
+
+    best = {}
+    for a, b, score in zip(ids[left].tolist(), ids[right].tolist(), scores.tolist()):
+        root_a, root_b = root(a), root(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+        best[a] = max(best.get(a, 0), score)
+        best[b] = max(best.get(b, 0), score)
+
+    members = {}
+    for node in best:
+        members.setdefault(root(node), []).append(node)
+    return [
+        {
+            "survivor_id": survivor,
+            "duplicate_ids": sorted(node for node in nodes if node != survivor),
+            "score": round(max(best[node] for node in nodes), 3),
+        }
+        for survivor, nodes in sorted(members.items())
+    ]
+
+
+def find_duplicates(threshold=None, window=None):
+    """
+    Searches all participants for duplicates.
+
+    Args:
+        threshold (float): Lowest score of a match, ``DEDUPE_MATCH_THRESHOLD`` by default.
+        window (int): Rows paired within a block, ``DEDUPE_WINDOW`` by default.
+
+    Returns:
+        list: Clusters as ``{"survivor_id", "duplicate_ids", "score"}`` dicts, by survivor.
+    """
+    import numpy as np
+
+    threshold = current_app.config['DEDUPE_MATCH_THRESHOLD'] if threshold is None else threshold
+    window = window or current_app.config['DEDUPE_WINDOW']
+
+    stmt = (
+        select(Participant.id, Participant.first_name, Participant.last_name, Participant.email,
+               Participant.email_key, Participant.name_key)
+        .order_by(Participant.name_key, func.lower(Participant.last_name), func.lower(Participant.first_name),
+                  Participant.id)
+    )
+    # A connection of its own: the session would keep the rows' transaction open while scoring.
+    with db.engine.connect() as connection:
+        columns = ParticipantColumns(connection.execution_options(yield_per=LOAD_BATCH_SIZE).execute(stmt))
+
+    matched = ([], [], [])
+    candidates = 0
+    for keys in columns.blocking_keys:
+        for left, right in _block_pairs(keys, window):
+            candidates += len(left)
+            for start in range(0, len(left), SCORE_BATCH_SIZE):
+                batch_left, batch_right = left[start:start + SCORE_BATCH_SIZE], right[start:start + SCORE_BATCH_SIZE]
+                scores = score_pairs(columns, batch_left, batch_right)
+                hit = scores >= threshold
+                for parts, part in zip(matched, (batch_left[hit], batch_right[hit], scores[hit])):
+                    parts.append(part)
+
+    left, right, scores = (np.concatenate(parts) if parts else np.array([]) for parts in matched)
+    clusters = _clusters(columns.ids, left.astype(np.int64), right.astype(np.int64), scores)
+    logger.info("Scored %d candidate pairs of %d participants: %d matches in %d clusters",
+                candidates, len(columns), len(scores), len(clusters))
+    return clusters
+
+
+def find_duplicates_of(participant_id, threshold=None):
+    """
+    Scores one participant against the participants sharing one of its blocking keys, found by the key
+    indexes.
+
+    Returns:
+        list: ``(participant_id, score)`` of the matches, best first.
+    """
+    threshold = current_app.config['DEDUPE_MATCH_THRESHOLD'] if threshold is None else threshold
+    keys = select(Participant.email_key, Participant.name_key).where(Participant.id == participant_id).subquery()
+    rows = db.session.execute(
+        select(Participant.id, Participant.first_name, Participant.last_name, Participant.email,
+               Participant.email_key, Participant.name_key)
+        .where(or_(
+            Participant.email_key == select(keys.c.email_key).scalar_subquery(),
+            Participant.name_key == select(keys.c.name_key).scalar_subquery(),
+        ))
+    ).all()
+
+    columns = ParticipantColumns(rows)
+    position = columns.ids.tolist().index(participant_id) if participant_id in columns.ids else None
+    if position is None:
+        return []
+
+    import numpy as np
+
+    others = np.flatnonzero(columns.ids != participant_id)
+    scores = score_pairs(columns, np.full(len(others), position), others)
+    hit = scores >= threshold
+    matches = sorted(zip(columns.ids[others][hit].tolist(), scores[hit].tolist()), key=lambda match: -match[1])
+    return [(match_id, round(score, 3)) for match_id, score in matches]
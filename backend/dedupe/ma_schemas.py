@@ -0,0 +1,7 @@
+from marshmallow import Schema, fields, validate
+
+from backend.events.ma_schemas import BULK_MAX_IDS
+
+
+class MergeParticipantsSchema(Schema):
+    duplicate_ids = fields.List(fields.Integer(), required=True, validate=validate.Length(min=1, max=BULK_MAX_IDS))
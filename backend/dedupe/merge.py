@@ -0,0 +1,125 @@
+"""
+Set-based merge of duplicate participants.
+
+Every table referencing participants is re-pointed with one ``UPDATE ... FROM`` per table, joined to the
+merge mapping sent as two array parameters, so a merge of thousands of participants costs a handful of
+statements. Rows that would collide once re-pointed (both participants enrolled in the same event, or
+planned for the same meal and day) are deleted first, keeping the survivor's own row.
+"""
+import logging
+
+from sqlalchemy import ARRAY, Integer, any_, bindparam, delete, func, or_, select, update
+
+from backend.extensions import db
+from backend.archive.models import ArchivedEventParticipant, ArchivedParticipantMealsOnEvent
+from backend.events.models import EventParticipant, Participant, ParticipantMealsOnEvent
+from backend.feeds.cache import invalidate_participant_feeds
+from backend.notifications.models import NotificationDelivery
+from backend.sharding.replication import delete_replicated_participants
+from backend.sharding.routing import scatter
+from backend.util.db import commit_section
+
+logger = logging.getLogger(__name__)
+
+# Tables re-pointed, with the columns that are unique together with the participant.
+REFERENCING_TABLES = (
+    (EventParticipant, ('event_id',)),
+    (ParticipantMealsOnEvent, ('meal_id', 'day')),
+    (NotificationDelivery, ('event_id', 'kind')),
+    (ArchivedEventParticipant, None),
+    (ArchivedParticipantMealsOnEvent, None),
+)
+
+
+def _mapping(merges):
+    duplicate_ids, survivor_ids = zip(*merges.items())
+    return select(
+        func.unnest(bindparam('duplicate_ids', list(duplicate_ids), type_=ARRAY(Integer))).label('duplicate_id'),
+        func.unnest(bindparam('survivor_ids', list(survivor_ids), type_=ARRAY(Integer))).label('survivor_id'),
+    ).subquery('merge')
+
+
+def _delete_collisions(model, group_columns, mapping):
+    # Per group, the rows of a survivor and its duplicates rank by owner, the survivor's own first.
+    owner = func.coalesce(mapping.c.survivor_id, model.participant_id)
+    ranked = (
+        select(
+            model.id,
+            func.row_number().over(
+                partition_by=[*(getattr(model, name) for name in group_columns), owner],
+                order_by=[(model.participant_id != owner), model.id],
+            ).label('rank'),
+        )
+        .outerjoin(mapping, mapping.c.duplicate_id == model.participant_id)
+        .where(or_(
+            model.participant_id.in_(select(mapping.c.duplicate_id)),
+            model.participant_id.in_(select(mapping.c.survivor_id)),
+        ))
+        .subquery()
+    )
+    return db.session.execute(
+        delete(model)
+        .where(model.id.in_(select(ranked.c.id).where(ranked.c.rank > 1)))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def _repoint(model, mapping):
+    values = {'participant_id': mapping.c.survivor_id}
+    if hasattr(model, 'version'):
+        values['version'] = model.version + 1
+    return db.session.execute(
+        update(model)
+        .where(model.participant_id == mapping.c.duplicate_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def _repoint_shard(merges):
+    counts = {}
+    with commit_section():
+        mapping = _mapping(merges)
+        for model, group_columns in REFERENCING_TABLES:
+            deleted = _delete_collisions(model, group_columns, mapping) if group_columns else 0
+            counts[model.__tablename__] = (_repoint(model, mapping), deleted)
+    return counts
+
+
+def merge_participants(merges):
+    """
+    Merges duplicate participants into their survivors: their enrolments, meal plans, notification
+    deliveries and archived rows move to the survivor, then the duplicates are deleted.
+
+    Each shard is re-pointed in one transaction, then the duplicates are deleted on the primary; a merge
+    interrupted in between is completed by running it again. Must not run while events are being moved.
+
+    Args:
+        merges (dict): Survivor id by duplicate id; no survivor may itself be a duplicate.
+
+    Returns:
+        dict: Numbers of re-pointed and of deleted colliding rows per table, summed over shards.
+    """
+    if not merges:
+        return {}
+    if set(merges) & set(merges.values()):
+        raise ValueError("Survivors cannot be merged into other participants")
+
+    counts = {}
+    for shard_counts in scatter(lambda: _repoint_shard(merges)).values():
+        for table, (repointed, deleted) in shard_counts.items():
+            total = counts.get(table, (0, 0))
+            counts[table] = (total[0] + repointed, total[1] + deleted)
+
+    duplicate_ids = list(merges)
+    with commit_section():
+        invalidate_participant_feeds(merges.keys() | set(merges.values()))
+        db.session.execute(
+            delete(Participant)
+            .where(Participant.id == any_(bindparam('duplicate_ids', duplicate_ids, type_=ARRAY(Integer))))
+            .execution_options(synchronize_session=False)
+        )
+    delete_replicated_participants(duplicate_ids)
+
+    logger.info("Merged %d participants: %s", len(merges), counts)
+    return counts
@@ -0,0 +1,64 @@
+import logging
+from flask import Blueprint, jsonify
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+
+from backend.events.ma_schemas import BULK_MAX_IDS
+from backend.events.models import Participant
+from backend.extensions import db
+from backend.util.db import read_only
+from backend.util.ma_validation import validate_request
+from .engine import find_duplicates_of
+from .ma_schemas import MergeParticipantsSchema
+from .merge import merge_participants
+
+logger = logging.getLogger(__name__)
+
+
+class ParticipantDuplicatesView(MethodView):
+    @jwt_required()
+    @read_only()
+    def get(self, participant_id):
+        Participant.query.get_or_404(participant_id)
+        return jsonify([
+            {"participant_id": duplicate_id, "score": score}
+            for duplicate_id, score in find_duplicates_of(participant_id)
+        ]), 200
+
+
+class ParticipantMergeView(MethodView):
+    @jwt_required()
+    @validate_request(MergeParticipantsSchema(), max_items=BULK_MAX_IDS)
+    def post(self, participant_id, param):
+        """
+        Merges the given participants into this one, which keeps its enrolments and meal plans and gains theirs.
+        """
+        duplicate_ids = set(param['duplicate_ids']) - {participant_id}
+        found = set(db.session.scalars(
+            select(Participant.id).where(Participant.id.in_([participant_id, *duplicate_ids]))
+        ))
+        if participant_id not in found:
+            return jsonify({"message": "Participant not found"}), 404
+        if found != {participant_id, *duplicate_ids}:
+            return jsonify({"errors": {"duplicate_ids": ["Unknown participants."]}}), 400
+
+        counts = merge_participants(dict.fromkeys(duplicate_ids, participant_id))
+        logger.info("Merged participants %s into %s", sorted(duplicate_ids), participant_id)
+
+        return jsonify({
+            "message": "Participants merged successfully",
+            "merged": len(duplicate_ids),
+            "moved": {table: moved for table, (moved, _) in counts.items()},
+            "dropped": {table: dropped for table, (_, dropped) in counts.items() if dropped}
+        }), 200
+
+
+dedupe_bp = Blueprint('dedupe', __name__)
+dedupe_bp.add_url_rule(
+    '/participants/<int:participant_id>/duplicates',
+    view_func=ParticipantDuplicatesView.as_view('participant_duplicates_view')
+)
+dedupe_bp.add_url_rule(
+    '/participants/<int:participant_id>/merge', view_func=ParticipantMergeView.as_view('participant_merge_view')
+)
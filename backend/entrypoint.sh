@@ -1,3 +1,43 @@
 #!/usr/bin/env bash
-flask db upgrade
-flask run --host=0.0.0.0 --port=5000
\ No newline at end of file
+set -e
+
+# Schema migrations run as a separate one-shot command (the `migrate` compose service),
+# so restarting web workers never waits on them.
+# Every shard in DATABASE_SHARDS ("name=url,...") gets the same schema as the primary database.
+if [ "$1" = "migrate" ]; then
+    flask db upgrade -x online=true
+    IFS=',' read -ra shards <<< "${DATABASE_SHARDS:-}"
+    for entry in "${shards[@]}"; do
+        echo "Migrating shard ${entry%%=*}"
+        DATABASE_URL="${entry#*=}" DATABASE_SHARDS= flask db upgrade -x online=true
+    done
+    exit 0
+fi
+
+# Shard maintenance, e.g. `docker compose run --rm migrate shards rebalance --dry-run`.
+if [ "$1" = "shards" ]; then
+    shift
+    exec flask shards "$@"
+fi
+
+# Background job workers (the `worker` compose service).
+if [ "$1" = "worker" ]; then
+    exec flask jobs worker
+fi
+
+# Periodically moves finished events out of the hot tables (the `archiver` compose service), and adds the
+# events finished since the last run to the catering history the forecasts learn from. A failed round is
+# logged and retried in the next one; it does not stop the loop.
+if [ "$1" = "archive" ]; then
+    while true; do
+        flask archive run || echo "flask archive run failed, retrying next round" >&2
+        flask forecast refresh || echo "flask forecast refresh failed, retrying next round" >&2
+        sleep "${ARCHIVE_INTERVAL_SECONDS:-86400}"
+    done
+fi
+
+if [ "${RUN_MIGRATIONS_ON_START:-false}" = "true" ]; then
+    flask db upgrade
+fi
+
+exec flask run --host=0.0.0.0 --port=5000
@@ -0,0 +1,458 @@
+from datetime import timezone
+from operator import attrgetter, itemgetter
+
+from sqlalchemy import (Integer, and_, any_, bindparam, column, delete, exists, false, func, insert, literal, or_,
+                        select, true, update, values)
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from backend.extensions import db
+from backend.feeds.cache import invalidate_event_feeds
+from backend.sharding.routing import current_shard, place_event, scatter_sorted, sharding_enabled
+from backend.util.db import pipeline
+from .models import ATTENDANCE_MAX_DAYS, Event, EventParticipant, MealsOnEvent, Participant, ParticipantMealsOnEvent
+
+# Advisory lock class of a participant's schedule, held from the conflict check to the commit of an enrolment.
+SCHEDULE_LOCK_CLASS = 7302
+
+
+def clone_event(source_event, param):
+    """
+    Copies an event together with its meals, enrolments and, optionally, meal plans.
+
+    Child rows are copied with ``INSERT ... SELECT`` statements so the cost does not grow with
+    the number of ORM objects. Must be called inside a ``commit_section``.
+
+    Args:
+        source_event (Event): The event (or template) to copy.
+        param (dict): Validated ``EventCloneSchema`` data.
+
+    Returns:
+        tuple: The new ``Event`` and a dict with the number of copied rows per table.
+    """
+    new_event = Event(
+        name=param.get('name', source_event.name),
+        description=source_event.description,
+        date=param.get('date', source_event.date),
+        duration=source_event.duration,
+        location=param.get('location', source_event.location),
+        is_template=param.get('as_template', False),
+    )
+    # Next to the source event: the rows are copied with statements on its shard.
+    place_event(new_event, shard=current_shard())
+    db.session.add(new_event)
+    db.session.flush()
+
+    copied = {'meals': 0, 'participants': 0, 'participant_meals': 0}
+
+    meal_map = _allocate_meal_ids(source_event.id)
+    if meal_map is not None:
+        copied['meals'] = _copy_meals(meal_map, new_event.id)
+
+    if param.get('include_participants', True):
+        copied['participants'] = _copy_event_participants(source_event.id, new_event.id)
+        invalidate_event_feeds([new_event.id])
+
+        if meal_map is not None and param.get('include_meal_plans', False):
+            copied['participant_meals'] = _copy_participant_meals(meal_map)
+
+    return new_event, copied
+
+
+def _allocate_meal_ids(source_event_id):
+    """
+    Reserves a new id for every meal of the source event, so meal plans can be remapped.
+
+    Returns a ``VALUES`` clause with ``old_id``/``new_id`` columns, or None if the event has no meals.
+    """
+    meal_id_seq = MealsOnEvent.__table__.c.id.default
+    rows = db.session.execute(
+        select(MealsOnEvent.id, meal_id_seq.next_value())
+        .where(MealsOnEvent.event_id == source_event_id)
+    ).all()
+    if not rows:
+        return None
+
+    return values(
+        column('old_id', Integer), column('new_id', Integer), name='meal_map'
+    ).data([tuple(row) for row in rows])
+
+
+def _copy_meals(meal_map, new_event_id):
+    stmt = insert(MealsOnEvent).from_select(
+        ['id', 'name', 'meal_type', 'is_vegetarian', 'event_id'],
+        select(
+            meal_map.c.new_id,
+            MealsOnEvent.name,
+            MealsOnEvent.meal_type,
+            MealsOnEvent.is_vegetarian,
+            literal(new_event_id),
+        ).join(meal_map, meal_map.c.old_id == MealsOnEvent.id)
+    )
+    # SQLAlchemy only keeps the row count of INSERTs when asked; psycopg 3 reports -1 otherwise.
+    return db.session.execute(stmt.execution_options(preserve_rowcount=True)).rowcount
+
+
+def _copy_event_participants(source_event_id, new_event_id):
+    stmt = insert(EventParticipant).from_select(
+        ['event_id', 'participant_id', 'days_in_event', 'attendance_mask', 'is_event_organizer'],
+        select(
+            literal(new_event_id),
+            EventParticipant.participant_id,
+            EventParticipant.days_in_event,
+            EventParticipant.attendance_mask,
+            EventParticipant.is_event_organizer,
+        ).where(EventParticipant.event_id == source_event_id)
+    )
+    return db.session.execute(stmt.execution_options(preserve_rowcount=True)).rowcount
+
+
+def _copy_participant_meals(meal_map):
+    stmt = insert(ParticipantMealsOnEvent).from_select(
+        ['meal_id', 'day', 'participant_id', 'is_special_request'],
+        select(
+            meal_map.c.new_id,
+            ParticipantMealsOnEvent.day,
+            ParticipantMealsOnEvent.participant_id,
+            ParticipantMealsOnEvent.is_special_request,
+        ).join(meal_map, meal_map.c.old_id == ParticipantMealsOnEvent.meal_id)
+    )
+    return db.session.execute(stmt.execution_options(preserve_rowcount=True)).rowcount
+
+
+def generate_default_meal_plans(event_id, dry_run=False):
+    """
+    Plans one meal per ``meal_type`` for every attended day of every enrolled participant of an event.
+
+    Vegetarian participants only get vegetarian meals; everyone else prefers the non-vegetarian
+    variant when both exist. Days that already have a meal of the given type are skipped. The
+    whole generation is a single ``INSERT ... SELECT`` (or a single ``SELECT`` on dry run).
+
+    Args:
+        event_id (int): The event to generate plans for.
+        dry_run (bool): Only count what would be created.
+
+    Returns:
+        list: ``(meal_id, count)`` rows with the number of plans created (or to be created) per meal.
+    """
+    plans = _default_meal_plans_select(event_id).subquery('plans')
+
+    if dry_run:
+        stmt = select(plans.c.meal_id, func.count()).group_by(plans.c.meal_id)
+    else:
+        inserted = (
+            insert(ParticipantMealsOnEvent)
+            .from_select(
+                ['meal_id', 'day', 'participant_id', 'is_special_request'],
+                select(plans.c.meal_id, plans.c.day, plans.c.participant_id, false())
+            )
+            .returning(ParticipantMealsOnEvent.meal_id)
+            .cte('inserted')
+        )
+        stmt = select(inserted.c.meal_id, func.count()).group_by(inserted.c.meal_id)
+
+    return db.session.execute(stmt).all()
+
+
+def _default_meal_plans_select(event_id):
+    days = func.generate_series(1, ATTENDANCE_MAX_DAYS).table_valued('day').render_derived(name='days')
+
+    planned_meal = MealsOnEvent.__table__.alias('planned_meal')
+    already_planned = exists().where(
+        ParticipantMealsOnEvent.meal_id == planned_meal.c.id,
+        ParticipantMealsOnEvent.participant_id == EventParticipant.participant_id,
+        ParticipantMealsOnEvent.day == days.c.day,
+        planned_meal.c.event_id == event_id,
+        planned_meal.c.meal_type == MealsOnEvent.meal_type,
+    )
+
+    return (
+        select(
+            MealsOnEvent.id.label('meal_id'),
+            days.c.day.label('day'),
+            EventParticipant.participant_id.label('participant_id'),
+        )
+        .select_from(EventParticipant)
+        .join(Participant, Participant.id == EventParticipant.participant_id)
+        .join(days, true())
+        .join(MealsOnEvent, MealsOnEvent.event_id == EventParticipant.event_id)
+        .where(
+            EventParticipant.event_id == event_id,
+            EventParticipant.attends_day(days.c.day),
+            or_(Participant.is_vegetarian.is_(False), MealsOnEvent.is_vegetarian.is_(True)),
+            ~already_planned,
+        )
+        .distinct(EventParticipant.participant_id, days.c.day, MealsOnEvent.meal_type)
+        .order_by(
+            EventParticipant.participant_id,
+            days.c.day,
+            MealsOnEvent.meal_type,
+            (MealsOnEvent.is_vegetarian == Participant.is_vegetarian).desc(),
+            MealsOnEvent.id,
+        )
+    )
+
+
+def get_daily_headcount(event):
+    """
+    Counts attending participants for every day of an event.
+
+    Reads one ``event_participants`` row per participant and tests the attendance bitmask in SQL.
+
+    Returns:
+        list: ``(day, headcount, vegetarian_headcount)`` rows for days ``1..event.duration``.
+    """
+    days = func.generate_series(1, event.duration).table_valued('day').render_derived(name='days')
+
+    stmt = (
+        select(
+            days.c.day,
+            func.count(EventParticipant.id),
+            func.count(Participant.id).filter(Participant.is_vegetarian.is_(True)),
+        )
+        .select_from(days)
+        .outerjoin(EventParticipant, and_(
+            EventParticipant.event_id == event.id,
+            EventParticipant.attends_day(days.c.day),
+        ))
+        .outerjoin(Participant, Participant.id == EventParticipant.participant_id)
+        .group_by(days.c.day)
+        .order_by(days.c.day)
+    )
+    return db.session.execute(stmt).all()
+
+
+def _naive_utc(value):
+    # ``events.date`` is a naive timestamp stored in UTC.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _window(start, end):
+    return func.tsrange(_naive_utc(start), _naive_utc(end) if end is not None else None)
+
+
+def lock_participant_schedule(participant_id):
+    """
+    Makes concurrent enrolments of a participant wait for the session's transaction to end, so two of them
+    cannot both pass ``find_schedule_conflicts`` and then both be inserted. The lock is taken on the primary
+    database, which every shard shares; with shards it is released as the primary commits, just before the
+    enrolment's shard does.
+    """
+    db.session.execute(
+        select(func.pg_advisory_xact_lock(SCHEDULE_LOCK_CLASS, participant_id)),
+        bind_arguments={'bind': db.engines[None]},
+    )
+
+
+def find_schedule_conflicts(event_id, participant_id):
+    """
+    Returns the other events of a participant whose period overlaps the given event. Call
+    ``lock_participant_schedule`` first in the transaction that enrols them.
+    """
+    if sharding_enabled():
+        # The event is on the routed shard; the participant's other events may be on any.
+        event_period = db.session.scalar(select(Event.period).where(Event.id == event_id))
+    else:
+        event_period = select(Event.period).where(Event.id == event_id).scalar_subquery()
+
+    def conflicts():
+        return (
+            db.session.query(Event)
+            .join(EventParticipant)
+            .filter(
+                EventParticipant.participant_id == participant_id,
+                Event.id != event_id,
+                Event.is_template.is_(False),
+                Event.period.overlaps(event_period),
+            )
+            .order_by(Event.date)
+            .all()
+        )
+
+    return scatter_sorted(conflicts, key=attrgetter('date'))
+
+
+def get_events_in_window(start, end, participant_id=None):
+    """
+    Returns events overlapping the ``[start, end)`` window, optionally only those of one participant.
+
+    Passing ``end=None`` leaves the window unbounded, which lists every event that has not ended yet.
+    """
+    def events_in_window():
+        q = db.session.query(Event).filter(
+            Event.period.overlaps(_window(start, end)),
+            Event.is_template.is_(False),
+        )
+        if participant_id is not None:
+            q = q.join(EventParticipant).filter(EventParticipant.participant_id == participant_id)
+        return q.order_by(Event.date).all()
+
+    return scatter_sorted(events_in_window, key=attrgetter('date'))
+
+
+def get_participant_availability(participant_id, start, end):
+    """
+    Splits the ``[start, end)`` window into busy and free intervals for a participant.
+
+    Returns:
+        tuple: Two lists of ``(start, end)`` pairs, busy intervals first.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    clipped = Event.period.op('*')(_window(start, end))
+
+    stmt = (
+        select(func.lower(clipped), func.upper(clipped))
+        .select_from(Event)
+        .join(EventParticipant, EventParticipant.event_id == Event.id)
+        .where(
+            EventParticipant.participant_id == participant_id,
+            Event.is_template.is_(False),
+            Event.period.overlaps(_window(start, end)),
+        )
+        .order_by(func.lower(clipped))
+    )
+    rows = scatter_sorted(lambda: db.session.execute(stmt).all(), key=itemgetter(0))
+
+    busy = []
+    for busy_start, busy_end in rows:
+        if busy and busy_start <= busy[-1][1]:
+            busy[-1] = (busy[-1][0], max(busy[-1][1], busy_end))
+        else:
+            busy.append((busy_start, busy_end))
+
+    free = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start > cursor:
+            free.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if cursor < end:
+        free.append((cursor, end))
+
+    return busy, free
+
+
+def delete_event_rows(event_id):
+    """
+    Deletes an event with its meal plans, meals and enrolments using one ``DELETE`` per table,
+    instead of loading every child row for the ORM cascade. Must be called inside a ``commit_section``.
+    """
+    invalidate_event_feeds([event_id])
+    meal_ids = select(MealsOnEvent.id).where(MealsOnEvent.event_id == event_id)
+    unsynchronized = {'synchronize_session': False}
+    with pipeline():
+        db.session.execute(
+            delete(ParticipantMealsOnEvent).where(ParticipantMealsOnEvent.meal_id.in_(meal_ids)),
+            execution_options=unsynchronized,
+        )
+        db.session.execute(
+            delete(MealsOnEvent).where(MealsOnEvent.event_id == event_id), execution_options=unsynchronized
+        )
+        db.session.execute(
+            delete(EventParticipant).where(EventParticipant.event_id == event_id), execution_options=unsynchronized
+        )
+    return db.session.execute(delete(Event).where(Event.id == event_id)).rowcount
+
+
+def _any_of(column_, ids):
+    # One array parameter instead of one per id: the statement text and its cached plan stay the same.
+    return column_ == any_(bindparam(None, ids, type_=ARRAY(Integer)))
+
+
+def _event_participants_criteria(event_id, selection):
+    criteria = [EventParticipant.event_id == event_id]
+    if 'ids' in selection:
+        return criteria + [_any_of(EventParticipant.id, selection['ids'])]
+
+    row_filter = selection['filter']
+    if 'participant_ids' in row_filter:
+        criteria.append(_any_of(EventParticipant.participant_id, row_filter['participant_ids']))
+    if 'days_in_event' in row_filter:
+        criteria.append(EventParticipant.days_in_event == row_filter['days_in_event'])
+    if 'attends_day' in row_filter:
+        criteria.append(EventParticipant.attends_day(row_filter['attends_day']))
+    if 'is_event_organizer' in row_filter:
+        criteria.append(EventParticipant.is_event_organizer.is_(row_filter['is_event_organizer']))
+    return criteria
+
+
+def _participant_meals_criteria(event_id, selection):
+    criteria = [
+        ParticipantMealsOnEvent.meal_id.in_(select(MealsOnEvent.id).where(MealsOnEvent.event_id == event_id))
+    ]
+    if 'ids' in selection:
+        return criteria + [_any_of(ParticipantMealsOnEvent.id, selection['ids'])]
+
+    row_filter = selection['filter']
+    if 'participant_ids' in row_filter:
+        criteria.append(_any_of(ParticipantMealsOnEvent.participant_id, row_filter['participant_ids']))
+    if 'meal_id' in row_filter:
+        criteria.append(ParticipantMealsOnEvent.meal_id == row_filter['meal_id'])
+    if 'day' in row_filter:
+        criteria.append(ParticipantMealsOnEvent.day == row_filter['day'])
+    if 'is_special_request' in row_filter:
+        criteria.append(ParticipantMealsOnEvent.is_special_request.is_(row_filter['is_special_request']))
+    return criteria
+
+
+def _bulk_update(model, criteria, values):
+    return db.session.scalars(
+        update(model)
+        .where(*criteria)
+        .values(version=model.version + 1, **values)
+        .returning(model.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def _bulk_delete(model, criteria):
+    return db.session.scalars(
+        delete(model).where(*criteria).returning(model.id).execution_options(synchronize_session=False)
+    ).all()
+
+
+def bulk_update_event_participants(event_id, selection, values):
+    """
+    Updates the selected enrolments of an event with one ``UPDATE ... RETURNING``, bumping their versions.
+
+    Args:
+        event_id (int): The event.
+        selection (dict): ``ids`` or ``filter`` of ``BulkSelectionSchema``.
+        values (dict): Column values to set.
+
+    Returns:
+        list: Ids of the updated enrolments.
+    """
+    return _bulk_update(EventParticipant, _event_participants_criteria(event_id, selection), values)
+
+
+def bulk_delete_event_participants(event_id, selection):
+    """
+    Deletes the selected enrolments of an event with one ``DELETE ... RETURNING``.
+
+    Returns:
+        list: Ids of the deleted enrolments.
+    """
+    invalidate_event_feeds([event_id])
+    return _bulk_delete(EventParticipant, _event_participants_criteria(event_id, selection))
+
+
+def bulk_update_participant_meals(event_id, selection, values):
+    """
+    Updates the selected meal plans of an event with one ``UPDATE ... RETURNING``, bumping their versions.
+
+    Returns:
+        list: Ids of the updated meal plans.
+    """
+    return _bulk_update(ParticipantMealsOnEvent, _participant_meals_criteria(event_id, selection), values)
+
+
+def bulk_delete_participant_meals(event_id, selection):
+    """
+    Deletes the selected meal plans of an event with one ``DELETE ... RETURNING``.
+
+    Returns:
+        list: Ids of the deleted meal plans.
+    """
+    return _bulk_delete(ParticipantMealsOnEvent, _participant_meals_criteria(event_id, selection))
@@ -0,0 +1,39 @@
+from backend.extensions import db
+from backend.jobs.registry import job
+from backend.sharding.routing import forget_event, route_to_event
+from backend.util.db import commit_section
+from .db_utils import clone_event, delete_event_rows, generate_default_meal_plans
+from .ma_schemas import EventCloneSchema
+from .models import Event
+
+
+@job('event_delete', concurrency=1)
+def delete_event(ctx, event_id):
+    route_to_event(event_id)
+    with commit_section():
+        deleted = delete_event_rows(event_id)
+        forget_event(event_id)
+    return {"deleted": bool(deleted)}
+
+
+@job('event_clone')
+def clone_event_in_background(ctx, event_id, param):
+    route_to_event(event_id)
+    source_event = db.session.get(Event, event_id)
+    if source_event is None:
+        return {"event_id": None}
+
+    with commit_section():
+        new_event, copied = clone_event(source_event, EventCloneSchema().load(param))
+    return {"event_id": new_event.id, "copied": copied}
+
+
+@job('generate_meal_plans')
+def generate_meal_plans_in_background(ctx, event_id):
+    route_to_event(event_id)
+    with commit_section():
+        per_meal = generate_default_meal_plans(event_id)
+    return {
+        "created": sum(count for _, count in per_meal),
+        "per_meal": [{"meal_id": meal_id, "count": count} for meal_id, count in per_meal]
+    }
@@ -1,4 +1,6 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate, validates_schema, post_load, ValidationError
+
+from .models import ATTENDANCE_MAX_DAYS
 
 
 class EventSchema(Schema):
@@ -19,8 +21,22 @@ class ParticipantSchema(Schema):
 class EventParticipantsSchema(Schema):
     event_id = fields.Integer(required=True)
     participant_id = fields.Integer(required=True)
-    days_in_event = fields.Integer(required=True)
+    days_in_event = fields.Integer(required=True, validate=validate.Range(min=0, max=ATTENDANCE_MAX_DAYS))
+    attendance_days = fields.List(fields.Integer(validate=validate.Range(min=1, max=ATTENDANCE_MAX_DAYS)))
     is_event_organizer = fields.Boolean(required=True)
+    ignore_conflicts = fields.Boolean(load_default=False)
+
+    @validates_schema
+    def validate_attendance_days(self, data, **kwargs):
+        attendance_days = data.get('attendance_days')
+        if attendance_days is not None and len(set(attendance_days)) != data['days_in_event']:
+            raise ValidationError('Number of attended days must equal days_in_event.', 'attendance_days')
+
+    @post_load
+    def default_attendance_days(self, data, **kwargs):
+        # Without explicit days the participant attends the first ``days_in_event`` days.
+        data.setdefault('attendance_days', list(range(1, data['days_in_event'] + 1)))
+        return data
 
 
 class MealsOnEventSchema(Schema):
@@ -29,6 +45,7 @@ class MealsOnEventSchema(Schema):
     meal_type = fields.String(required=True)
     is_vegetarian = fields.Boolean(required=True)
     event_id = fields.Integer(required=False)
+    version = fields.Integer(dump_only=True)
 
 
 class ParticipantMealsOnEventSchema(Schema):
@@ -37,7 +54,120 @@ class ParticipantMealsOnEventSchema(Schema):
     day = fields.Integer(required=True)
     participant_id = fields.Integer(required=True)
     is_special_request = fields.Boolean(required=True)
+    version = fields.Integer(dump_only=True)
 
 
 class ParticipantListOfMealsOnEventSchema(Schema):
     meals = fields.List(fields.Nested(ParticipantMealsOnEventSchema()), required=True)
+
+
+class EventCloneSchema(Schema):
+    name = fields.String()
+    date = fields.DateTime()
+    location = fields.String()
+    include_participants = fields.Boolean(load_default=True)
+    include_meal_plans = fields.Boolean(load_default=False)
+    as_template = fields.Boolean(load_default=False)
+    background = fields.Boolean(load_default=False, load_only=True)
+
+
+class GenerateMealPlansSchema(Schema):
+    dry_run = fields.Boolean(load_default=False)
+    background = fields.Boolean(load_default=False)
+
+
+class TimeWindowSchema(Schema):
+    start = fields.DateTime(required=True)
+    end = fields.DateTime(required=True)
+
+    @validates_schema
+    def validate_window(self, data, **kwargs):
+        if data['end'] <= data['start']:
+            raise ValidationError('End must be after start.', 'end')
+
+
+BULK_MAX_IDS = 10000
+
+
+class BulkSelectionSchema(Schema):
+    """
+    Rows of a bulk request: an explicit id list or a filter, exactly one of the two.
+    """
+    ids = fields.List(fields.Integer(), validate=validate.Length(min=1, max=BULK_MAX_IDS))
+
+    @validates_schema
+    def validate_selection(self, data, **kwargs):
+        if ('ids' in data) == ('filter' in data):
+            raise ValidationError('Give either ids or filter.')
+        # An empty filter would select every row of the event.
+        if 'filter' in data and not data['filter']:
+            raise ValidationError('Give at least one filter criterion.', 'filter')
+
+
+class EventParticipantFilterSchema(Schema):
+    participant_ids = fields.List(fields.Integer(), validate=validate.Length(min=1, max=BULK_MAX_IDS))
+    days_in_event = fields.Integer()
+    attends_day = fields.Integer(validate=validate.Range(min=1, max=ATTENDANCE_MAX_DAYS))
+    is_event_organizer = fields.Boolean()
+
+
+class EventParticipantPatchSchema(EventParticipantsSchema):
+    """
+    The fields of ``EventParticipantsSchema`` a bulk update may set, all optional.
+    """
+
+    class Meta:
+        exclude = ('event_id', 'participant_id', 'ignore_conflicts')
+
+    @validates_schema
+    def validate_attendance_days(self, data, **kwargs):
+        if not data:
+            raise ValidationError('Nothing to update.')
+        if 'attendance_days' in data and 'days_in_event' not in data:
+            raise ValidationError('attendance_days can only be set with days_in_event.', 'attendance_days')
+        super().validate_attendance_days(data, **kwargs)
+
+    @post_load
+    def default_attendance_days(self, data, **kwargs):
+        if 'days_in_event' not in data:
+            return data
+        return super().default_attendance_days(data, **kwargs)
+
+
+class BulkEventParticipantsPatchSchema(BulkSelectionSchema):
+    filter = fields.Nested(EventParticipantFilterSchema())
+    patch = fields.Nested(EventParticipantPatchSchema(partial=True), required=True)
+
+
+class BulkEventParticipantsDeleteSchema(BulkSelectionSchema):
+    filter = fields.Nested(EventParticipantFilterSchema())
+
+
+class ParticipantMealFilterSchema(Schema):
+    participant_ids = fields.List(fields.Integer(), validate=validate.Length(min=1, max=BULK_MAX_IDS))
+    meal_id = fields.Integer()
+    day = fields.Integer()
+    is_special_request = fields.Boolean()
+
+
+class ParticipantMealPatchSchema(ParticipantMealsOnEventSchema):
+    """
+    The fields of ``ParticipantMealsOnEventSchema`` a bulk update may set, all optional.
+    """
+
+    class Meta:
+        exclude = ('id', 'participant_id', 'version')
+
+    @validates_schema
+    def validate_not_empty(self, data, **kwargs):
+        if not data:
+            raise ValidationError('Nothing to update.')
+
+
+class BulkParticipantMealsPatchSchema(BulkSelectionSchema):
+    filter = fields.Nested(ParticipantMealFilterSchema())
+    patch = fields.Nested(ParticipantMealPatchSchema(partial=True), required=True)
+
+
+class BulkParticipantMealsDeleteSchema(BulkSelectionSchema):
+    filter = fields.Nested(ParticipantMealFilterSchema())
@@ -1,9 +1,19 @@
-from sqlalchemy import Column, ForeignKey, Integer, Boolean, Unicode, DateTime, UnicodeText
+from sqlalchemy import (Column, ForeignKey, Integer, BigInteger, Boolean, Unicode, DateTime, UnicodeText,
+                        FetchedValue, Index, false, func, literal_column, type_coerce)
+from sqlalchemy.dialects.postgresql import TSRANGE
 
 from backend.util.db import PkColumn, CreateModifyMixin
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from backend.extensions import db
 
+# Attendance is kept as a bitmask in a BIGINT, bit ``day - 1`` set for every attended day.
+ATTENDANCE_MAX_DAYS = 63
+
+
+def _period(date, duration):
+    # The days of an event as a range, computed in queries; ix_events_period indexes this expression.
+    return type_coerce(func.tsrange(date, date + duration * literal_column("interval '1 day'")), TSRANGE)
+
 
 class Event(db.Model, CreateModifyMixin):
     __tablename__ = 'events'
@@ -14,11 +24,20 @@ class Event(db.Model, CreateModifyMixin):
     date = Column(DateTime, nullable=False)
     duration = Column(Integer, nullable=False)
     location = Column(Unicode(255), nullable=False)
+    is_template = Column(Boolean, nullable=False, default=False, server_default=false())
+    period = column_property(_period(date, duration), deferred=True)
+    version = Column(Integer, nullable=False, server_default='1')
 
     # Relationships
     participants = relationship('EventParticipant', back_populates='event', cascade="all, delete-orphan")
     meals = relationship('MealsOnEvent', back_populates='event', cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_events_period', _period(date, duration), postgresql_using='gist'),
+    )
+    # Writes compare the version loaded with the row; see backend.util.versioning.
+    __mapper_args__ = {'version_id_col': version}
+
 
 class Participant(db.Model):
     __tablename__ = 'participants'
@@ -28,25 +47,57 @@ class Participant(db.Model):
     last_name = Column(Unicode(100), nullable=False)
     email = Column(Unicode(255), unique=True, nullable=False)
     is_vegetarian = Column(Boolean, nullable=False, default=False)
+    version = Column(Integer, nullable=False, server_default='1')
+    # Blocking keys of the duplicate search (backend.dedupe), set by the participants_blocking_keys trigger.
+    email_key = Column(Unicode(255), server_default=FetchedValue(), server_onupdate=FetchedValue(), index=True)
+    name_key = Column(Unicode(20), server_default=FetchedValue(), server_onupdate=FetchedValue(), index=True)
 
     # Relationships
     events = relationship('EventParticipant', back_populates='participant', cascade="all, delete-orphan")
     meals_on_event = relationship('ParticipantMealsOnEvent', back_populates='participant', cascade="all, delete-orphan")
 
+    __mapper_args__ = {'version_id_col': version}
+
 
 class EventParticipant(db.Model, CreateModifyMixin):
     __tablename__ = 'event_participants'
 
     id = PkColumn('event_participants_id_seq')
-    event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
-    participant_id = Column(Integer, ForeignKey('participants.id'), nullable=False)
+    event_id = Column(Integer, ForeignKey('events.id'), nullable=False, index=True)
+    participant_id = Column(Integer, ForeignKey('participants.id'), nullable=False, index=True)
     days_in_event = Column(Integer, nullable=False)
+    attendance_mask = Column(BigInteger, nullable=False, default=0, server_default='0')
     is_event_organizer = Column(Boolean, nullable=False, default=False)
+    checked_in_at = Column(DateTime, nullable=True)
+    version = Column(Integer, nullable=False, server_default='1')
 
     # Relationships
     event = relationship('Event', back_populates='participants')
     participant = relationship('Participant', back_populates='events')
 
+    __mapper_args__ = {'version_id_col': version}
+
+    @staticmethod
+    def attendance_mask_of(days):
+        return sum(1 << (day - 1) for day in set(days))
+
+    @property
+    def attendance_days(self) -> list:
+        mask = self.attendance_mask or 0
+        return [day for day in range(1, ATTENDANCE_MAX_DAYS + 1) if mask >> (day - 1) & 1]
+
+    @attendance_days.setter
+    def attendance_days(self, days):
+        self.attendance_mask = self.attendance_mask_of(days)
+
+    @classmethod
+    def attends_day(cls, day):
+        """
+        SQL expression that is true when the participant attends the given (1-based) day.
+        """
+        # A plain int would be bound as BIGINT like the mask, and there is no ``bigint >> bigint``.
+        return cls.attendance_mask.op('>>')(type_coerce(day - 1, Integer)).op('&')(1) == 1
+
 
 class MealsOnEvent(db.Model, CreateModifyMixin):
     __tablename__ = 'meals_on_event'
@@ -55,22 +106,28 @@ class MealsOnEvent(db.Model, CreateModifyMixin):
     name = Column(Unicode(100), nullable=False)
     meal_type = Column(Unicode(50), nullable=False)
     is_vegetarian = Column(Boolean, nullable=False, default=False)
-    event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
+    event_id = Column(Integer, ForeignKey('events.id'), nullable=False, index=True)
+    version = Column(Integer, nullable=False, server_default='1')
 
     # Relationships
     event = relationship('Event', back_populates='meals')
     participant_meals = relationship('ParticipantMealsOnEvent', back_populates='meal', cascade="all, delete-orphan")
 
+    __mapper_args__ = {'version_id_col': version}
+
 
 class ParticipantMealsOnEvent(db.Model, CreateModifyMixin):
     __tablename__ = 'participant_meals_on_event'
 
     id = PkColumn('participant_meals_on_event_id_seq')
-    meal_id = Column(Integer, ForeignKey('meals_on_event.id'), nullable=False)
+    meal_id = Column(Integer, ForeignKey('meals_on_event.id'), nullable=False, index=True)
     day = Column(Integer, nullable=False)
-    participant_id = Column(Integer, ForeignKey('participants.id'), nullable=False)
+    participant_id = Column(Integer, ForeignKey('participants.id'), nullable=False, index=True)
     is_special_request = Column(Boolean, nullable=True)
+    version = Column(Integer, nullable=False, server_default='1')
 
     # Relationships
     meal = relationship('MealsOnEvent', back_populates='participant_meals')
     participant = relationship('Participant', back_populates='meals_on_event')
+
+    __mapper_args__ = {'version_id_col': version}
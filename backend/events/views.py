@@ -1,21 +1,39 @@
 import logging
 from datetime import datetime, timezone
-from flask import Blueprint, jsonify
+from operator import attrgetter
+from flask import Blueprint, current_app, jsonify
 from flask.views import MethodView
 from marshmallow import Schema, fields
-from flask_jwt_extended import jwt_required
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, load_only
+from sqlalchemy.orm.exc import StaleDataError
 
 from backend.events.ma_schemas import (ParticipantSchema, EventParticipantsSchema, EventSchema,
                                        MealsOnEventSchema, ParticipantMealsOnEventSchema,
-                                       ParticipantListOfMealsOnEventSchema)
+                                       ParticipantListOfMealsOnEventSchema, EventCloneSchema,
+                                       GenerateMealPlansSchema, TimeWindowSchema, BULK_MAX_IDS,
+                                       BulkEventParticipantsPatchSchema, BulkEventParticipantsDeleteSchema,
+                                       BulkParticipantMealsPatchSchema, BulkParticipantMealsDeleteSchema)
+from backend.events.db_utils import (clone_event, generate_default_meal_plans, get_daily_headcount,
+                                     find_schedule_conflicts, lock_participant_schedule, get_events_in_window,
+                                     get_participant_availability, bulk_update_event_participants,
+                                     bulk_delete_event_participants, delete_event_rows,
+                                     bulk_update_participant_meals, bulk_delete_participant_meals)
+from backend.events import jobs  # noqa: F401 - registers the event job types
 from backend.events.models import Event, Participant, EventParticipant, MealsOnEvent, ParticipantMealsOnEvent
 from backend.extensions import db
-from backend.util.db import commit_section
-from backend.util.ma_validation import validate_request
+from backend.feeds.cache import invalidate_event_feeds
+from backend.jobs.registry import enqueue
+from backend.sharding.replication import delete_replicated_participants, replicate_participants
+from backend.sharding.routing import forget_event, handle_event_moved, place_event, route_by_event_id, scatter_sorted
+from backend.sharding.session import EventMoved
+from backend.util.db import commit_section, read_only, fetch_rows
+from backend.util.jwt import jwt_required
+from backend.util.ma_validation import validate_request, validate_query
+from backend.util.sparse_fields import SparseFieldsetSchema, load_only_columns
+from backend.util.versioning import (VersionConflict, PreconditionRequired, check_version, update_versioned,
+                                     with_etag, handle_version_conflict, handle_precondition_required)
 
-
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +44,8 @@ class EventSerializationSchema(Schema):
     date = fields.DateTime()
     location = fields.String()
     duration = fields.Integer()
+    is_template = fields.Boolean()
+    version = fields.Integer()
 
 
 class ParticipantSerializationSchema(Schema):
@@ -34,29 +54,58 @@ class ParticipantSerializationSchema(Schema):
     last_name = fields.String()
     email = fields.Email()
     is_vegetarian = fields.Boolean()
+    version = fields.Integer()
 
 
 class EventParticipantSerializationSchema(Schema):
     id = fields.Integer()
     event_id = fields.Integer()
     days_in_event = fields.Integer()
+    attendance_days = fields.List(fields.Integer())
     participant = fields.Nested(ParticipantSerializationSchema)
     is_event_organizer = fields.Boolean()
+    checked_in_at = fields.DateTime()
+    version = fields.Integer()
+
+
+class EventFieldsetSchema(SparseFieldsetSchema):
+    serializer = EventSerializationSchema
+
+
+class ParticipantFieldsetSchema(SparseFieldsetSchema):
+    serializer = ParticipantSerializationSchema
+
+
+class EventParticipantFieldsetSchema(SparseFieldsetSchema):
+    serializer = EventParticipantSerializationSchema
+    relations = {'participant': ParticipantSerializationSchema}
+    default_include = ('participant',)
+
+
+EVENT_PARTICIPANT_COLUMN_MAP = {'attendance_days': 'attendance_mask'}
 
 
 class EventsView(MethodView):
     @jwt_required()
-    def get(self):
+    @read_only()
+    @validate_query(EventFieldsetSchema())
+    def get(self, query):
         current_time = datetime.now(timezone.utc)
         logger.debug("Fetching events after current time: %s", current_time)
 
-        events = Event.query.filter(
-            Event.date >= current_time.strftime('%Y-%m-%d')
-        ).order_by(Event.date).all()
+        columns = load_only_columns(Event, query['only'])
+        events = scatter_sorted(
+            lambda: fetch_rows(
+                select(*columns, Event.date.label('sort_date'))
+                .where(Event.date >= current_time.date(), Event.is_template.is_(False))
+                .order_by(Event.date)
+            ),
+            key=attrgetter('sort_date'),
+        )
 
         logger.debug("Fetched events: %s", events)
 
-        event_schema = EventSerializationSchema(many=True)
+        event_schema = EventSerializationSchema(many=True, only=query['only'])
         events_data = event_schema.dump(events)
         return jsonify(events_data), 200
 
@@ -66,6 +115,7 @@ class EventsView(MethodView):
         logger.debug("Creating new event with params: %s", param)
         with commit_section():
             new_event = Event(**param)
+            place_event(new_event)
             db.session.add(new_event)
 
         logger.info("Event created successfully: %s", new_event)
@@ -78,51 +128,114 @@ class EventsView(MethodView):
 
 class EventView(MethodView):
     @jwt_required()
-    def get(self, event_id):
+    @read_only()
+    @validate_query(EventFieldsetSchema())
+    def get(self, event_id, query):
         logger.debug("Fetching event: %s", event_id)
-        event = Event.query.get_or_404(event_id)
+        event = Event.query.options(
+            load_only(*load_only_columns(Event, query['only']), Event.version)
+        ).filter_by(id=event_id).first_or_404()
         logger.info("Event fetched successfully: %s", event)
-        event_schema = EventSerializationSchema()
+        event_schema = EventSerializationSchema(only=query['only'])
         event_data = event_schema.dump(event)
-        return jsonify(event_data), 200
+        return with_etag((jsonify(event_data), 200), event.version)
 
     @jwt_required()
     @validate_request(EventSchema())
     def patch(self, event_id, param):
         logger.debug("Updating event %s with params: %s", event_id, param)
-        event = Event.query.get_or_404(event_id)
-
-        for key, value in param.items():
-            setattr(event, key, value)
 
         with commit_section():
-            db.session.add(event)
+            event = update_versioned(Event, [Event.id == event_id], param)
+            invalidate_event_feeds([event_id])
+            event_data = EventSerializationSchema().dump(event)
 
         logger.info("Event updated successfully: %s", event)
 
-        return jsonify({
+        return with_etag((jsonify({
             "message": "Event updated successfully",
-            "event": EventSerializationSchema().dump(event)
-        }), 200
+            "event": event_data
+        }), 200), event.version)
 
     @jwt_required()
     def delete(self, event_id):
+        """
+        Deletes an event with its meals, meal plans and enrolments.
+
+        Events with at most ``EVENT_DELETE_SYNC_MAX_PARTICIPANTS`` enrolments are deleted in the request and
+        answered with ``204``. Larger events are deleted by an ``event_delete`` job: the response is ``202``
+        with the ``job_id`` to poll at ``/jobs/<job_id>``, and the event stays readable until the job runs.
+        """
         logger.debug("Deleting event %s", event_id)
-        event = Event.query.get_or_404(event_id)
+        check_version(Event.query.get_or_404(event_id))
+
+        enrolments = db.session.scalar(
+            select(func.count()).select_from(EventParticipant).where(EventParticipant.event_id == event_id)
+        )
+        if enrolments <= current_app.config['EVENT_DELETE_SYNC_MAX_PARTICIPANTS']:
+            with commit_section():
+                delete_event_rows(event_id)
+                forget_event(event_id)
+            logger.info("Event deleted successfully: %s", event_id)
+            return jsonify({"message": "Event deleted successfully"}), 204
 
         with commit_section():
-            db.session.delete(event)
+            job = enqueue('event_delete', event_id=event_id)
 
-        logger.info("Event deleted successfully: %s", event_id)
+        logger.info("Event %s deletion scheduled as job %s", event_id, job.id)
 
-        return jsonify({"message": "Event deleted successfully"}), 204
+        return jsonify({"message": "Event deletion scheduled", "job_id": job.id}), 202
 
 
-class ParticipantsView(MethodView):
+class EventCloneView(MethodView):
     @jwt_required()
+    @validate_request(EventCloneSchema())
+    def post(self, event_id, param):
+        logger.debug("Cloning event %s with params: %s", event_id, param)
+        source_event = Event.query.get_or_404(event_id)
+
+        if param['background']:
+            with commit_section():
+                job = enqueue('event_clone', event_id=event_id, param=EventCloneSchema().dump(param))
+            logger.info("Clone of event %s scheduled as job %s", event_id, job.id)
+            return jsonify({"message": "Event clone scheduled", "job_id": job.id}), 202
+
+        with commit_section():
+            new_event, copied = clone_event(source_event, param)
+
+        logger.info("Event %s cloned successfully into %s: %s", event_id, new_event.id, copied)
+
+        return jsonify({
+            "message": "Event cloned successfully",
+            "event": EventSerializationSchema().dump(new_event),
+            "copied": copied
+        }), 201
+
+
+class EventTemplatesView(MethodView):
+    @jwt_required()
+    @read_only()
     def get(self):
-        participants = Participant.query.all()
-        participant_schema = ParticipantSerializationSchema(many=True)
+        event_schema = EventSerializationSchema(many=True)
+        templates = scatter_sorted(
+            lambda: fetch_rows(
+                select(*load_only_columns(Event, event_schema.fields))
+                .where(Event.is_template.is_(True))
+                .order_by(Event.name)
+            ),
+            key=attrgetter('name'),
+        )
+        templates_data = event_schema.dump(templates)
+        return jsonify(templates_data), 200
+
+
+class ParticipantsView(MethodView):
+    @jwt_required()
+    @read_only()
+    @validate_query(ParticipantFieldsetSchema())
+    def get(self, query):
+        participants = fetch_rows(select(*load_only_columns(Participant, query['only'])))
+        participant_schema = ParticipantSerializationSchema(many=True, only=query['only'])
         participants_data = participant_schema.dump(participants)
         return jsonify(participants_data), 200
 
@@ -133,6 +246,7 @@ class ParticipantsView(MethodView):
         with commit_section():
             new_participant = Participant(**param)
             db.session.add(new_participant)
+        replicate_participants([new_participant.id])
         logger.info("Participant created successfully %s", new_participant)
         return jsonify({
             "message": "Participant created successfully",
@@ -142,36 +256,37 @@ class ParticipantsView(MethodView):
 
 class ParticipantView(MethodView):
     @jwt_required()
+    @read_only()
     def get(self, participant_id):
         participant = Participant.query.get_or_404(participant_id)
         participant_schema = ParticipantSerializationSchema()
         participant_data = participant_schema.dump(participant)
-        return jsonify(participant_data), 200
+        return with_etag((jsonify(participant_data), 200), participant.version)
 
     @jwt_required()
     @validate_request(ParticipantSchema())
     def patch(self, participant_id, param):
         logger.debug("Updating participant %s", participant_id)
-        participant = Participant.query.get_or_404(participant_id)
-
-        for key, value in param.items():
-            setattr(participant, key, value)
 
         with commit_section():
-            db.session.add(participant)
+            participant = update_versioned(Participant, [Participant.id == participant_id], param)
+            participant_data = ParticipantSerializationSchema().dump(participant)
+        replicate_participants([participant_id])
         logger.info("Participant %s updated successfully", participant_id)
-        return jsonify({
+        return with_etag((jsonify({
             "message": "Participant updated successfully",
-            "participant": ParticipantSerializationSchema().dump(participant)
-        }), 200
+            "participant": participant_data
+        }), 200), participant.version)
 
     @jwt_required()
     def delete(self, participant_id):
         logger.debug("Deleting participant %s", participant_id)
         participant = Participant.query.get_or_404(participant_id)
+        check_version(participant)
 
         with commit_section():
             db.session.delete(participant)
+        delete_replicated_participants([participant_id])
 
         logger.info("Participant deleted successfully: %s", participant_id)
 
@@ -180,15 +295,25 @@ class ParticipantView(MethodView):
 
 class EventParticipantsView(MethodView):
     @jwt_required()
-    def get(self, event_id):
-        event_participants = (
-            EventParticipant.query
-            .options(joinedload(EventParticipant.participant))
-            .filter_by(event_id=event_id)
-            .all()
-        )
+    @read_only()
+    @validate_query(EventParticipantFieldsetSchema())
+    def get(self, event_id, query):
+        event_participants_query = EventParticipant.query.filter_by(event_id=event_id)
+
+        columns = load_only_columns(EventParticipant, query['only'], EVENT_PARTICIPANT_COLUMN_MAP)
+        if columns:
+            event_participants_query = event_participants_query.options(load_only(*columns))
+
+        if 'participant' in query['include']:
+            participant_loader = joinedload(EventParticipant.participant)
+            participant_columns = load_only_columns(Participant, query['nested']['participant'])
+            if participant_columns:
+                participant_loader = participant_loader.load_only(*participant_columns)
+            event_participants_query = event_participants_query.options(participant_loader)
 
-        event_participants_schema = EventParticipantSerializationSchema(many=True)
+        event_participants = event_participants_query.all()
+
+        event_participants_schema = EventParticipantSerializationSchema(many=True, only=query['only'])
         event_participants_data = event_participants_schema.dump(event_participants)
 
         return jsonify(event_participants_data), 200
@@ -198,8 +323,21 @@ class EventParticipantsView(MethodView):
     def post(self, event_id, param):
         logger.debug("Creating new event participant in event %s", event_id)
         param['event_id'] = event_id
+        ignore_conflicts = param.pop('ignore_conflicts')
 
         with commit_section():
+            if not ignore_conflicts:
+                # Held until the commit, so a concurrent enrolment of the participant sees this one.
+                lock_participant_schedule(param['participant_id'])
+                conflicts = find_schedule_conflicts(event_id, param['participant_id'])
+                if conflicts:
+                    logger.warning("Participant %s has %d conflicting events with event %s",
+                                   param['participant_id'], len(conflicts), event_id)
+                    return jsonify({
+                        "message": "Participant is already enrolled in overlapping events",
+                        "conflicts": EventSerializationSchema(many=True).dump(conflicts)
+                    }), 409
+
             new_event_participant = EventParticipant(**param)
             db.session.add(new_event_participant)
         logger.info("Event participant created successfully: %s", new_event_participant)
@@ -208,35 +346,86 @@ class EventParticipantsView(MethodView):
             "event_participant": EventParticipantSerializationSchema().dump(new_event_participant)
         }), 201
 
+    @jwt_required()
+    @validate_request(BulkEventParticipantsPatchSchema(), max_items=BULK_MAX_IDS)
+    def patch(self, event_id, param):
+        """
+        Applies one patch to many enrolments of the event, selected by ``ids`` or ``filter``, in one statement.
+        """
+        values = param.pop('patch')
+        if 'attendance_days' in values:
+            values['attendance_mask'] = EventParticipant.attendance_mask_of(values.pop('attendance_days'))
+
+        with commit_section():
+            updated_ids = bulk_update_event_participants(event_id, param, values)
+        logger.info("Updated %d event participants in event %s", len(updated_ids), event_id)
+
+        return jsonify({
+            "message": "Event participants updated successfully",
+            "updated": len(updated_ids),
+            "ids": updated_ids
+        }), 200
+
+    @jwt_required()
+    @validate_request(BulkEventParticipantsDeleteSchema(), max_items=BULK_MAX_IDS)
+    def delete(self, event_id, param):
+        """
+        Deletes many enrolments of the event, selected by ``ids`` or ``filter``, in one statement.
+        """
+        with commit_section():
+            deleted_ids = bulk_delete_event_participants(event_id, param)
+        logger.info("Deleted %d event participants from event %s", len(deleted_ids), event_id)
+
+        return jsonify({
+            "message": "Event participants deleted successfully",
+            "deleted": len(deleted_ids),
+            "ids": deleted_ids
+        }), 200
+
+
+class EventAttendanceView(MethodView):
+    @jwt_required()
+    @read_only(deferrable=True)
+    def get(self, event_id):
+        event = Event.query.get_or_404(event_id)
+        headcount = get_daily_headcount(event)
+
+        return jsonify([
+            {"day": day, "headcount": total, "vegetarian_headcount": vegetarian}
+            for day, total, vegetarian in headcount
+        ]), 200
+
 
 class EventParticipantView(MethodView):
     @jwt_required()
+    @read_only()
     def get(self, event_id, event_participant_id):
         event_participant = EventParticipant.query.filter_by(
             event_id=event_id, id=event_participant_id
         ).first_or_404()
         event_participant_schema = EventParticipantSerializationSchema()
         event_participant_data = event_participant_schema.dump(event_participant)
-        return jsonify(event_participant_data), 200
+        return with_etag((jsonify(event_participant_data), 200), event_participant.version)
 
     @jwt_required()
     @validate_request(EventParticipantsSchema())
     def patch(self, event_id, event_participant_id, param):
         logger.debug("Updating event participant %s", event_participant_id)
-        event_participant = EventParticipant.query.filter_by(
-            event_id=event_id, id=event_participant_id
-        ).first_or_404()
-
-        for key, value in param.items():
-            setattr(event_participant, key, value)
+        param.pop('ignore_conflicts')
+        param['attendance_mask'] = EventParticipant.attendance_mask_of(param.pop('attendance_days'))
 
         with commit_section():
-            db.session.add(event_participant)
+            event_participant = update_versioned(
+                EventParticipant,
+                [EventParticipant.event_id == event_id, EventParticipant.id == event_participant_id],
+                param
+            )
+            event_participant_data = EventParticipantSerializationSchema().dump(event_participant)
         logger.info("Event participant updated successfully %s", event_participant)
-        return jsonify({
+        return with_etag((jsonify({
             "message": "Event participant updated successfully",
-            "event_participant": EventParticipantSerializationSchema().dump(event_participant)
-        }), 200
+            "event_participant": event_participant_data
+        }), 200), event_participant.version)
 
     @jwt_required()
     def delete(self, event_id, event_participant_id):
@@ -244,6 +433,7 @@ class EventParticipantView(MethodView):
         event_participant = EventParticipant.query.filter_by(
             event_id=event_id, id=event_participant_id
         ).first_or_404()
+        check_version(event_participant)
 
         with commit_section():
             db.session.delete(event_participant)
@@ -255,35 +445,55 @@ class EventParticipantView(MethodView):
 
 class ParticipantUpcomingEventsView(MethodView):
     @jwt_required()
+    @read_only()
     def get(self, participant_id):
         current_time = datetime.now(timezone.utc)
 
-        upcoming_events = (
-            db.session.query(Event)
-            .join(EventParticipant)
-            .filter(
-                EventParticipant.participant_id == participant_id,
-                Event.date >= current_time.strftime('%Y-%m-%d')
-            )
-            .order_by(Event.date)
-            .all()
-        )
+        upcoming_events = get_events_in_window(current_time, None, participant_id=participant_id)
 
         event_schema = EventSerializationSchema(many=True)
         events_data = event_schema.dump(upcoming_events)
         return jsonify(events_data), 200
 
 
+class EventsCalendarView(MethodView):
+    @jwt_required()
+    @read_only(deferrable=True)
+    @validate_query(TimeWindowSchema())
+    def get(self, query):
+        events = get_events_in_window(query['start'], query['end'])
+        event_schema = EventSerializationSchema(many=True)
+        events_data = event_schema.dump(events)
+        return jsonify(events_data), 200
+
+
+class ParticipantAvailabilityView(MethodView):
+    @jwt_required()
+    @read_only(deferrable=True)
+    @validate_query(TimeWindowSchema())
+    def get(self, participant_id, query):
+        Participant.query.get_or_404(participant_id)
+        busy, free = get_participant_availability(participant_id, query['start'], query['end'])
+
+        def dump_intervals(intervals):
+            return [{"start": start.isoformat(), "end": end.isoformat()} for start, end in intervals]
+
+        return jsonify({
+            "busy": dump_intervals(busy),
+            "free": dump_intervals(free)
+        }), 200
+
+
 class MealsOnEventView(MethodView):
     @jwt_required()
+    @read_only()
     def get(self, event_id):
-        meals_on_event = (
-            MealsOnEvent.query
-            .filter_by(event_id=event_id)
-            .all()
+        meals_schema = MealsOnEventSchema(many=True)
+        meals_on_event = fetch_rows(
+            select(*load_only_columns(MealsOnEvent, meals_schema.fields))
+            .where(MealsOnEvent.event_id == event_id)
         )
 
-        meals_schema = MealsOnEventSchema(many=True)
         meals_data = meals_schema.dump(meals_on_event)
         return jsonify(meals_data), 200
 
@@ -305,6 +515,7 @@ class MealsOnEventView(MethodView):
 
 class MealOnEventDetailView(MethodView):
     @jwt_required()
+    @read_only()
     def get(self, event_id, meal_id):
         meal_on_event = MealsOnEvent.query.filter_by(
             event_id=event_id, id=meal_id
@@ -312,26 +523,23 @@ class MealOnEventDetailView(MethodView):
 
         meal_schema = MealsOnEventSchema()
         meal_data = meal_schema.dump(meal_on_event)
-        return jsonify(meal_data), 200
+        return with_etag((jsonify(meal_data), 200), meal_on_event.version)
 
     @jwt_required()
     @validate_request(MealsOnEventSchema())
     def patch(self, event_id, meal_id, param):
         logger.debug("Updating meal %s", meal_id)
-        meal_on_event = MealsOnEvent.query.filter_by(
-            event_id=event_id, id=meal_id
-        ).first_or_404()
-
-        for key, value in param.items():
-            setattr(meal_on_event, key, value)
 
         with commit_section():
-            db.session.add(meal_on_event)
+            meal_on_event = update_versioned(
+                MealsOnEvent, [MealsOnEvent.event_id == event_id, MealsOnEvent.id == meal_id], param
+            )
+            meal_data = MealsOnEventSchema().dump(meal_on_event)
         logger.info("Meal updated successfully %s", meal_on_event)
-        return jsonify({
+        return with_etag((jsonify({
             "message": "Meal updated successfully",
-            "meal": MealsOnEventSchema().dump(meal_on_event)
-        }), 200
+            "meal": meal_data
+        }), 200), meal_on_event.version)
 
     @jwt_required()
     def delete(self, event_id, meal_id):
@@ -339,6 +547,7 @@ class MealOnEventDetailView(MethodView):
         meal_on_event = MealsOnEvent.query.filter_by(
             event_id=event_id, id=meal_id
         ).first_or_404()
+        check_version(meal_on_event)
 
         with commit_section():
             db.session.delete(meal_on_event)
@@ -350,18 +559,18 @@ class MealOnEventDetailView(MethodView):
 
 class ParticipantMealsOnEventView(MethodView):
     @jwt_required()
+    @read_only()
     def get(self, event_id, participant_id):
-        participant_meals = (
-            ParticipantMealsOnEvent.query
+        participant_meals_schema = ParticipantMealsOnEventSchema(many=True)
+        participant_meals = fetch_rows(
+            select(*load_only_columns(ParticipantMealsOnEvent, participant_meals_schema.fields))
             .join(MealsOnEvent)
-            .filter(
+            .where(
                 ParticipantMealsOnEvent.participant_id == participant_id,
                 MealsOnEvent.event_id == event_id
             )
-            .all()
         )
 
-        participant_meals_schema = ParticipantMealsOnEventSchema(many=True)
         participant_meals_data = participant_meals_schema.dump(participant_meals)
         return jsonify(participant_meals_data), 200
 
@@ -380,15 +589,92 @@ class ParticipantMealsOnEventView(MethodView):
 
                 db.session.add(new_participant_meal)
                 created_meals.append(new_participant_meal)
+            # Serialized before the commit expires the rows, which would reload each with its own SELECT.
+            db.session.flush()
+            participant_meals_data = ParticipantMealsOnEventSchema(many=True).dump(created_meals)
         logger.info("Meals created successfully")
         return jsonify({
             "message": "Participant meals added successfully",
-            "participant_meals": ParticipantMealsOnEventSchema(many=True).dump(created_meals)
+            "participant_meals": participant_meals_data
         }), 201
 
 
+class EventMealPlansView(MethodView):
+    @jwt_required()
+    @validate_request(BulkParticipantMealsPatchSchema(), max_items=BULK_MAX_IDS)
+    def patch(self, event_id, param):
+        """
+        Applies one patch to many meal plans of the event, selected by ``ids`` or ``filter``, in one statement.
+        """
+        values = param.pop('patch')
+        if 'meal_id' in values:
+            meal_on_event = db.session.scalar(
+                select(MealsOnEvent.id).where(MealsOnEvent.id == values['meal_id'], MealsOnEvent.event_id == event_id)
+            )
+            if meal_on_event is None:
+                return jsonify({"errors": {"patch": {"meal_id": ["Meal is not part of this event."]}}}), 400
+
+        with commit_section():
+            updated_ids = bulk_update_participant_meals(event_id, param, values)
+        logger.info("Updated %d participant meals in event %s", len(updated_ids), event_id)
+
+        return jsonify({
+            "message": "Participant meals updated successfully",
+            "updated": len(updated_ids),
+            "ids": updated_ids
+        }), 200
+
+    @jwt_required()
+    @validate_request(BulkParticipantMealsDeleteSchema(), max_items=BULK_MAX_IDS)
+    def delete(self, event_id, param):
+        """
+        Deletes many meal plans of the event, selected by ``ids`` or ``filter``, in one statement.
+        """
+        with commit_section():
+            deleted_ids = bulk_delete_participant_meals(event_id, param)
+        logger.info("Deleted %d participant meals from event %s", len(deleted_ids), event_id)
+
+        return jsonify({
+            "message": "Participant meals deleted successfully",
+            "deleted": len(deleted_ids),
+            "ids": deleted_ids
+        }), 200
+
+
+class GenerateMealPlansView(MethodView):
+    @jwt_required()
+    @validate_request(GenerateMealPlansSchema())
+    def post(self, event_id, param):
+        logger.debug("Generating default meal plans for event %s with params: %s", event_id, param)
+        Event.query.get_or_404(event_id)
+
+        if param['background'] and not param['dry_run']:
+            with commit_section():
+                job = enqueue('generate_meal_plans', event_id=event_id)
+            logger.info("Meal plan generation for event %s scheduled as job %s", event_id, job.id)
+            return jsonify({"message": "Default meal plan generation scheduled", "job_id": job.id}), 202
+
+        if param['dry_run']:
+            per_meal = generate_default_meal_plans(event_id, dry_run=True)
+            db.session.rollback()
+        else:
+            with commit_section():
+                per_meal = generate_default_meal_plans(event_id)
+
+        created = sum(count for _, count in per_meal)
+        logger.info("Default meal plans for event %s: %s (dry run: %s)", event_id, created, param['dry_run'])
+
+        return jsonify({
+            "message": "Default meal plans previewed" if param['dry_run'] else "Default meal plans generated",
+            "dry_run": param['dry_run'],
+            "created": created,
+            "per_meal": [{"meal_id": meal_id, "count": count} for meal_id, count in per_meal]
+        }), 200 if param['dry_run'] else 201
+
+
 class ParticipantMealOnEventDetailView(MethodView):
     @jwt_required()
+    @read_only()
     def get(self, event_id, participant_meal_id):
         participant_meal = ParticipantMealsOnEvent.query.filter_by(
             id=participant_meal_id
@@ -396,26 +682,23 @@ class ParticipantMealOnEventDetailView(MethodView):
 
         participant_meal_schema = ParticipantMealsOnEventSchema()
         participant_meal_data = participant_meal_schema.dump(participant_meal)
-        return jsonify(participant_meal_data), 200
+        return with_etag((jsonify(participant_meal_data), 200), participant_meal.version)
 
     @jwt_required()
     @validate_request(ParticipantMealsOnEventSchema())
     def patch(self, event_id, participant_meal_id, param):
         logger.debug("Updating meals")
-        participant_meal = ParticipantMealsOnEvent.query.filter_by(
-            id=participant_meal_id
-        ).first_or_404()
-
-        for key, value in param.items():
-            setattr(participant_meal, key, value)
 
         with commit_section():
-            db.session.add(participant_meal)
+            participant_meal = update_versioned(
+                ParticipantMealsOnEvent, [ParticipantMealsOnEvent.id == participant_meal_id], param
+            )
+            participant_meal_data = ParticipantMealsOnEventSchema().dump(participant_meal)
         logger.info("Participant meal updated successfully")
-        return jsonify({
+        return with_etag((jsonify({
             "message": "Participant meal updated successfully",
-            "participant_meal": ParticipantMealsOnEventSchema().dump(participant_meal)
-        }), 200
+            "participant_meal": participant_meal_data
+        }), 200), participant_meal.version)
 
     @jwt_required()
     def delete(self, event_id, participant_meal_id):
@@ -423,6 +706,7 @@ class ParticipantMealOnEventDetailView(MethodView):
         participant_meal = ParticipantMealsOnEvent.query.filter_by(
             id=participant_meal_id
         ).first_or_404()
+        check_version(participant_meal)
 
         with commit_section():
             db.session.delete(participant_meal)
@@ -433,6 +717,11 @@ class ParticipantMealOnEventDetailView(MethodView):
 
 
 events_bp = Blueprint('events', __name__)
+events_bp.url_value_preprocessor(route_by_event_id)
+events_bp.register_error_handler(EventMoved, handle_event_moved)
+events_bp.register_error_handler(VersionConflict, handle_version_conflict)
+events_bp.register_error_handler(StaleDataError, handle_version_conflict)
+events_bp.register_error_handler(PreconditionRequired, handle_precondition_required)
 
 events_bp.add_url_rule('/events', view_func=EventsView.as_view('events_view'))
 events_bp.add_url_rule('/participants', view_func=ParticipantsView.as_view('participants_view'))
@@ -440,6 +729,9 @@ events_bp.add_url_rule(
     '/events/<int:event_id>/participants', view_func=EventParticipantsView.as_view('event_participants_view')
 )
 events_bp.add_url_rule('/events/<int:event_id>', view_func=EventView.as_view('event_view'))
+events_bp.add_url_rule('/events/<int:event_id>/attendance', view_func=EventAttendanceView.as_view('event_attendance_view'))
+events_bp.add_url_rule('/events/<int:event_id>/clone', view_func=EventCloneView.as_view('event_clone_view'))
+events_bp.add_url_rule('/event-templates', view_func=EventTemplatesView.as_view('event_templates_view'))
 events_bp.add_url_rule(
     '/participants/<int:participant_id>',
     view_func=ParticipantView.as_view('participant_view')
@@ -452,10 +744,19 @@ events_bp.add_url_rule(
     '/participants/<int:participant_id>/upcoming-events',
     view_func=ParticipantUpcomingEventsView.as_view('participant_upcoming_events')
 )
+events_bp.add_url_rule('/events/calendar', view_func=EventsCalendarView.as_view('events_calendar_view'))
+events_bp.add_url_rule(
+    '/participants/<int:participant_id>/availability',
+    view_func=ParticipantAvailabilityView.as_view('participant_availability_view')
+)
 events_bp.add_url_rule('/events/<int:event_id>/meals',
                        view_func=MealsOnEventView.as_view('meals_on_event_view'))
 events_bp.add_url_rule('/events/<int:event_id>/meals/<int:meal_id>',
                        view_func=MealOnEventDetailView.as_view('meal_on_event_detail_view'))
+events_bp.add_url_rule('/events/<int:event_id>/meal-plans',
+                       view_func=EventMealPlansView.as_view('event_meal_plans_view'))
+events_bp.add_url_rule('/events/<int:event_id>/meal-plans/generate',
+                       view_func=GenerateMealPlansView.as_view('generate_meal_plans_view'))
 events_bp.add_url_rule('/events/<int:event_id>/participants/<int:participant_id>/meals',
                        view_func=ParticipantMealsOnEventView.as_view('participant_meals_on_event_view'))
 events_bp.add_url_rule('/events/<int:event_id>/participants/<int:participant_id>/meals/<int:participant_meal_id>',
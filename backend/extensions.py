@@ -2,6 +2,10 @@ from flask_jwt_extended import JWTManager
 from flask_marshmallow import Marshmallow
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from backend.sharding.session import RoutingSession
+from backend.util.admission import AdmissionControl
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 ma = Marshmallow()
 jwt = JWTManager()
+admission = AdmissionControl()
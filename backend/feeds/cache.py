@@ -0,0 +1,252 @@
+"""
+Cache of rendered calendar feeds, and its invalidation.
+
+A feed is cached under ``<kind>:<id>`` with its ``ETag`` and ``Last-Modified``, so a poll is answered -
+usually with ``304`` - from the cache alone. Feeds live in Redis when ``FEED_CACHE_URL`` is set, shared by
+all workers, and in process memory otherwise or while Redis is unreachable; there, writes made by other
+processes only show once the entry expires after ``FEED_CACHE_LOCAL_SECONDS``.
+
+Every key has a generation. Writes that change a feed - its event, or the participant's enrolments and
+their events - are recorded in the session and bump the generations after the transaction commits, which
+drops the entries. A feed rendered from a snapshot older than the commit is not stored, as the generation
+it read before its queries no longer matches.
+
+ORM flushes of events, enrolments and participants are tracked automatically; code changing them with
+``UPDATE``/``DELETE`` statements calls ``invalidate_event_feeds`` or ``invalidate_participant_feeds``.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from backend.events.models import Event, EventParticipant, Participant
+from backend.extensions import db
+
+logger = logging.getLogger(__name__)
+
+CachedFeed = namedtuple('CachedFeed', 'etag last_modified body')
+
+STORE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'etag', ARGV[2], 'last_modified', ARGV[3], 'body', ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+
+def feed_key(kind, feed_id):
+    return f'{kind}:{feed_id}'
+
+
+class LocalFeedStore:
+    """
+    Feeds of this process, bounded to ``max_entries`` least recently used ones.
+    """
+
+    def __init__(self, max_entries):
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires, feed = item
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return feed
+
+    def generation(self, key):
+        return self._generations.get(key, 0)
+
+    def put(self, key, generation, feed, ttl):
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, feed)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        with self._lock:
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+
+class RedisFeedStore:
+    """
+    Feeds shared by all workers; an entry is only stored while its generation is the one read before
+    rendering it, checked atomically by a Lua script.
+    """
+
+    def __init__(self, url, generation_ttl, key_prefix='feeds:'):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._store = self._client.register_script(STORE_SCRIPT)
+        self._generation_ttl = generation_ttl
+        self._key_prefix = key_prefix
+        self.error = redis.RedisError
+
+    def _keys(self, key):
+        return self._key_prefix + key, f'{self._key_prefix}gen:{key}'
+
+    def get(self, key):
+        etag, last_modified, body = self._client.hmget(self._keys(key)[0], 'etag', 'last_modified', 'body')
+        if body is None:
+            return None
+        return CachedFeed(
+            etag.decode(),
+            datetime.fromtimestamp(int(last_modified), timezone.utc) if last_modified else None,
+            body.decode(),
+        )
+
+    def generation(self, key):
+        return int(self._client.get(self._keys(key)[1]) or 0)
+
+    def put(self, key, generation, feed, ttl):
+        last_modified = int(feed.last_modified.timestamp()) if feed.last_modified else ''
+        self._store(keys=self._keys(key), args=[generation, feed.etag, last_modified, feed.body, ttl])
+
+    def invalidate(self, keys):
+        with self._client.pipeline() as pipe:
+            for key in keys:
+                entry_key, generation_key = self._keys(key)
+                pipe.incr(generation_key)
+                # Outlives any render that read the old generation.
+                pipe.expire(generation_key, self._generation_ttl)
+                pipe.delete(entry_key)
+            pipe.execute()
+
+
+class FeedCache:
+    def __init__(self, config):
+        self._config = config
+        self._local = LocalFeedStore(config['FEED_CACHE_LOCAL_MAX_ENTRIES'])
+        self._shared = None
+        self._shared_down_until = 0
+        if config['FEED_CACHE_URL']:
+            self._shared = RedisFeedStore(config['FEED_CACHE_URL'], config['FEED_CACHE_SECONDS'])
+
+    def _call(self, method, *args):
+        if self._shared is not None and time.monotonic() >= self._shared_down_until:
+            try:
+                return getattr(self._shared, method)(*args)
+            except self._shared.error:
+                logger.warning('Feed cache unavailable, using the local cache')
+                self._shared_down_until = time.monotonic() + self._config['FEED_CACHE_RETRY_SECONDS']
+        if method == 'put':
+            key, generation, feed, ttl = args
+            args = key, generation, feed, min(ttl, self._config['FEED_CACHE_LOCAL_SECONDS'])
+        return getattr(self._local, method)(*args)
+
+    def get(self, key):
+        return self._call('get', key)
+
+    def generation(self, key):
+        return self._call('generation', key)
+
+    def put(self, key, generation, feed, ttl):
+        """
+        Stores a feed unless its key was invalidated since ``generation`` was read.
+
+        Args:
+            ttl (int): Seconds the feed may be served, at most ``FEED_CACHE_SECONDS``.
+        """
+        self._call('put', key, generation, feed, max(1, min(int(ttl), self._config['FEED_CACHE_SECONDS'])))
+
+    def invalidate(self, keys):
+        # The local entries too: they may have been stored while Redis was unreachable.
+        self._local.invalidate(keys)
+        if self._shared is not None:
+            try:
+                self._shared.invalidate(keys)
+            except self._shared.error:
+                logger.warning('Feed cache unavailable, %d feeds were not invalidated', len(keys))
+
+
+def feed_cache():
+    """
+    Returns the app's feed cache, creating it on first use so processes that never serve a feed do not
+    import redis.
+    """
+    cache = current_app.extensions.get('feed_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('feed_cache', FeedCache(current_app.config))
+    return cache
+
+
+def _pending(session):
+    return session.info.setdefault('feed_invalidations', {'participant': set(), 'event': set()})
+
+
+def invalidate_participant_feeds(participant_ids):
+    """
+    Drops the cached feeds of participants once the session's transaction commits.
+    """
+    _pending(db.session())['participant'].update(participant_ids)
+
+
+def _invalidate_event_feeds(session, event_ids):
+    pending = _pending(session)
+    pending['event'].update(event_ids)
+    pending['participant'].update(session.scalars(
+        select(EventParticipant.participant_id).where(EventParticipant.event_id.in_(event_ids)).distinct()
+    ))
+
+
+def invalidate_event_feeds(event_ids):
+    """
+    Drops the cached feeds of events, and of the participants enrolled in them, once the session's
+    transaction commits. Must be called before the enrolments are deleted, in the same transaction.
+    """
+    event_ids = list(event_ids)
+    if event_ids:
+        _invalidate_event_feeds(db.session(), event_ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_changes(session, flush_context):
+    participant_ids = set()
+    event_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, EventParticipant):
+            participant_ids.add(obj.participant_id)
+        elif isinstance(obj, Participant) and obj not in session.new:
+            participant_ids.add(obj.id)
+        elif isinstance(obj, Event) and obj not in session.new:
+            event_ids.add(obj.id)
+    if participant_ids:
+        _pending(session)['participant'].update(participant_ids)
+    if event_ids:
+        _invalidate_event_feeds(session, event_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    pending = session.info.pop('feed_invalidations', None)
+    if pending and (pending['participant'] or pending['event']):
+        feed_cache().invalidate([
+            feed_key(kind, feed_id) for kind, feed_ids in pending.items() for feed_id in feed_ids
+        ])
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('feed_invalidations', None)
@@ -0,0 +1,90 @@
+"""
+iCalendar (RFC 5545) rendering of events.
+
+The output only depends on the events' columns - ``DTSTAMP`` is the last modification, not the time of
+rendering - so a feed renders to the same bytes until one of its events changes, and its validators can be
+computed from the rows alone.
+"""
+from datetime import timedelta, timezone
+
+PRODID = '-//Events//Calendar feed//EN'
+# Content lines longer than this many octets are folded.
+LINE_OCTETS = 75
+
+
+def _escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    encoded = line.encode('utf-8')
+    if len(encoded) <= LINE_OCTETS:
+        return line
+    parts = []
+    start = 0
+    limit = LINE_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a UTF-8 sequence: continuation bytes are 0b10xxxxxx.
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode('utf-8'))
+        start = end
+        # Continuation lines start with a space, which counts towards their length.
+        limit = LINE_OCTETS - 1
+    return '\r\n '.join(parts)
+
+
+def _utc(value):
+    # Event dates are stored as naive UTC.
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def last_modified(event):
+    """
+    When an event last changed, in UTC. Its audit columns are naive local time of the app server.
+    """
+    return (event.update_date or event.creation_date).astimezone(timezone.utc)
+
+
+def render_calendar(name, events, uid_domain):
+    """
+    Renders events as an iCalendar document, one ``VEVENT`` per event spanning its days.
+
+    Args:
+        name (str): Calendar name shown by clients.
+        events (list): ``Event`` instances.
+        uid_domain (str): Domain part of the events' ``UID``, which must stay the same across renders.
+
+    Returns:
+        str: The document, with CRLF line endings.
+    """
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name)}',
+    ]
+    for event in events:
+        modified = _utc(last_modified(event))
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:event-{event.id}@{uid_domain}',
+            f'DTSTAMP:{modified}',
+            f'LAST-MODIFIED:{modified}',
+            f'SEQUENCE:{event.version - 1}',
+            f'DTSTART:{_utc(event.date)}',
+            f'DTEND:{_utc(event.date + timedelta(days=event.duration))}',
+            f'SUMMARY:{_escape(event.name)}',
+            f'LOCATION:{_escape(event.location)}',
+        ]
+        if event.description:
+            lines.append(f'DESCRIPTION:{_escape(event.description)}')
+        lines.append('END:VEVENT')
+    lines.append('END:VCALENDAR')
+    return ''.join(_fold(line) + '\r\n' for line in lines)
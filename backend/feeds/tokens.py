@@ -0,0 +1,32 @@
+from flask import current_app
+from itsdangerous import URLSafeSerializer, BadSignature
+
+FEED_SALT = 'calendar-feed'
+FEED_KINDS = ('participant', 'event')
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=FEED_SALT)
+
+
+def make_feed_token(kind, feed_id):
+    """
+    Signs a feed into the token of its subscription URL; calendar clients cannot send a JWT.
+    """
+    return _serializer().dumps([kind, feed_id])
+
+
+def read_feed_token(token):
+    """
+    Verifies a feed token without touching the database.
+
+    Returns:
+        tuple: ``(kind, feed_id)``, or None if the signature is invalid.
+    """
+    try:
+        kind, feed_id = _serializer().loads(token)
+    except (BadSignature, TypeError, ValueError):
+        return None
+    if kind not in FEED_KINDS or not isinstance(feed_id, int):
+        return None
+    return kind, feed_id
@@ -0,0 +1,115 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request, url_for
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+
+from backend.events.db_utils import get_events_in_window
+from backend.events.models import Event, Participant
+from backend.extensions import db
+from backend.sharding.routing import handle_event_moved, route_by_event_id, route_to_event
+from backend.sharding.session import EventMoved
+from backend.util.db import read_only
+from .cache import CachedFeed, feed_cache, feed_key
+from .ical import last_modified, render_calendar
+from .tokens import make_feed_token, read_feed_token
+
+logger = logging.getLogger(__name__)
+
+
+def _feed_url(kind, feed_id):
+    return url_for('feeds.calendar_feed', token=make_feed_token(kind, feed_id), _external=True)
+
+
+def _render(name, events):
+    """
+    Renders a feed with validators derived from its events' ids, versions and modification times.
+    """
+    stamps = [(event.id, event.version, last_modified(event).isoformat()) for event in events]
+    modified = max((last_modified(event) for event in events), default=None)
+    return CachedFeed(
+        etag=hashlib.sha1(repr(stamps).encode()).hexdigest()[:24],
+        last_modified=modified,
+        body=render_calendar(name, events, current_app.config['FEED_UID_DOMAIN']),
+    )
+
+
+def _participant_feed(participant_id):
+    """
+    Returns the participant's upcoming events feed, and how many seconds it stays valid: until its first
+    event ends and drops out of it.
+    """
+    if db.session.get(Participant, participant_id) is None:
+        abort(404)
+    now = datetime.now(timezone.utc)
+    events = get_events_in_window(now, None, participant_id=participant_id)
+
+    ttl = current_app.config['FEED_CACHE_SECONDS']
+    if events:
+        first_end = min(event.date + timedelta(days=event.duration) for event in events)
+        ttl = min(ttl, (first_end - now.replace(tzinfo=None)).total_seconds())
+    return _render('Upcoming events', events), ttl
+
+
+def _event_feed(event_id):
+    route_to_event(event_id)
+    event = Event.query.filter_by(id=event_id, is_template=False).first_or_404()
+    return _render(event.name, [event]), current_app.config['FEED_CACHE_SECONDS']
+
+
+FEED_BUILDERS = {'participant': _participant_feed, 'event': _event_feed}
+
+
+class CalendarFeedView(MethodView):
+    @read_only()
+    def get(self, token):
+        feed = read_feed_token(token)
+        if feed is None:
+            abort(404)
+
+        kind, feed_id = feed
+        key = feed_key(kind, feed_id)
+        cache = feed_cache()
+        cached = cache.get(key)
+        if cached is None:
+            # Read before querying: a change committed meanwhile bumps it, and the stale feed is not stored.
+            generation = cache.generation(key)
+            cached, ttl = FEED_BUILDERS[kind](feed_id)
+            cache.put(key, generation, cached, ttl)
+            logger.debug("Feed %s rendered", key)
+
+        response = Response(cached.body, mimetype='text/calendar')
+        response.set_etag(cached.etag)
+        response.last_modified = cached.last_modified
+        # Clients may keep the feed but must revalidate it, which costs us a cache lookup.
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+
+class ParticipantFeedUrlView(MethodView):
+    @jwt_required()
+    @read_only()
+    def get(self, participant_id):
+        Participant.query.get_or_404(participant_id)
+        return jsonify({"url": _feed_url('participant', participant_id)}), 200
+
+
+class EventFeedUrlView(MethodView):
+    @jwt_required()
+    @read_only()
+    def get(self, event_id):
+        Event.query.filter_by(id=event_id, is_template=False).first_or_404()
+        return jsonify({"url": _feed_url('event', event_id)}), 200
+
+
+feeds_bp = Blueprint('feeds', __name__)
+feeds_bp.url_value_preprocessor(route_by_event_id)
+feeds_bp.register_error_handler(EventMoved, handle_event_moved)
+feeds_bp.add_url_rule('/<token>.ics', view_func=CalendarFeedView.as_view('calendar_feed'))
+feeds_bp.add_url_rule(
+    '/participants/<int:participant_id>', view_func=ParticipantFeedUrlView.as_view('participant_feed_url_view')
+)
+feeds_bp.add_url_rule('/events/<int:event_id>', view_func=EventFeedUrlView.as_view('event_feed_url_view'))
@@ -0,0 +1,17 @@
+import click
+from flask.cli import AppGroup
+
+from .history import refresh_history
+from .rates import load_rates
+
+forecast_cli = AppGroup('forecast', help='Catering forecasts.')
+
+
+@forecast_cli.command('refresh')
+def run_refresh():
+    """Add the events finished since the last refresh to the catering history."""
+    added = refresh_history()
+    rates = load_rates()
+    click.echo(f'Added {added} events; rates fitted to {rates.events} events')
+    for day, rate in enumerate(rates.day_rates, start=1):
+        click.echo(f'day {day}: {rate:.3f}')
@@ -0,0 +1,100 @@
+"""
+Catering history: per finished event, the meals planned and the meals eaten by participants who were
+there, learned from check-ins.
+
+A planned meal counts as served when its participant checked in before the end of the meal's day, so late
+arrivals and no-shows lower the served share of a day; events without any check-in say nothing about
+attendance and are left out. Only events missing from ``catering_history`` are aggregated, from the hot
+tables or the archive tables of every shard, so a refresh costs as much as the events finished since the
+last one.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import ARRAY, Integer, and_, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.archive.models import ArchivedEvent, ArchivedEventParticipant, ArchivedMealsOnEvent, \
+    ArchivedParticipantMealsOnEvent
+from backend.events.models import Event, EventParticipant, MealsOnEvent, ParticipantMealsOnEvent
+from backend.extensions import db
+from backend.sharding.routing import scatter
+from backend.util.db import commit_section
+from .models import CateringHistory
+
+logger = logging.getLogger(__name__)
+
+REFRESH_BATCH_SIZE = 500
+
+HOT_TABLES = (Event, EventParticipant, MealsOnEvent, ParticipantMealsOnEvent)
+ARCHIVE_TABLES = (ArchivedEvent, ArchivedEventParticipant, ArchivedMealsOnEvent, ArchivedParticipantMealsOnEvent)
+
+
+def _finished_event_ids(tables, now):
+    event, *_ = tables
+    stmt = select(event.id).where(event.is_template.is_(False))
+    if event is Event:
+        stmt = stmt.where(func.upper(Event.period) < now)
+    return db.session.scalars(stmt).all()
+
+
+def _aggregate(tables, event_ids):
+    event, event_participant, meal, participant_meal = tables
+    ids = bindparam(None, event_ids, type_=ARRAY(Integer))
+    meal_type = func.lower(meal.meal_type)
+    day_end = event.date + func.make_interval(0, 0, 0, participant_meal.day)
+    checked_in_events = (
+        select(event_participant.event_id)
+        .where(event_participant.event_id == any_(ids), event_participant.checked_in_at.is_not(None))
+    )
+    stmt = (
+        select(
+            meal.event_id, participant_meal.day, meal_type.label('meal_type'), meal.is_vegetarian,
+            event.date.label('event_date'),
+            func.count().label('planned'),
+            func.count().filter(event_participant.checked_in_at < day_end).label('served'),
+        )
+        .select_from(participant_meal)
+        .join(meal, meal.id == participant_meal.meal_id)
+        .join(event, event.id == meal.event_id)
+        .outerjoin(event_participant, and_(
+            event_participant.event_id == meal.event_id,
+            event_participant.participant_id == participant_meal.participant_id,
+        ))
+        .where(meal.event_id.in_(checked_in_events))
+        .group_by(meal.event_id, participant_meal.day, meal_type, meal.is_vegetarian, event.date)
+    )
+    return [row._asdict() for row in db.session.execute(stmt)]
+
+
+def _shard_history(known_ids, now):
+    rows = []
+    for tables in (HOT_TABLES, ARCHIVE_TABLES):
+        new_ids = [event_id for event_id in _finished_event_ids(tables, now) if event_id not in known_ids]
+        for start in range(0, len(new_ids), REFRESH_BATCH_SIZE):
+            rows.extend(_aggregate(tables, new_ids[start:start + REFRESH_BATCH_SIZE]))
+    db.session.commit()
+    return rows
+
+
+def refresh_history():
+    """
+    Adds the finished events missing from ``catering_history``. Concurrent refreshes may aggregate the same
+    events; rows another refresh added meanwhile are skipped.
+
+    Returns:
+        int: Number of events added.
+    """
+    known_ids = set(db.session.scalars(select(CateringHistory.event_id).distinct()))
+    now = datetime.utcnow()
+    rows = [row for shard_rows in scatter(lambda: _shard_history(known_ids, now)).values() for row in shard_rows]
+
+    stmt = insert(CateringHistory).on_conflict_do_nothing().returning(CateringHistory.event_id)
+    added_ids = []
+    with commit_section():
+        for start in range(0, len(rows), REFRESH_BATCH_SIZE):
+            added_ids.extend(db.session.scalars(stmt, rows[start:start + REFRESH_BATCH_SIZE]))
+
+    added = len(set(added_ids))
+    logger.info("Catering history refreshed: %d events added (%d rows)", added, len(added_ids))
+    return added
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Boolean, Unicode, DateTime, func
+
+from backend.extensions import db
+
+
+class CateringHistory(db.Model):
+    """
+    Planned and served meals of one finished event, per day, meal type and vegetarian meals. Kept on the
+    primary database, so it outlives the event's rows once they are archived and purged.
+    """
+    __tablename__ = 'catering_history'
+
+    event_id = Column(Integer, primary_key=True, autoincrement=False)
+    day = Column(Integer, primary_key=True, autoincrement=False)
+    meal_type = Column(Unicode(50), primary_key=True)
+    is_vegetarian = Column(Boolean, primary_key=True)
+    event_date = Column(DateTime, nullable=False)
+    planned = Column(Integer, nullable=False)
+    served = Column(Integer, nullable=False)
+    refreshed_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
@@ -0,0 +1,142 @@
+"""
+Attendance rates learned from the catering history, and the catering forecast of an event.
+
+The rate of a cell - day of the event, meal type, vegetarian meals or not - is its served share of planned
+meals over all past events, recent events weighing more (``FORECAST_HALF_LIFE_DAYS``). Sparse cells are
+pulled towards the rate of their day and days towards the overall rate, each by ``FORECAST_PRIOR_WEIGHT``
+meals, so a meal type seen at a few events does not get an extreme rate. Days after
+``FORECAST_MAX_DAY`` share the rate of that day.
+
+The whole history is loaded column-wise in one query and summed with NumPy; the fitted rates are kept per
+process until the history changes. NumPy is imported lazily so only processes that forecast load it.
+"""
+import math
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from backend.extensions import db
+from backend.events.models import MealsOnEvent, ParticipantMealsOnEvent
+from .models import CateringHistory
+
+_cache_lock = threading.Lock()
+_cache = {}
+
+
+class AttendanceRates:
+    """
+    Fitted rates, looked up by day, meal type and vegetarian meals.
+    """
+
+    def __init__(self, meal_types, cell_rates, day_rates, overall_rate, events):
+        self.meal_types = {meal_type: index for index, meal_type in enumerate(meal_types)}
+        self.cell_rates = cell_rates
+        self.day_rates = day_rates
+        self.overall_rate = overall_rate
+        self.events = events
+
+    def rate(self, day, meal_type, is_vegetarian):
+        day_index = min(max(day, 1), len(self.day_rates)) - 1
+        type_index = self.meal_types.get(meal_type.lower())
+        if type_index is None:
+            return float(self.day_rates[day_index])
+        return float(self.cell_rates[day_index, type_index, int(bool(is_vegetarian))])
+
+
+def fit_rates(event_ids, days, meal_types, is_vegetarian, event_dates, planned, served, now, max_day, prior_weight,
+              half_life_days):
+    """
+    Fits attendance rates to history rows given column-wise.
+
+    Args:
+        event_ids, days, meal_types, is_vegetarian, event_dates, planned, served: The history columns.
+        now (datetime): Time the event ages are counted to.
+        max_day (int): Last day with rates of its own.
+        prior_weight (float): Meals of the coarser rate added to every cell.
+        half_life_days (float): Age at which an event weighs half.
+
+    Returns:
+        AttendanceRates: The rates.
+    """
+    import numpy as np
+
+    types, type_index = np.unique(np.asarray(meal_types, dtype=object), return_inverse=True)
+    event_ages = (np.datetime64(now, 's') - np.asarray(event_dates, dtype='datetime64[s]')) / np.timedelta64(1, 'D')
+    weights = 0.5 ** (np.maximum(event_ages, 0) / half_life_days)
+    planned = np.asarray(planned, dtype=float) * weights
+    served = np.asarray(served, dtype=float) * weights
+
+    shape = (max_day, len(types), 2)
+    cells = np.ravel_multi_index(
+        (np.clip(np.asarray(days, dtype=int), 1, max_day) - 1, type_index, np.asarray(is_vegetarian, dtype=int)), shape
+    )
+    cell_planned = np.bincount(cells, planned, minlength=math.prod(shape)).reshape(shape)
+    cell_served = np.bincount(cells, served, minlength=math.prod(shape)).reshape(shape)
+
+    overall_rate = cell_served.sum() / cell_planned.sum() if cell_planned.sum() > 0 else 1.0
+    day_rates = (cell_served.sum(axis=(1, 2)) + prior_weight * overall_rate) / (
+        cell_planned.sum(axis=(1, 2)) + prior_weight
+    )
+    cell_rates = (cell_served + prior_weight * day_rates[:, None, None]) / (cell_planned + prior_weight)
+    return AttendanceRates(
+        types.tolist(), np.clip(cell_rates, 0, 1), np.clip(day_rates, 0, 1), overall_rate, len(np.unique(event_ids)),
+    )
+
+
+def load_rates():
+    """
+    Returns the rates fitted to the current catering history, fitting them again when it changed.
+    """
+    config = current_app.config
+    settings = (config['FORECAST_MAX_DAY'], config['FORECAST_PRIOR_WEIGHT'], config['FORECAST_HALF_LIFE_DAYS'])
+    # Refreshes only ever add rows, so the latest refresh identifies the history.
+    stamp = (db.session.scalar(select(func.max(CateringHistory.refreshed_at))), *settings)
+
+    with _cache_lock:
+        cached = _cache.get(current_app.name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        rows = db.session.execute(select(
+            CateringHistory.event_id, CateringHistory.day, CateringHistory.meal_type, CateringHistory.is_vegetarian,
+            CateringHistory.event_date, CateringHistory.planned, CateringHistory.served,
+        )).all()
+        columns = zip(*rows) if rows else [()] * 7
+        rates = fit_rates(*columns, datetime.utcnow(), *settings)
+        _cache[current_app.name] = (stamp, rates)
+        return rates
+
+
+def forecast_event(event_id, rates):
+    """
+    Forecasts the meals to order for an event from its meal plans.
+
+    Returns:
+        list: Per meal and day, the planned count, the attendance rate and the predicted quantity.
+    """
+    stmt = (
+        select(
+            MealsOnEvent.id, MealsOnEvent.name, MealsOnEvent.meal_type, MealsOnEvent.is_vegetarian,
+            ParticipantMealsOnEvent.day, func.count(ParticipantMealsOnEvent.id),
+        )
+        .join(ParticipantMealsOnEvent, ParticipantMealsOnEvent.meal_id == MealsOnEvent.id)
+        .where(MealsOnEvent.event_id == event_id)
+        .group_by(MealsOnEvent.id, ParticipantMealsOnEvent.day)
+        .order_by(ParticipantMealsOnEvent.day, MealsOnEvent.id)
+    )
+    forecast = []
+    for meal_id, name, meal_type, is_vegetarian, day, planned in db.session.execute(stmt):
+        rate = rates.rate(day, meal_type, is_vegetarian)
+        forecast.append({
+            "meal_id": meal_id,
+            "name": name,
+            "meal_type": meal_type,
+            "is_vegetarian": is_vegetarian,
+            "day": day,
+            "planned": planned,
+            "attendance_rate": round(rate, 3),
+            "predicted": math.ceil(planned * rate - 1e-9),
+        })
+    return forecast
@@ -0,0 +1,36 @@
+import logging
+from flask import Blueprint, jsonify
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+
+from backend.events.models import Event
+from backend.sharding.routing import handle_event_moved, route_by_event_id
+from backend.sharding.session import EventMoved
+from backend.util.db import read_only
+from .rates import forecast_event, load_rates
+
+logger = logging.getLogger(__name__)
+
+
+class EventCateringForecastView(MethodView):
+    @jwt_required()
+    @read_only()
+    def get(self, event_id):
+        Event.query.get_or_404(event_id)
+        rates = load_rates()
+        forecast = forecast_event(event_id, rates)
+
+        return jsonify({
+            "history_events": rates.events,
+            "meals": forecast,
+            "planned": sum(meal['planned'] for meal in forecast),
+            "predicted": sum(meal['predicted'] for meal in forecast)
+        }), 200
+
+
+forecasting_bp = Blueprint('forecasting', __name__)
+forecasting_bp.url_value_preprocessor(route_by_event_id)
+forecasting_bp.register_error_handler(EventMoved, handle_event_moved)
+forecasting_bp.add_url_rule(
+    '/events/<int:event_id>', view_func=EventCateringForecastView.as_view('event_catering_forecast_view')
+)
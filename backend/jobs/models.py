@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, Unicode, UnicodeText, DateTime, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from backend.util.db import PkColumn, CreateModifyMixin
+from backend.extensions import db
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class Job(db.Model, CreateModifyMixin):
+    __tablename__ = 'jobs'
+
+    id = PkColumn('jobs_id_seq')
+    type = Column(Unicode(100), nullable=False)
+    status = Column(Unicode(20), nullable=False, default=QUEUED)
+    payload = Column(JSONB, nullable=False, default=dict)
+    result = Column(JSONB, nullable=True)
+    error = Column(UnicodeText, nullable=True)
+    progress = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, server_default=func.now())
+    locked_by = Column(Unicode(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Workers only ever look for queued jobs by type, oldest first.
+        Index('ix_jobs_queued', 'type', 'id', postgresql_where=text("status = 'queued'")),
+        Index('ix_jobs_running', 'type', postgresql_where=text("status = 'running'")),
+    )
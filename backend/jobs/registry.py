@@ -0,0 +1,62 @@
+import importlib
+
+from backend.extensions import db
+from .models import Job
+
+JOB_TYPES = {}
+
+# Modules that define job types. Web processes import them with their views, job workers with
+# ``load_job_types``.
+JOB_MODULES = ('backend.events.jobs', 'backend.notifications.jobs')
+
+
+class JobType:
+    def __init__(self, name, fn, max_attempts, concurrency, timeout):
+        self.name = name
+        self.fn = fn
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+
+def job(name, max_attempts=3, concurrency=2, timeout=3600):
+    """
+    Registers a function as a background job type.
+
+    The function is called as ``fn(ctx, **payload)`` inside an app context, where ``ctx`` is the
+    worker's ``JobContext``; its return value must be JSON serializable and is stored as the result.
+
+    Args:
+        name (str): Job type name used by ``enqueue``.
+        max_attempts (int): How many times a failing job is tried before it is marked failed.
+        concurrency (int): Maximum number of jobs of this type running at once, across all workers.
+        timeout (int): Seconds without a heartbeat after which a running job is considered lost; the worker
+            renews it several times per timeout while the job runs.
+    """
+    def decorator(fn):
+        JOB_TYPES[name] = JobType(name, fn, max_attempts, concurrency, timeout)
+        return fn
+    return decorator
+
+
+def load_job_types():
+    """
+    Imports the modules in ``JOB_MODULES``, registering their job types.
+    """
+    for module_name in JOB_MODULES:
+        importlib.import_module(module_name)
+    return JOB_TYPES
+
+
+def enqueue(name, **payload):
+    """
+    Adds a job to the queue in the current transaction, so it only becomes visible to workers once
+    the caller commits.
+
+    Returns:
+        Job: The new job, with its id assigned.
+    """
+    new_job = Job(type=name, payload=payload, max_attempts=JOB_TYPES[name].max_attempts)
+    db.session.add(new_job)
+    db.session.flush()
+    return new_job
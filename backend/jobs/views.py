@@ -0,0 +1,39 @@
+from flask import Blueprint, jsonify
+from flask.views import MethodView
+from marshmallow import Schema, fields
+from flask_jwt_extended import jwt_required
+
+from .models import Job, SUCCEEDED
+
+
+class JobSerializationSchema(Schema):
+    id = fields.Integer()
+    type = fields.String()
+    status = fields.String()
+    progress = fields.Integer()
+    attempts = fields.Integer()
+    max_attempts = fields.Integer()
+    error = fields.String()
+    creation_date = fields.DateTime()
+    finished_at = fields.DateTime()
+
+
+class JobView(MethodView):
+    @jwt_required()
+    def get(self, job_id):
+        job = Job.query.get_or_404(job_id)
+        return jsonify(JobSerializationSchema().dump(job)), 200
+
+
+class JobResultView(MethodView):
+    @jwt_required()
+    def get(self, job_id):
+        job = Job.query.get_or_404(job_id)
+        if job.status != SUCCEEDED:
+            return jsonify({"message": f"Job is {job.status}", "status": job.status}), 409
+        return jsonify(job.result), 200
+
+
+jobs_bp = Blueprint('jobs', __name__)
+jobs_bp.add_url_rule('/<int:job_id>', view_func=JobView.as_view('job_view'))
+jobs_bp.add_url_rule('/<int:job_id>/result', view_func=JobResultView.as_view('job_result_view'))
@@ -0,0 +1,226 @@
+"""
+Job workers: local processes that use the ``jobs`` table as their queue.
+
+A worker claims a job with ``SELECT ... FOR UPDATE SKIP LOCKED``, so concurrent workers never block on
+or double-claim the same row. Per-type concurrency limits are enforced while claiming, under a
+transaction-level advisory lock on the job type, which makes the count of running jobs exact.
+"""
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, select, update
+
+from backend.extensions import db
+from .models import Job, QUEUED, RUNNING, SUCCEEDED, FAILED
+from .registry import JOB_TYPES, load_job_types
+
+logger = logging.getLogger(__name__)
+
+
+class JobContext:
+    """
+    Handed to job functions to report progress.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    def progress(self, percent):
+        db.session.execute(
+            update(Job).where(Job.id == self.job_id)
+            .values(progress=min(100, max(0, int(percent))), heartbeat_at=func.now())
+        )
+        db.session.commit()
+
+
+class Heartbeat(threading.Thread):
+    """
+    Renews the heartbeat of a running job from a thread of its own, on a connection of its own, so jobs
+    that run long without reporting progress are not taken for lost.
+    """
+
+    def __init__(self, engine, job_id, interval):
+        super().__init__(name=f'job-{job_id}-heartbeat', daemon=True)
+        self.engine = engine
+        self.job_id = job_id
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        update(Job).where(Job.id == self.job_id, Job.status == RUNNING).values(heartbeat_at=func.now())
+                    )
+            except Exception:
+                # The next beat retries; the job is only lost after a whole timeout without one.
+                logger.exception('Heartbeat of job %s failed', self.job_id)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def _seconds(seconds):
+    return func.make_interval(0, 0, 0, 0, 0, 0, seconds)
+
+
+def claim_job(worker_id):
+    """
+    Claims the oldest runnable job of a type that is below its concurrency limit.
+
+    Returns:
+        tuple: ``(job_id, job_type, payload)`` or None when there is nothing to run.
+    """
+    job_types = list(JOB_TYPES.values())
+    random.shuffle(job_types)
+
+    for job_type in job_types:
+        try:
+            type_lock = func.pg_try_advisory_xact_lock(func.hashtext(f'jobs:{job_type.name}'))
+            locked = db.session.scalar(select(type_lock))
+            if not locked:
+                continue
+
+            running = db.session.scalar(
+                select(func.count()).select_from(Job).where(Job.type == job_type.name, Job.status == RUNNING)
+            )
+            if running >= job_type.concurrency:
+                continue
+
+            job = db.session.execute(
+                select(Job.id, Job.payload)
+                .where(Job.type == job_type.name, Job.status == QUEUED, Job.run_after <= func.now())
+                .order_by(Job.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).first()
+            if job is None:
+                continue
+
+            db.session.execute(
+                update(Job).where(Job.id == job.id).values(
+                    status=RUNNING, attempts=Job.attempts + 1, locked_by=worker_id, heartbeat_at=func.now()
+                )
+            )
+            return job.id, job_type, job.payload
+        finally:
+            # Commits the claim (if any) and releases the advisory lock.
+            db.session.commit()
+
+    return None
+
+
+def run_job(job_id, job_type, payload):
+    # Several beats per timeout, so a slow or failed one does not lose the job.
+    heartbeat = Heartbeat(db.engine, job_id, job_type.timeout / 4)
+    heartbeat.start()
+    try:
+        result = job_type.fn(JobContext(job_id), **payload)
+    except Exception:
+        heartbeat.stop()
+        db.session.rollback()
+        error = traceback.format_exc()
+        attempts = db.session.scalar(select(Job.attempts).where(Job.id == job_id))
+        if attempts < job_type.max_attempts:
+            logger.warning('Job %s (%s) failed, retrying: %s', job_id, job_type.name, error)
+            values = {'status': QUEUED, 'run_after': func.now() + _seconds(2 ** attempts)}
+        else:
+            logger.error('Job %s (%s) failed permanently: %s', job_id, job_type.name, error)
+            values = {'status': FAILED, 'finished_at': func.now()}
+        db.session.execute(update(Job).where(Job.id == job_id).values(error=error, locked_by=None, **values))
+        db.session.commit()
+        return
+
+    heartbeat.stop()
+    db.session.execute(
+        update(Job).where(Job.id == job_id).values(
+            status=SUCCEEDED, result=result, progress=100, error=None, locked_by=None, finished_at=func.now()
+        )
+    )
+    db.session.commit()
+    logger.info('Job %s (%s) succeeded', job_id, job_type.name)
+
+
+def requeue_lost_jobs():
+    """
+    Puts running jobs whose heartbeat is older than their type's timeout back in the queue.
+    """
+    for job_type in JOB_TYPES.values():
+        db.session.execute(
+            update(Job)
+            .where(
+                Job.type == job_type.name,
+                Job.status == RUNNING,
+                # Both sides in database time: heartbeats are written with now() too.
+                Job.heartbeat_at < func.now() - _seconds(job_type.timeout),
+            )
+            .values(status=QUEUED, locked_by=None)
+        )
+    db.session.commit()
+
+
+def work(app, poll_interval):
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    with app.app_context():
+        # Connections inherited from the parent process must not be shared.
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+        logger.info('Job worker %s started', worker_id)
+
+        while not stopping:
+            claimed = claim_job(worker_id)
+            if claimed is None:
+                requeue_lost_jobs()
+                time.sleep(poll_interval)
+                continue
+            run_job(*claimed)
+            # A fresh session per job: jobs route it to the shard of their event.
+            db.session.remove()
+
+
+jobs_cli = AppGroup('jobs', help='Background job workers.')
+
+
+@jobs_cli.command('worker')
+@click.option('--processes', type=int, default=None, help='Number of worker processes.')
+@click.option('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+def run_workers(processes, poll_interval):
+    """Run job worker processes until interrupted."""
+    app = current_app._get_current_object()
+    processes = processes or app.config['JOBS_WORKER_PROCESSES']
+    # Before forking, so every worker knows all job types.
+    load_job_types()
+
+    workers = [
+        multiprocessing.Process(target=work, args=(app, poll_interval))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    click.echo(f'Started {processes} job workers')
+
+    def stop(*_):
+        # Workers finish their current job before exiting.
+        for worker in workers:
+            worker.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for worker in workers:
+        worker.join()
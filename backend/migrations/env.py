@@ -1,4 +1,5 @@
 import logging
+import os
 from logging.config import fileConfig
 
 from flask import current_app
@@ -51,6 +52,18 @@ def get_metadata():
     return target_db.metadata
 
 
+def is_online_schema_change():
+    """
+    Zero-downtime mode, enabled with ``flask db upgrade -x online=true`` or ``MIGRATIONS_ONLINE=1``.
+
+    Each revision then runs in its own transaction, so helpers from ``backend.util.online_migrations``
+    can step out of it, and every statement gives up on locks after ``MIGRATIONS_LOCK_TIMEOUT``
+    instead of stalling application queries queued behind it.
+    """
+    flag = context.get_x_argument(as_dictionary=True).get('online', os.getenv('MIGRATIONS_ONLINE', ''))
+    return flag.lower() in ('1', 'true', 'yes')
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -91,13 +104,21 @@ def run_migrations_online():
                 logger.info('No changes in schema detected.')
 
     connectable = get_engine()
+    configure_args = dict(current_app.extensions['migrate'].configure_args)
 
     with connectable.connect() as connection:
+        if is_online_schema_change():
+            lock_timeout = os.getenv('MIGRATIONS_LOCK_TIMEOUT', '5s')
+            logger.info('Running in online mode with lock_timeout=%s', lock_timeout)
+            connection.exec_driver_sql(f"SET lock_timeout = '{lock_timeout}'")
+            connection.commit()
+            configure_args['transaction_per_migration'] = True
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
             process_revision_directives=process_revision_directives,
-            **current_app.extensions['migrate'].configure_args
+            **configure_args
         )
 
         with context.begin_transaction():
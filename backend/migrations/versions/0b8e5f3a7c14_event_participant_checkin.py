@@ -0,0 +1,32 @@
+"""event participant check-in
+
+Revision ID: 0b8e5f3a7c14
+Revises: f41c0b7d9a62
+Create Date: 2026-10-19 15:10:12.480311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.util.online_migrations import add_column_online
+
+
+# revision identifiers, used by Alembic.
+revision = '0b8e5f3a7c14'
+down_revision = 'f41c0b7d9a62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable without a default: catalog-only changes.
+    add_column_online('event_participants', sa.Column('checked_in_at', sa.DateTime(), nullable=True))
+    add_column_online('event_participants_archive', sa.Column('checked_in_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('event_participants_archive', schema=None) as batch_op:
+        batch_op.drop_column('checked_in_at')
+
+    with op.batch_alter_table('event_participants', schema=None) as batch_op:
+        batch_op.drop_column('checked_in_at')
@@ -0,0 +1,30 @@
+"""event templates
+
+Revision ID: 3c1d7a2e5b90
+Revises: 9b2f10ac9ae7
+Create Date: 2026-10-19 09:12:05.114203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.util.online_migrations import add_column_online
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1d7a2e5b90'
+down_revision = '9b2f10ac9ae7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A constant server default keeps this a catalog-only change, no table rewrite.
+    add_column_online(
+        'events', sa.Column('is_template', sa.Boolean(), nullable=False, server_default=sa.sql.expression.false())
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('is_template')
@@ -0,0 +1,44 @@
+"""notification deliveries
+
+Revision ID: 5d7c2a9e0f31
+Revises: 0b8e5f3a7c14
+Create Date: 2026-10-19 15:48:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d7c2a9e0f31'
+down_revision = '0b8e5f3a7c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE SEQUENCE notification_deliveries_id_seq START WITH 1 INCREMENT BY 1")
+    op.create_table('notification_deliveries',
+        sa.Column('id', sa.Integer(), sa.Sequence('notification_deliveries_id_seq'), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.Unicode(length=50), nullable=False),
+        sa.Column('status', sa.Unicode(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.UnicodeText(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['participant_id'], ['participants.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_id', 'kind', 'participant_id', name='uq_notification_deliveries_recipient')
+    )
+    op.create_index(
+        op.f('ix_notification_deliveries_participant_id'), 'notification_deliveries', ['participant_id'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_notification_deliveries_participant_id'), table_name='notification_deliveries')
+    op.drop_table('notification_deliveries')
+    op.execute("DROP SEQUENCE notification_deliveries_id_seq")
@@ -0,0 +1,43 @@
+"""catering history
+
+Revision ID: 6f1b8c3d2e94
+Revises: a3d9f6e2c851
+Create Date: 2026-10-19 20:41:07.318264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.util.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1b8c3d2e94'
+down_revision = 'a3d9f6e2c851'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catering_history',
+        sa.Column('event_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('day', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('meal_type', sa.Unicode(length=50), nullable=False),
+        sa.Column('is_vegetarian', sa.Boolean(), nullable=False),
+        sa.Column('event_date', sa.DateTime(), nullable=False),
+        sa.Column('planned', sa.Integer(), nullable=False),
+        sa.Column('served', sa.Integer(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('event_id', 'day', 'meal_type', 'is_vegetarian')
+    )
+    op.create_index(op.f('ix_catering_history_refreshed_at'), 'catering_history', ['refreshed_at'], unique=False)
+    # Forecasts count an event's meal plans through its meals.
+    create_index_concurrently('ix_meals_on_event_event_id', 'meals_on_event', ['event_id'])
+    create_index_concurrently('ix_participant_meals_on_event_meal_id', 'participant_meals_on_event', ['meal_id'])
+
+
+def downgrade():
+    drop_index_concurrently('ix_participant_meals_on_event_meal_id', 'participant_meals_on_event')
+    drop_index_concurrently('ix_meals_on_event_event_id', 'meals_on_event')
+    op.drop_index(op.f('ix_catering_history_refreshed_at'), table_name='catering_history')
+    op.drop_table('catering_history')
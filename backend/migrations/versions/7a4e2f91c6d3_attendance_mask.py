@@ -0,0 +1,41 @@
+"""attendance mask on event participants
+
+Revision ID: 7a4e2f91c6d3
+Revises: 3c1d7a2e5b90
+Create Date: 2026-10-19 10:03:47.520118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.util.online_migrations import (add_column_online, batched_backfill, create_index_concurrently,
+                                            drop_index_concurrently)
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4e2f91c6d3'
+down_revision = '3c1d7a2e5b90'
+branch_labels = None
+depends_on = None
+
+
+# Existing enrolments attend the first ``days_in_event`` days. ``~(-1 << n)`` sets the n lowest bits without
+# overflowing at n = 63.
+FIRST_DAYS_MASK = "~((-1)::bigint << LEAST(GREATEST(days_in_event, 0), 63))"
+
+
+def upgrade():
+    # A constant server default keeps this a catalog-only change, no table rewrite.
+    add_column_online(
+        'event_participants', sa.Column('attendance_mask', sa.BigInteger(), nullable=False, server_default='0')
+    )
+    create_index_concurrently('ix_event_participants_event_id', 'event_participants', ['event_id'])
+    # In committed batches; rows already set, also by code deployed meanwhile, are skipped.
+    batched_backfill(
+        'event_participants', f'attendance_mask = {FIRST_DAYS_MASK}', 'attendance_mask = 0 AND days_in_event > 0'
+    )
+
+
+def downgrade():
+    drop_index_concurrently('ix_event_participants_event_id', 'event_participants')
+    op.drop_column('event_participants', 'attendance_mask')
@@ -0,0 +1,31 @@
+"""row versions for optimistic concurrency
+
+Revision ID: 8e3b6d1f4a27
+Revises: 5d7c2a9e0f31
+Create Date: 2026-10-19 16:21:05.117640
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.util.online_migrations import add_column_online
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3b6d1f4a27'
+down_revision = '5d7c2a9e0f31'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('events', 'participants', 'event_participants', 'meals_on_event', 'participant_meals_on_event')
+
+
+def upgrade():
+    # A constant server default keeps this a catalog-only change, no table rewrite.
+    for table_name in VERSIONED_TABLES:
+        add_column_online(table_name, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table_name in reversed(VERSIONED_TABLES):
+        op.drop_column(table_name, 'version')
@@ -0,0 +1,105 @@
+"""participant blocking keys
+
+Revision ID: a3d9f6e2c851
+Revises: c7f2e9a4b183
+Create Date: 2026-10-19 18:12:40.527311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.util.online_migrations import (add_column_online, batched_backfill, create_index_concurrently,
+                                            drop_index_concurrently)
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d9f6e2c851'
+down_revision = 'c7f2e9a4b183'
+branch_labels = None
+depends_on = None
+
+# Lowercased, without dots and "+tag" in the local part, googlemail.com folded into gmail.com.
+EMAIL_KEY_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION participant_email_key(email text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT regexp_replace(split_part(lower(email), '@', 1), '\+.*$|\.', '', 'g') || '@' ||
+           replace(split_part(lower(email), '@', 2), 'googlemail.com', 'gmail.com')
+$$
+"""
+
+# American Soundex of the letters of a name, common accents folded: H and W are skipped, vowels separate
+# equal codes.
+PHONETIC_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION participant_phonetic(name text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE WHEN letters = '' THEN '' ELSE
+        left(letters, 1) || rpad(left(replace(substr(regexp_replace(
+            translate(left(letters, 1) || translate(substr(letters, 2), 'HW', ''),
+                      'AEIOUYBFPVCGJKQSXZDTLMNR', '000000111122222222334556'),
+            '(.)\1+', '\1', 'g'), 2), '0', ''), 3), 3, '0')
+    END
+    FROM (SELECT regexp_replace(
+        translate(upper(name), 'ÁÀÂÄÃÅÇÉÈÊËÍÌÎÏÑÓÒÔÖÕØÚÙÛÜÝ', 'AAAAAACEEEEIIIINOOOOOOUUUUY'), '[^A-Z]', '', 'g'
+    ) AS letters) AS normalized
+$$
+"""
+
+# Order-independent, so swapped first and last names share the key.
+NAME_KEY_FUNCTION = """
+CREATE OR REPLACE FUNCTION participant_name_key(first_name text, last_name text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT least(participant_phonetic(first_name), participant_phonetic(last_name)) || ' ' ||
+           greatest(participant_phonetic(first_name), participant_phonetic(last_name))
+$$
+"""
+
+TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION participants_set_blocking_keys() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.email_key := participant_email_key(NEW.email);
+    NEW.name_key := participant_name_key(NEW.first_name, NEW.last_name);
+    RETURN NEW;
+END
+$$
+"""
+
+
+def upgrade():
+    op.execute(EMAIL_KEY_FUNCTION)
+    op.execute(PHONETIC_FUNCTION)
+    op.execute(NAME_KEY_FUNCTION)
+    op.execute(TRIGGER_FUNCTION)
+
+    add_column_online('participants', sa.Column('email_key', sa.Unicode(length=255), nullable=True))
+    add_column_online('participants', sa.Column('name_key', sa.Unicode(length=20), nullable=True))
+    # Every write path keeps the keys current, including imports that bypass the application.
+    op.execute(
+        'CREATE TRIGGER participants_blocking_keys BEFORE INSERT OR UPDATE OF first_name, last_name, email '
+        'ON participants FOR EACH ROW EXECUTE FUNCTION participants_set_blocking_keys()'
+    )
+
+    batched_backfill(
+        'participants',
+        'email_key = participant_email_key(email), name_key = participant_name_key(first_name, last_name)',
+        'email_key IS NULL',
+    )
+    create_index_concurrently('ix_participants_email_key', 'participants', ['email_key'])
+    create_index_concurrently('ix_participants_name_key', 'participants', ['name_key'])
+    # Merges re-point meal plans by participant.
+    create_index_concurrently(
+        'ix_participant_meals_on_event_participant_id', 'participant_meals_on_event', ['participant_id']
+    )
+
+
+def downgrade():
+    drop_index_concurrently('ix_participant_meals_on_event_participant_id', 'participant_meals_on_event')
+    drop_index_concurrently('ix_participants_name_key', 'participants')
+    drop_index_concurrently('ix_participants_email_key', 'participants')
+    op.execute('DROP TRIGGER participants_blocking_keys ON participants')
+    op.drop_column('participants', 'name_key')
+    op.drop_column('participants', 'email_key')
+    op.execute('DROP FUNCTION participants_set_blocking_keys()')
+    op.execute('DROP FUNCTION participant_name_key(text, text)')
+    op.execute('DROP FUNCTION participant_phonetic(text)')
+    op.execute('DROP FUNCTION participant_email_key(text)')
@@ -0,0 +1,34 @@
+"""event period range
+
+Revision ID: b05d3e8a1f27
+Revises: 7a4e2f91c6d3
+Create Date: 2026-10-19 11:21:09.804512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.util.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = 'b05d3e8a1f27'
+down_revision = '7a4e2f91c6d3'
+branch_labels = None
+depends_on = None
+
+
+# Must match ``Event.period``, or queries cannot use the index.
+PERIOD = "tsrange(date, date + duration * interval '1 day')"
+
+
+def upgrade():
+    # An expression index rather than a stored generated column, whose ADD COLUMN would rewrite the
+    # table under an ACCESS EXCLUSIVE lock.
+    create_index_concurrently('ix_events_period', 'events', [sa.text(PERIOD)], postgresql_using='gist')
+    create_index_concurrently('ix_event_participants_participant_id', 'event_participants', ['participant_id'])
+
+
+def downgrade():
+    drop_index_concurrently('ix_event_participants_participant_id', 'event_participants')
+    drop_index_concurrently('ix_events_period', 'events')
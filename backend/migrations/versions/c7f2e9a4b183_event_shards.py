@@ -0,0 +1,30 @@
+"""event shards
+
+Revision ID: c7f2e9a4b183
+Revises: 8e3b6d1f4a27
+Create Date: 2026-10-19 17:04:12.208315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f2e9a4b183'
+down_revision = '8e3b6d1f4a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('event_shards',
+        sa.Column('event_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('shard', sa.Unicode(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index(op.f('ix_event_shards_shard'), 'event_shards', ['shard'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_event_shards_shard'), table_name='event_shards')
+    op.drop_table('event_shards')
@@ -0,0 +1,86 @@
+"""archive tables
+
+Revision ID: d2a96c4b7e15
+Revises: b05d3e8a1f27
+Create Date: 2026-10-19 12:40:31.227809
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a96c4b7e15'
+down_revision = 'b05d3e8a1f27'
+branch_labels = None
+depends_on = None
+
+
+def _audit_columns():
+    return [
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('creation_date', sa.DateTime(), nullable=False),
+        sa.Column('updated_by', sa.Integer(), nullable=True),
+        sa.Column('update_date', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def upgrade():
+    # Only new, empty tables: their indexes are built in no time, so no online helpers are needed.
+    op.create_table('events_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.Unicode(length=255), nullable=False),
+        sa.Column('description', sa.UnicodeText(), nullable=True),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('duration', sa.Integer(), nullable=False),
+        sa.Column('location', sa.Unicode(length=255), nullable=False),
+        sa.Column('is_template', sa.Boolean(), nullable=False),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_events_archive_date', 'events_archive', ['date'])
+
+    op.create_table('event_participants_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=False),
+        sa.Column('days_in_event', sa.Integer(), nullable=False),
+        sa.Column('attendance_mask', sa.BigInteger(), nullable=False),
+        sa.Column('is_event_organizer', sa.Boolean(), nullable=False),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_event_participants_archive_event_id', 'event_participants_archive', ['event_id'])
+
+    op.create_table('meals_on_event_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('name', sa.Unicode(length=100), nullable=False),
+        sa.Column('meal_type', sa.Unicode(length=50), nullable=False),
+        sa.Column('is_vegetarian', sa.Boolean(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_meals_on_event_archive_event_id', 'meals_on_event_archive', ['event_id'])
+
+    op.create_table('participant_meals_on_event_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('meal_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Integer(), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=False),
+        sa.Column('is_special_request', sa.Boolean(), nullable=True),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_participant_meals_on_event_archive_event_id', 'participant_meals_on_event_archive', ['event_id']
+    )
+
+
+def downgrade():
+    op.drop_table('participant_meals_on_event_archive')
+    op.drop_table('meals_on_event_archive')
+    op.drop_table('event_participants_archive')
+    op.drop_table('events_archive')
@@ -0,0 +1,50 @@
+"""jobs table
+
+Revision ID: f41c0b7d9a62
+Revises: d2a96c4b7e15
+Create Date: 2026-10-19 14:02:55.631470
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f41c0b7d9a62'
+down_revision = 'd2a96c4b7e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE SEQUENCE jobs_id_seq START WITH 1 INCREMENT BY 1")
+    op.create_table('jobs',
+        sa.Column('id', sa.Integer(), sa.Sequence('jobs_id_seq'), nullable=False),
+        sa.Column('type', sa.Unicode(length=100), nullable=False),
+        sa.Column('status', sa.Unicode(length=20), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('error', sa.UnicodeText(), nullable=True),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_after', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.Column('locked_by', sa.Unicode(length=100), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('creation_date', sa.DateTime(), nullable=False),
+        sa.Column('updated_by', sa.Integer(), nullable=True),
+        sa.Column('update_date', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_queued', 'jobs', ['type', 'id'], postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('ix_jobs_running', 'jobs', ['type'], postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade():
+    op.drop_index('ix_jobs_running', table_name='jobs')
+    op.drop_index('ix_jobs_queued', table_name='jobs')
+    op.drop_table('jobs')
+    op.execute("DROP SEQUENCE jobs_id_seq")
@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.extensions import db
+from backend.events.models import Participant, EventParticipant, MealsOnEvent, ParticipantMealsOnEvent
+from .models import NotificationDelivery, MEAL_PLAN_CONFIRMATION, SENT, FAILED
+
+
+def pending_recipients_select(event_id, kind):
+    """
+    Selects the participants of an event that have not been sent the given notification yet, with the
+    values used to personalize it. Ordered by participant id, so a stream of it can be resumed.
+
+    Nothing keeps a participant from being enrolled twice in an event (duplicates are left to be merged),
+    so each participant is selected once, with their longest enrolment.
+    """
+    delivered = (
+        select(NotificationDelivery.id)
+        .where(
+            NotificationDelivery.event_id == event_id,
+            NotificationDelivery.kind == kind,
+            NotificationDelivery.participant_id == Participant.id,
+            NotificationDelivery.status == SENT,
+        )
+        .exists()
+    )
+
+    columns = [
+        Participant.id.label('participant_id'),
+        Participant.email,
+        Participant.first_name,
+        Participant.last_name,
+        EventParticipant.days_in_event,
+    ]
+    if kind == MEAL_PLAN_CONFIRMATION:
+        columns.append(
+            select(func.count())
+            .select_from(ParticipantMealsOnEvent)
+            .join(MealsOnEvent, MealsOnEvent.id == ParticipantMealsOnEvent.meal_id)
+            .where(MealsOnEvent.event_id == event_id, ParticipantMealsOnEvent.participant_id == Participant.id)
+            .scalar_subquery()
+            .label('meal_count')
+        )
+
+    return (
+        select(*columns)
+        .join(EventParticipant, EventParticipant.participant_id == Participant.id)
+        .where(EventParticipant.event_id == event_id, ~delivered)
+        .distinct(Participant.id)
+        .order_by(Participant.id, EventParticipant.days_in_event.desc())
+    )
+
+
+def record_deliveries(event_id, kind, outcomes):
+    """
+    Upserts the delivery state of a batch of recipients in one statement.
+
+    Args:
+        outcomes (list): ``(participant_id, error)`` pairs, ``error`` None for a successful send.
+    """
+    if not outcomes:
+        return
+
+    # A statement cannot upsert the same row twice; the last outcome of a participant wins.
+    outcomes = dict(outcomes)
+    now = datetime.utcnow()
+    stmt = insert(NotificationDelivery).values([
+        {
+            'event_id': event_id,
+            'participant_id': participant_id,
+            'kind': kind,
+            'status': SENT if error is None else FAILED,
+            'attempts': 1,
+            'error': error,
+            'updated_at': now,
+        }
+        for participant_id, error in outcomes.items()
+    ])
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            constraint='uq_notification_deliveries_recipient',
+            set_={
+                'status': stmt.excluded.status,
+                'attempts': NotificationDelivery.attempts + 1,
+                'error': stmt.excluded.error,
+                'updated_at': stmt.excluded.updated_at,
+            },
+        )
+    )
+
+
+def get_delivery_counts(event_id):
+    """
+    Returns delivery counts per notification kind and status, e.g. ``{'reminder': {'sent': 120}}``.
+    """
+    rows = db.session.execute(
+        select(NotificationDelivery.kind, NotificationDelivery.status, func.count())
+        .where(NotificationDelivery.event_id == event_id)
+        .group_by(NotificationDelivery.kind, NotificationDelivery.status)
+    )
+    counts = {}
+    for kind, status, count in rows:
+        counts.setdefault(kind, {})[status] = count
+    return counts
@@ -0,0 +1,77 @@
+"""
+Fan-out of notifications to all participants of an event.
+
+Recipients are streamed from a server-side cursor in batches of ``NOTIFY_BATCH_SIZE``; every batch is
+personalized and sent on one of ``NOTIFY_SMTP_CONNECTIONS`` pooled connections by a thread pool, and its
+outcome is recorded with a single upsert. At most two batches per connection are in flight, so memory
+use does not grow with the number of recipients.
+
+Delivery is at least once: a job that dies between sending a batch and recording it sends that batch
+again when retried. Recipients already recorded as sent are skipped.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from backend.extensions import db
+from backend.events.models import Event, MealsOnEvent
+from backend.jobs.registry import job
+from backend.sharding.routing import current_shard, route_to_event, shard_engine
+from .db_utils import pending_recipients_select, record_deliveries
+from .rendering import render_event_template
+from .smtp import SMTPPool
+
+logger = logging.getLogger(__name__)
+
+
+def _send(pool, template, recipients):
+    messages = [template.message(recipient._asdict()) for recipient in recipients]
+    errors = pool.send_batch(messages)
+    return [(recipient.participant_id, error) for recipient, error in zip(recipients, errors)]
+
+
+@job('event_notifications', concurrency=1, timeout=900)
+def send_event_notifications(ctx, event_id, kind):
+    route_to_event(event_id)
+    event = db.session.get(Event, event_id)
+    if event is None:
+        return {"sent": 0, "failed": 0}
+
+    config = current_app.config
+    meals = db.session.scalars(select(MealsOnEvent).where(MealsOnEvent.event_id == event_id)).all()
+    template = render_event_template(kind, config['MAIL_DEFAULT_SENDER'], event=event, meals=meals)
+
+    recipients = pending_recipients_select(event_id, kind)
+    total = db.session.scalar(select(func.count()).select_from(recipients.order_by(None).subquery()))
+    db.session.commit()
+
+    pool = SMTPPool.from_config(config)
+    counts = {"sent": 0, "failed": 0}
+
+    def record(done):
+        for future in done:
+            outcomes = future.result()
+            record_deliveries(event_id, kind, outcomes)
+            for _, error in outcomes:
+                counts["failed" if error else "sent"] += 1
+        db.session.commit()
+        ctx.progress(100 * (counts["sent"] + counts["failed"]) / max(total, 1))
+
+    # A connection of its own for the stream: the session commits after every batch.
+    with shard_engine(current_shard()).connect() as connection, ThreadPoolExecutor(max_workers=pool.size) as executor:
+        stream = connection.execution_options(stream_results=True, yield_per=config['NOTIFY_BATCH_SIZE'])
+        in_flight = set()
+        try:
+            for batch in stream.execute(recipients).partitions():
+                in_flight.add(executor.submit(_send, pool, template, batch))
+                if len(in_flight) >= 2 * pool.size:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    record(done)
+            record(in_flight)
+        finally:
+            pool.close()
+
+    logger.info("Sent %s notifications for event %s: %s", kind, event_id, counts)
+    return counts
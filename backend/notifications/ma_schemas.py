@@ -0,0 +1,7 @@
+from marshmallow import Schema, fields, validate
+
+from .models import KINDS
+
+
+class SendNotificationSchema(Schema):
+    kind = fields.String(required=True, validate=validate.OneOf(KINDS))
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, ForeignKey, Integer, Unicode, UnicodeText, DateTime, UniqueConstraint
+
+from backend.util.db import PkColumn
+from backend.extensions import db
+
+REMINDER = 'reminder'
+MEAL_PLAN_CONFIRMATION = 'meal_plan_confirmation'
+KINDS = (REMINDER, MEAL_PLAN_CONFIRMATION)
+
+SENT = 'sent'
+FAILED = 'failed'
+
+
+class NotificationDelivery(db.Model):
+    """
+    Delivery state of one notification kind for one participant of an event.
+
+    Only the outcome of a send is recorded, one row per recipient, upserted in batches.
+    """
+    __tablename__ = 'notification_deliveries'
+
+    id = PkColumn('notification_deliveries_id_seq')
+    event_id = Column(Integer, ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
+    participant_id = Column(Integer, ForeignKey('participants.id', ondelete='CASCADE'), nullable=False, index=True)
+    kind = Column(Unicode(50), nullable=False)
+    status = Column(Unicode(20), nullable=False)
+    attempts = Column(Integer, nullable=False, default=1)
+    error = Column(UnicodeText, nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('event_id', 'kind', 'participant_id', name='uq_notification_deliveries_recipient'),
+    )
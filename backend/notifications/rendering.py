@@ -0,0 +1,83 @@
+"""
+Notification templates are rendered in two steps.
+
+The Jinja template of a notification kind is rendered once per event with the event data. Per-recipient
+values stay in the result as ``$name`` placeholders and are filled in with ``string.Template``, which is
+a plain string substitution and cheap enough to run for every recipient. The MIME headers are likewise
+prepared once; building an ``EmailMessage`` per recipient would cost more than sending it.
+"""
+import base64
+import os
+from email.header import Header
+from email.utils import formatdate, make_msgid
+from string import Template
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+
+def _escape_placeholders(value):
+    # Event data must not be mistaken for recipient placeholders in the second step.
+    return '' if value is None else str(value).replace('$', '$$')
+
+
+_environment = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    undefined=StrictUndefined,
+    finalize=_escape_placeholders,
+    trim_blocks=True,
+    keep_trailing_newline=True,
+)
+
+
+class EventTemplate:
+    """
+    A notification rendered for one event, personalized per recipient by ``message``.
+    """
+
+    def __init__(self, subject, body, sender):
+        self.subject = Template(subject)
+        self.body = Template(body)
+        self.sender = sender
+        self._headers = (
+            f'From: {sender}\r\n'
+            f'Date: {formatdate(localtime=False)}\r\n'
+            'MIME-Version: 1.0\r\n'
+            'Content-Type: text/plain; charset="utf-8"\r\n'
+            'Content-Transfer-Encoding: base64\r\n'
+        )
+
+    def message(self, recipient):
+        """
+        Builds the raw e-mail for one recipient.
+
+        Args:
+            recipient (Mapping): Must contain ``email`` and the values of all placeholders.
+
+        Returns:
+            tuple: ``(sender, recipient address, message bytes)`` as taken by ``SMTP.sendmail``.
+        """
+        subject = ' '.join(self.subject.substitute(recipient).split())
+        if not subject.isascii():
+            subject = Header(subject, 'utf-8').encode()
+        body = self.body.substitute(recipient).replace('\n', '\r\n').encode()
+        raw = (
+            f'{self._headers}To: {recipient["email"]}\r\nSubject: {subject}\r\n'
+            f'Message-ID: {make_msgid(domain="events")}\r\n\r\n'
+        ).encode() + base64.encodebytes(body).replace(b'\n', b'\r\n')
+        return self.sender, recipient['email'], raw
+
+
+def render_event_template(kind, sender, **context):
+    """
+    Renders the template of a notification kind with event-level data.
+
+    The first line of a template is the subject, the body starts after the following blank line.
+
+    Returns:
+        EventTemplate: The rendered template.
+    """
+    rendered = _environment.get_template(f'{kind}.txt').render(**context)
+    subject, _, body = rendered.partition('\n\n')
+    return EventTemplate(subject.strip(), body, sender)
@@ -0,0 +1,104 @@
+import logging
+import queue
+import smtplib
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPPool:
+    """
+    A fixed number of SMTP connections that are opened on first use and kept open between batches.
+    """
+
+    def __init__(self, host, port, size, username=None, password=None, use_tls=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config['SMTP_HOST'], config['SMTP_PORT'], config['NOTIFY_SMTP_CONNECTIONS'],
+            username=config['SMTP_USERNAME'], password=config['SMTP_PASSWORD'], use_tls=config['SMTP_USE_TLS'],
+        )
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, connection):
+        self._idle.put(connection)
+
+    @staticmethod
+    def discard(connection):
+        try:
+            connection.close()
+        except OSError:
+            pass
+
+    def close(self):
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                connection.quit()
+            except (smtplib.SMTPException, OSError):
+                self.discard(connection)
+
+    def send_batch(self, messages):
+        """
+        Sends messages over one pooled connection. A dropped connection is reopened once; if that fails
+        too, the rest of the batch is given up.
+
+        Args:
+            messages (list): ``(sender, recipient, raw message)`` tuples.
+
+        Returns:
+            list: An error string per message, None for messages the server accepted.
+        """
+        errors = []
+        connection = None
+        for message in messages:
+            for attempt in range(2):
+                try:
+                    if connection is None:
+                        connection = self.acquire()
+                    connection.sendmail(*message)
+                    errors.append(None)
+                    break
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as e:
+                    error = e
+                except smtplib.SMTPException as e:
+                    # Refused by the server; the connection itself is still usable.
+                    errors.append(str(e))
+                    break
+                except OSError as e:
+                    error = e
+                if connection is not None:
+                    self.discard(connection)
+                    connection = None
+            else:
+                logger.warning('SMTP connection to %s:%s failed: %s', self.host, self.port, error)
+                errors.extend([f'SMTP connection failed: {error}'] * (len(messages) - len(errors)))
+                return errors
+
+        if connection is not None:
+            self.release(connection)
+        return errors
@@ -0,0 +1,43 @@
+import logging
+from flask import Blueprint, jsonify
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+
+from backend.events.models import Event
+from backend.jobs.registry import enqueue
+from backend.notifications import jobs  # noqa: F401 - registers the notification job types
+from backend.sharding.routing import handle_event_moved, route_by_event_id
+from backend.sharding.session import EventMoved
+from backend.util.db import commit_section
+from backend.util.ma_validation import validate_request
+from .db_utils import get_delivery_counts
+from .ma_schemas import SendNotificationSchema
+
+logger = logging.getLogger(__name__)
+
+
+class EventNotificationsView(MethodView):
+    @jwt_required()
+    def get(self, event_id):
+        Event.query.get_or_404(event_id)
+        return jsonify(get_delivery_counts(event_id)), 200
+
+    @jwt_required()
+    @validate_request(SendNotificationSchema())
+    def post(self, event_id, param):
+        Event.query.get_or_404(event_id)
+
+        with commit_section():
+            job = enqueue('event_notifications', event_id=event_id, kind=param['kind'])
+
+        logger.info("Sending %s notifications for event %s scheduled as job %s", param['kind'], event_id, job.id)
+
+        return jsonify({"message": "Notifications scheduled", "job_id": job.id}), 202
+
+
+notifications_bp = Blueprint('notifications', __name__)
+notifications_bp.url_value_preprocessor(route_by_event_id)
+notifications_bp.register_error_handler(EventMoved, handle_event_moved)
+notifications_bp.add_url_rule(
+    '/events/<int:event_id>', view_func=EventNotificationsView.as_view('event_notifications_view')
+)
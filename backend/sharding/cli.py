@@ -0,0 +1,67 @@
+import click
+from flask.cli import AppGroup
+
+from .ids import init_id_sequences
+from .moves import get_event_weights, move_event, plan_rebalance
+from .replication import sync_participants
+from .routing import shard_names, sharding_enabled
+from .session import DEFAULT_SHARD
+
+shards_cli = AppGroup('shards', help='Event data shards.')
+
+
+@shards_cli.command('status')
+def show_status():
+    """Show the events and rows on every shard."""
+    for shard, weights in get_event_weights().items():
+        click.echo(f'{shard:20s} {len(weights):8d} events {sum(weights.values()):10d} rows')
+
+
+@shards_cli.command('init')
+def init_shards():
+    """Interleave the id sequences of all shards and copy the participants to them."""
+    if not sharding_enabled():
+        raise click.ClickException('No shards configured in DATABASE_SHARDS')
+    for sequence, starts in init_id_sequences().items():
+        click.echo(f'{sequence}: {starts}')
+    for shard in shard_names():
+        if shard != DEFAULT_SHARD:
+            upserted, deleted = sync_participants(shard)
+            click.echo(f'{shard}: {upserted} participants copied, {deleted} removed')
+
+
+@shards_cli.command('sync-participants')
+@click.argument('shard')
+def run_sync_participants(shard):
+    """Make the participants of SHARD an exact copy of the primary's."""
+    if shard == DEFAULT_SHARD or shard not in shard_names():
+        raise click.ClickException(f'Unknown shard: {shard}')
+    upserted, deleted = sync_participants(shard)
+    click.echo(f'{shard}: {upserted} participants copied, {deleted} removed')
+
+
+@shards_cli.command('move')
+@click.argument('event_id', type=int)
+@click.argument('shard')
+def run_move(event_id, shard):
+    """Move EVENT_ID and its rows to SHARD."""
+    if shard not in shard_names():
+        raise click.ClickException(f'Unknown shard: {shard}')
+    try:
+        moved = move_event(event_id, shard)
+    except LookupError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Moved event {event_id} to {shard}: {moved}' if moved else f'Event {event_id} is on {shard}')
+
+
+@shards_cli.command('rebalance')
+@click.option('--max-moves', type=int, default=10, help='Most events to move.')
+@click.option('--dry-run', is_flag=True, help='Only print the planned moves.')
+def run_rebalance(max_moves, dry_run):
+    """Move events from the heaviest shards to the lightest until they are even."""
+    moves = plan_rebalance(get_event_weights(), max_moves)
+    for event_id, source, target, weight in moves:
+        click.echo(f'event {event_id} ({weight} rows): {source} -> {target}')
+        if not dry_run:
+            move_event(event_id, target)
+    click.echo(f'{len(moves)} moves {"planned" if dry_run else "done"}')
@@ -0,0 +1,53 @@
+"""
+Ids of event data that are unique across shards.
+
+Events take their ids from the primary's sequence (see ``place_event``). The rows below an event are
+inserted on its shard, so their sequences are interleaved: on the shard at position ``i`` of
+``shard_names()`` they step by ``SHARD_ID_STRIDE`` from an offset of ``i``, and a moved event keeps its ids.
+"""
+from flask import current_app
+from sqlalchemy import func, select, text
+
+from backend.events.models import EventParticipant, MealsOnEvent, ParticipantMealsOnEvent
+from backend.notifications.models import NotificationDelivery
+from .routing import shard_engine, shard_names
+
+INTERLEAVED_MODELS = (MealsOnEvent, EventParticipant, ParticipantMealsOnEvent, NotificationDelivery)
+
+
+def _sequence_name(model):
+    return model.__table__.c.id.default.name
+
+
+def init_id_sequences():
+    """
+    Restarts the interleaved sequences of every shard above the highest id in use on any shard.
+
+    Meant for setting up sharding and adding a shard, while no event data is written: ids taken between
+    reading the current maximum and restarting a sequence could be handed out twice.
+
+    Returns:
+        dict: The first id every shard hands out next, per sequence.
+    """
+    stride = current_app.config['SHARD_ID_STRIDE']
+    shards = shard_names()
+    if len(shards) > stride:
+        raise ValueError(f'{len(shards)} shards do not fit a SHARD_ID_STRIDE of {stride}')
+
+    highest = {_sequence_name(model): 0 for model in INTERLEAVED_MODELS}
+    for shard in shards:
+        with shard_engine(shard).connect() as connection:
+            for model in INTERLEAVED_MODELS:
+                name = _sequence_name(model)
+                in_use = connection.scalar(select(func.coalesce(func.max(model.id), 0)))
+                issued = connection.scalar(text(f'SELECT last_value FROM {name}'))
+                highest[name] = max(highest[name], in_use, issued)
+
+    restarted = {}
+    for offset, shard in enumerate(shards):
+        with shard_engine(shard).begin() as connection:
+            for name, value in highest.items():
+                start = (value // stride + 1) * stride + offset
+                connection.execute(text(f'ALTER SEQUENCE {name} INCREMENT BY {stride} RESTART WITH {start}'))
+                restarted.setdefault(name, {})[shard] = start
+    return restarted
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Unicode
+
+from backend.extensions import db
+
+
+class EventShard(db.Model):
+    """
+    Shard map entry: the shard holding an event's data. Events without an entry live on the ``default``
+    shard, the primary database, so an unsharded deployment never writes here.
+    """
+    __tablename__ = 'event_shards'
+
+    event_id = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(Unicode(50), nullable=False, index=True)
@@ -0,0 +1,184 @@
+"""
+Moving events between shards while the application keeps running.
+
+``move_event`` takes the event's move lock exclusively on its current shard, which waits for the writes in
+flight and holds new ones back (see ``RoutingSession``); reads go on. It copies the event's rows to the
+target shard, switches the shard map, waits ``SHARD_MOVE_GRACE_SECONDS`` for reads that were routed before
+the switch, and deletes the rows from the old shard. The writes held back then fail with 503 and are retried
+by the client against the new shard.
+"""
+import logging
+import time
+
+from flask import current_app
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.extensions import db
+from backend.events.models import Event, EventParticipant, MealsOnEvent, ParticipantMealsOnEvent
+from backend.notifications.models import NotificationDelivery
+from .models import EventShard
+from .replication import replicate_participants
+from .routing import scatter, shard_engine, shard_of
+from .session import MOVE_LOCK_CLASS
+
+logger = logging.getLogger(__name__)
+
+COPY_BATCH_SIZE = 1000
+
+
+def _event_rows(event_id):
+    """
+    ``(table, criteria)`` of all rows of an event, parents first.
+    """
+    meal_ids = select(MealsOnEvent.id).where(MealsOnEvent.event_id == event_id)
+    return [
+        (Event.__table__, Event.id == event_id),
+        (MealsOnEvent.__table__, MealsOnEvent.event_id == event_id),
+        (EventParticipant.__table__, EventParticipant.event_id == event_id),
+        (ParticipantMealsOnEvent.__table__, ParticipantMealsOnEvent.meal_id.in_(meal_ids)),
+        (NotificationDelivery.__table__, NotificationDelivery.event_id == event_id),
+    ]
+
+
+def _delete_event_rows(connection, event_id):
+    for table, criteria in reversed(_event_rows(event_id)):
+        connection.execute(delete(table).where(criteria))
+
+
+def _copy_event_rows(source, target, event_id):
+    copied = {}
+    for table, criteria in _event_rows(event_id):
+        # Generated columns are computed again on insert.
+        columns = [column for column in table.columns if column.computed is None]
+        result = source.execution_options(yield_per=COPY_BATCH_SIZE).execute(select(*columns).where(criteria))
+        copied[table.name] = 0
+        for rows in result.partitions():
+            target.execute(insert(table), [row._asdict() for row in rows])
+            copied[table.name] += len(rows)
+    return copied
+
+
+def _participant_ids(connection, event_id):
+    enrolled = select(EventParticipant.participant_id).where(EventParticipant.event_id == event_id)
+    notified = select(NotificationDelivery.participant_id).where(NotificationDelivery.event_id == event_id)
+    return connection.scalars(enrolled.union(notified)).all()
+
+
+def move_event(event_id, target):
+    """
+    Moves an event with all its rows to another shard.
+
+    Args:
+        event_id (int): The event.
+        target (str): The shard name.
+
+    Returns:
+        dict: Number of moved rows per table, empty when the event already is on ``target``.
+    """
+    source = shard_of(event_id)
+    if source == target:
+        return {}
+
+    source_engine, target_engine = shard_engine(source), shard_engine(target)
+    lock_key = (MOVE_LOCK_CLASS, event_id)
+
+    with source_engine.connect() as lock:
+        lock.execute(select(func.pg_advisory_lock(*lock_key)))
+        lock.commit()
+        try:
+            with source_engine.connect() as source_connection:
+                if source_connection.scalar(select(literal(1)).where(Event.id == event_id)) is None:
+                    raise LookupError(f'Event {event_id} is not on shard {source}')
+                # Normally replicated already; making sure keeps the foreign keys on the target satisfied.
+                replicate_participants(_participant_ids(source_connection, event_id))
+
+                with target_engine.begin() as target_connection:
+                    # Leftovers of an earlier attempt that failed after copying.
+                    _delete_event_rows(target_connection, event_id)
+                    copied = _copy_event_rows(source_connection, target_connection, event_id)
+
+            try:
+                with db.engine.begin() as primary:
+                    stmt = insert(EventShard).values(event_id=event_id, shard=target)
+                    primary.execute(stmt.on_conflict_do_update(
+                        index_elements=[EventShard.event_id], set_={'shard': stmt.excluded.shard}
+                    ))
+            except Exception:
+                with target_engine.begin() as target_connection:
+                    _delete_event_rows(target_connection, event_id)
+                raise
+
+            # Reads routed to the old shard before the switch may still be running.
+            time.sleep(current_app.config['SHARD_MOVE_GRACE_SECONDS'])
+            with source_engine.begin() as source_connection:
+                _delete_event_rows(source_connection, event_id)
+        finally:
+            lock.execute(select(func.pg_advisory_unlock(*lock_key)))
+            lock.commit()
+
+    logger.info("Moved event %s from shard %s to %s: %s", event_id, source, target, copied)
+    return copied
+
+
+def _event_weights():
+    enrolled = (
+        select(EventParticipant.event_id, func.count().label('rows'))
+        .group_by(EventParticipant.event_id)
+        .subquery()
+    )
+    planned = (
+        select(MealsOnEvent.event_id, func.count().label('rows'))
+        .join(ParticipantMealsOnEvent, ParticipantMealsOnEvent.meal_id == MealsOnEvent.id)
+        .group_by(MealsOnEvent.event_id)
+        .subquery()
+    )
+    return db.session.execute(
+        select(Event.id, 1 + func.coalesce(enrolled.c.rows, 0) + func.coalesce(planned.c.rows, 0))
+        .outerjoin(enrolled, enrolled.c.event_id == Event.id)
+        .outerjoin(planned, planned.c.event_id == Event.id)
+    ).all()
+
+
+def get_event_weights():
+    """
+    Returns the events of every shard with their weight, the number of rows they have on it.
+
+    Returns:
+        dict: ``{event_id: weight}`` per shard name.
+    """
+    return {shard: dict(rows) for shard, rows in scatter(_event_weights).items()}
+
+
+def plan_rebalance(weights, max_moves):
+    """
+    Greedily plans moves from the heaviest to the lightest shard: each time the heaviest event whose move
+    narrows the gap between the two, until no move does.
+
+    Args:
+        weights (dict): ``get_event_weights()``.
+        max_moves (int): Upper bound on the number of moves.
+
+    Returns:
+        list: ``(event_id, source, target, weight)`` tuples, in order.
+    """
+    events = {shard: dict(shard_weights) for shard, shard_weights in weights.items()}
+    loads = {shard: sum(shard_weights.values()) for shard, shard_weights in events.items()}
+    moves = []
+
+    while len(moves) < max_moves:
+        heaviest = max(loads, key=loads.get)
+        lightest = min(loads, key=loads.get)
+        gap = loads[heaviest] - loads[lightest]
+        candidates = [(weight, event_id) for event_id, weight in events[heaviest].items() if weight < gap]
+        if not candidates:
+            break
+
+        weight, event_id = max(candidates)
+        del events[heaviest][event_id]
+        events[lightest][event_id] = weight
+        loads[heaviest] -= weight
+        loads[lightest] += weight
+        moves.append((event_id, heaviest, lightest, weight))
+
+    return moves
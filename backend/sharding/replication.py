@@ -0,0 +1,96 @@
+"""
+Copies of the ``participants`` table on every shard.
+
+The primary database holds the participants; every other shard keeps a copy with the same ids, so event
+queries on a shard can join participants and enrolments keep their foreign keys. Views write participants
+on the primary and then replicate the change; ``flask shards sync-participants`` repairs a shard that missed
+changes (or is new).
+"""
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.extensions import db
+from backend.events.models import EventParticipant, Participant, ParticipantMealsOnEvent
+from .routing import shard_engine, shard_names, sharding_enabled
+from .session import DEFAULT_SHARD
+
+SYNC_BATCH_SIZE = 1000
+
+
+def _replica_shards():
+    return [shard for shard in shard_names() if shard != DEFAULT_SHARD]
+
+
+def _upsert(connection, rows):
+    table = Participant.__table__
+    stmt = insert(table).values([row._asdict() for row in rows])
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={column.name: stmt.excluded[column.name] for column in table.columns if column.name != 'id'},
+    ))
+
+
+def _delete(connection, participant_ids):
+    # Enrolments and meal plans on the shard reference the participant; notification deliveries cascade.
+    connection.execute(
+        delete(ParticipantMealsOnEvent).where(ParticipantMealsOnEvent.participant_id.in_(participant_ids))
+    )
+    connection.execute(delete(EventParticipant).where(EventParticipant.participant_id.in_(participant_ids)))
+    connection.execute(delete(Participant).where(Participant.id.in_(participant_ids)))
+
+
+def replicate_participants(participant_ids):
+    """
+    Copies the current state of participants from the primary to every other shard.
+    """
+    if not sharding_enabled() or not participant_ids:
+        return
+
+    with db.engine.connect() as primary:
+        rows = primary.execute(select(Participant.__table__).where(Participant.id.in_(participant_ids))).all()
+    if not rows:
+        return
+    for shard in _replica_shards():
+        with shard_engine(shard).begin() as connection:
+            _upsert(connection, rows)
+
+
+def delete_replicated_participants(participant_ids):
+    """
+    Deletes participants, with their enrolments and meal plans, from every shard but the primary.
+    """
+    if not sharding_enabled() or not participant_ids:
+        return
+
+    for shard in _replica_shards():
+        with shard_engine(shard).begin() as connection:
+            _delete(connection, participant_ids)
+
+
+def sync_participants(shard):
+    """
+    Makes a shard's participants an exact copy of the primary's.
+
+    Returns:
+        tuple: Numbers of upserted and deleted participants.
+    """
+    upserted = 0
+    primary_ids = set()
+
+    with db.engine.connect() as primary, shard_engine(shard).begin() as connection:
+        result = primary.execution_options(yield_per=SYNC_BATCH_SIZE).execute(
+            select(Participant.__table__).order_by(Participant.id)
+        )
+        for rows in result.partitions():
+            _upsert(connection, rows)
+            primary_ids.update(row.id for row in rows)
+            upserted += len(rows)
+
+        stale_ids = [
+            participant_id for participant_id in connection.scalars(select(Participant.id))
+            if participant_id not in primary_ids
+        ]
+        for start in range(0, len(stale_ids), SYNC_BATCH_SIZE):
+            _delete(connection, stale_ids[start:start + SYNC_BATCH_SIZE])
+
+    return upserted, len(stale_ids)
@@ -0,0 +1,153 @@
+"""
+Shard routing of event data.
+
+Every event lives on one shard: the primary database (the ``default`` shard) or one of the databases in
+``SHARDS``. The shard map (``event_shards``) on the primary records where each event is, and requests are
+routed by the ``event_id`` in their URL, so one request only ever touches the event's shard and the
+primary. Views that are not about one event read every shard in parallel with ``scatter``.
+
+Without ``SHARDS`` configured every helper here is a no-op and no shard map lookup is made.
+"""
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, jsonify
+from sqlalchemy import delete, select
+
+from backend.extensions import db
+from .models import EventShard
+from .session import DEFAULT_SHARD
+
+
+def sharding_enabled():
+    return bool(current_app.config['SHARDS'])
+
+
+def shard_names():
+    """
+    Returns all shard names, ``default`` first; the position of a shard is its id sequence offset.
+    """
+    return [DEFAULT_SHARD, *current_app.config['SHARDS']]
+
+
+def shard_engine(shard):
+    return db.engines[None if shard == DEFAULT_SHARD else shard]
+
+
+def shard_of(event_id):
+    """
+    Looks up the shard of an event in the shard map.
+    """
+    if not sharding_enabled():
+        return DEFAULT_SHARD
+    # A connection of its own, so no transaction on the primary stays open for the rest of the request.
+    with db.engine.connect() as connection:
+        shard = connection.scalar(select(EventShard.shard).where(EventShard.event_id == event_id))
+    return shard or DEFAULT_SHARD
+
+
+def current_shard():
+    return db.session.info.get('shard') or DEFAULT_SHARD
+
+
+def use_shard(shard, event_ids=()):
+    """
+    Routes the session's statements on event data to a shard.
+
+    Args:
+        shard (str): The shard name.
+        event_ids (iterable): Events the session may write; its transactions on the shard hold their
+            move lock, so a concurrent ``move_event`` waits for them and they never write to a shard the
+            event has just left.
+    """
+    session = db.session()
+    session.info['shard'] = shard
+    session.info['event_ids'] = tuple(event_ids)
+
+
+def route_to_event(event_id):
+    if sharding_enabled():
+        use_shard(shard_of(event_id), [event_id])
+
+
+def route_by_event_id(endpoint, values):
+    """
+    ``url_value_preprocessor`` of blueprints whose routes carry ``<int:event_id>``.
+    """
+    if values and 'event_id' in values:
+        route_to_event(values['event_id'])
+
+
+def handle_event_moved(e):
+    response = jsonify({"message": "The event is being moved to another database; retry the request"})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def place_event(event, shard=None):
+    """
+    Assigns a new event its id and shard, before it is added to the session.
+
+    Event ids come from the primary's sequence, so they are unique across shards. The event goes to
+    ``shard`` if given (clones stay next to their source, which they are copied from) or else to one of
+    ``SHARD_NEW_EVENTS``, by id. Must be called inside a ``commit_section``.
+    """
+    if not sharding_enabled():
+        return
+
+    # The map entry and the event commit on different databases, without two-phase commit. When the
+    # primary's connection is the older one (new events) it commits first, and a failure in between leaves
+    # a map entry without an event; a clone can instead leave an unmapped copy, which nothing reads.
+    event.id = db.session.scalar(
+        select(event.__table__.c.id.default.next_value()), bind_arguments={'bind': db.engine}
+    )
+    if shard is None:
+        targets = current_app.config['SHARD_NEW_EVENTS'] or shard_names()
+        shard = targets[event.id % len(targets)]
+
+    db.session.add(EventShard(event_id=event.id, shard=shard))
+    use_shard(shard, db.session.info.get('event_ids', ()))
+
+
+def forget_event(event_id):
+    """
+    Removes a deleted event from the shard map. Must be called inside a ``commit_section``.
+    """
+    if sharding_enabled():
+        db.session.execute(delete(EventShard).where(EventShard.event_id == event_id))
+
+
+def scatter(fn):
+    """
+    Calls ``fn`` once per shard, in parallel threads, each with a session routed to that shard and in the
+    transaction mode of the calling session.
+
+    Returns:
+        dict: ``fn``'s result per shard name.
+    """
+    if not sharding_enabled():
+        return {DEFAULT_SHARD: fn()}
+
+    app = current_app._get_current_object()
+    transaction_mode = db.session.info.get('transaction_mode')
+
+    def run(shard):
+        with app.app_context():
+            db.session.info['transaction_mode'] = transaction_mode
+            use_shard(shard)
+            try:
+                return fn()
+            finally:
+                db.session.remove()
+
+    shards = shard_names()
+    with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+        return dict(zip(shards, executor.map(run, shards)))
+
+
+def scatter_sorted(fn, key):
+    """
+    ``scatter`` for queries returning rows ordered by ``key``; merges the rows of all shards in that order.
+    """
+    return list(heapq.merge(*scatter(fn).values(), key=key))
@@ -0,0 +1,86 @@
+"""
+The ``db.session`` class, which sends statements on event data to the shard the session is routed to.
+
+Kept free of application imports: ``backend.extensions`` builds ``db`` with it.
+"""
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session
+from sqlalchemy import column, event, func, select, table
+from sqlalchemy.sql.util import find_tables
+
+DEFAULT_SHARD = 'default'
+
+# Event data lives on the event's shard; participants are replicated to every shard so event queries can
+# join them. All other tables (users, jobs, the shard map) only live on the primary database.
+ROUTED_TABLES = frozenset({
+    'events', 'event_participants', 'meals_on_event', 'participant_meals_on_event', 'notification_deliveries',
+    'events_archive', 'event_participants_archive', 'meals_on_event_archive', 'participant_meals_on_event_archive',
+    'participants',
+})
+
+# Advisory lock class of event moves: writers hold it shared on their event, the mover exclusively.
+MOVE_LOCK_CLASS = 7301
+
+_events = table('events', column('id'))
+_event_shards = table('event_shards', column('event_id'), column('shard'))
+
+
+class EventMoved(Exception):
+    """The event was moved to another shard while the request was routed to its old one."""
+
+    def __init__(self, event_id):
+        super().__init__(event_id)
+        self.event_id = event_id
+
+
+def _is_routed(mapper, clause):
+    if mapper is not None:
+        return getattr(sa.inspect(mapper).local_table, 'name', None) in ROUTED_TABLES
+    if clause is not None:
+        return any(getattr(found, 'name', None) in ROUTED_TABLES for found in find_tables(clause, include_crud=True))
+    return False
+
+
+class RoutingSession(Session):
+    """
+    Statements on ``ROUTED_TABLES`` go to the shard set in ``info['shard']`` (see
+    ``backend.sharding.routing.use_shard``); everything else, and every statement of a session that is not
+    routed, to the primary database, which is also the ``default`` shard.
+    """
+
+    def shard_engine(self):
+        shard = self.info.get('shard')
+        return self._db.engines[None if shard in (None, DEFAULT_SHARD) else shard]
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        shard = self.info.get('shard')
+        if bind is None and shard not in (None, DEFAULT_SHARD) and _is_routed(mapper, clause):
+            return self._db.engines[shard]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_begin')
+def _lock_routed_events(session, transaction, connection):
+    """
+    Takes the move lock of the events a writing session is routed for, on their shard, and fails with
+    ``EventMoved`` if an event left the shard while the session waited for it.
+    """
+    event_ids = session.info.get('event_ids')
+    if not event_ids or session.info.get('transaction_mode') is not None:
+        return
+    if connection.engine is not session.shard_engine():
+        return
+
+    connection.execute(select(*[func.pg_advisory_xact_lock_shared(MOVE_LOCK_CLASS, id_) for id_ in event_ids]))
+    missing = set(event_ids) - set(connection.scalars(select(_events.c.id).where(_events.c.id.in_(event_ids))))
+    if not missing:
+        return
+
+    # Either deleted (the request then fails as usual) or moved: the shard map has the answer.
+    with session._db.engines[None].connect() as primary:
+        moved = primary.scalars(
+            select(_event_shards.c.event_id)
+            .where(_event_shards.c.event_id.in_(missing), _event_shards.c.shard != session.info['shard'])
+        ).first()
+    if moved is not None:
+        raise EventMoved(moved)
@@ -0,0 +1,222 @@
+"""
+Test harness.
+
+``TEST_DATABASE_URL`` names a PostgreSQL server and a database name prefix, e.g.
+``postgresql+psycopg2://postgres@localhost/events_test``; the user must be allowed to create databases.
+
+- The schema is migrated once into a template database, ``<prefix>_tpl_<hash of the migrations>``, with
+  ``flask db upgrade`` in a subprocess, so tests never load Alembic. It is reused by later runs until a
+  migration changes.
+- Every pytest-xdist worker clones it (``CREATE DATABASE ... TEMPLATE``) into ``<prefix>_<worker>``; without
+  pytest-xdist the one process is worker ``main``.
+- Every test runs in a transaction on one connection, rolled back afterwards. Requests made with ``client``
+  get sessions joined to it through SAVEPOINTs, so their commits and rollbacks only end a SAVEPOINT.
+  ``factories`` writes through a session of its own on the same connection.
+
+Code that opens connections of its own (``db.engine.connect()``, batch snapshots, shard moves) or writes from
+background threads (check-in writer) is outside that transaction. Tests of it use ``scratch_app``, an app on
+databases cloned for the test, where commits are real; they are dropped afterwards.
+"""
+import glob
+import hashlib
+import os
+import subprocess
+import sys
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.orm import Session
+
+from backend.app import create_app
+from backend.config import Config, _database_url, _shard_binds
+from backend.extensions import db
+from .factories import Factories
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MIGRATIONS_DIR = os.path.join(REPO_DIR, 'backend', 'migrations')
+# Serializes template builds and clones of all workers and runs on the server.
+TEMPLATE_LOCK_ID = 7302
+
+
+def _server_url():
+    url = os.getenv('TEST_DATABASE_URL')
+    if not url:
+        raise pytest.UsageError('TEST_DATABASE_URL must name a PostgreSQL server and database name prefix')
+    return make_url(url)
+
+
+def _migrations_digest():
+    digest = hashlib.sha1()
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, 'versions', '*.py'))) + [
+        os.path.join(MIGRATIONS_DIR, 'env.py')
+    ]:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:10]
+
+
+def _migrate(url):
+    env = dict(
+        os.environ, DATABASE_URL=url.render_as_string(hide_password=False), DATABASE_SHARDS='',
+        PYTHONPATH=os.pathsep.join(filter(None, [REPO_DIR, os.getenv('PYTHONPATH')])),
+    )
+    subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'backend.app', 'db', 'upgrade', '--directory', MIGRATIONS_DIR],
+        cwd=REPO_DIR, env=env, check=True, stdout=subprocess.DEVNULL,
+    )
+
+
+def _clone_template(server, database):
+    """
+    Creates ``database`` from the migrated template, building the template first if needed.
+    """
+    prefix = server.database
+    template = f'{prefix}_tpl_{_migrations_digest()}'
+    building = f'{template}_build'
+
+    engine = create_engine(server.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    with engine.connect() as connection:
+        connection.execute(text('SELECT pg_advisory_lock(:id)'), {'id': TEMPLATE_LOCK_ID})
+        try:
+            exists = connection.scalar(text('SELECT 1 FROM pg_database WHERE datname = :name'), {'name': template})
+            if not exists:
+                connection.execute(text(f'DROP DATABASE IF EXISTS "{building}"'))
+                # Not from template1, whose encoding may not be UTF8 (the blocking keys migration needs it).
+                connection.execute(text(f'CREATE DATABASE "{building}" ENCODING \'UTF8\' TEMPLATE template0'))
+                _migrate(server.set(database=building))
+                # Renamed only once complete, so an interrupted build is never cloned.
+                connection.execute(text(f'ALTER DATABASE "{building}" RENAME TO "{template}"'))
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{database}" WITH (FORCE)'))
+            connection.execute(text(f'CREATE DATABASE "{database}" TEMPLATE "{template}"'))
+        finally:
+            connection.execute(text('SELECT pg_advisory_unlock(:id)'), {'id': TEMPLATE_LOCK_ID})
+    return engine
+
+
+def _worker_database(server, suffix=''):
+    return f"{server.database}_{os.getenv('PYTEST_XDIST_WORKER', 'main')}{suffix}"
+
+
+def _test_config(server, database, shards=None):
+    """
+    The configuration of a test app on ``database``, with ``shards`` (``{name: database}``) as its shards.
+    """
+    def url(name):
+        return _database_url(server.set(database=name).render_as_string(hide_password=False), Config.DB_DRIVER)
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = url(database)
+        SHARDS = {name: url(shard_database) for name, shard_database in (shards or {}).items()}
+        SQLALCHEMY_BINDS = _shard_binds(SHARDS, Config.SQLALCHEMY_ENGINE_OPTIONS)
+        SHARD_NEW_EVENTS = []
+        SHARD_MOVE_GRACE_SECONDS = 0
+        ADMISSION_ENABLED = False
+        RATELIMIT_STORAGE_URL = None
+        FEED_CACHE_URL = None
+
+    return TestConfig
+
+
+@pytest.fixture(scope='session')
+def app():
+    server = _server_url()
+    database = _worker_database(server)
+    admin_engine = _clone_template(server, database)
+
+    app = create_app(_test_config(server, database))
+    # Sessions bound to a connection in a transaction run in SAVEPOINTs, so commit and rollback only
+    # end those; engine-bound sessions are unaffected.
+    with app.app_context():
+        db.session.configure(join_transaction_mode='create_savepoint')
+    yield app
+
+    with app.app_context():
+        db.engine.dispose()
+    with admin_engine.connect() as connection:
+        connection.execute(text(f'DROP DATABASE IF EXISTS "{database}" WITH (FORCE)'))
+    admin_engine.dispose()
+
+
+@pytest.fixture
+def connection(app):
+    """
+    The test's connection, in a transaction rolled back after the test; ``db.session`` uses it too.
+
+    The test runs in an app context, which commit hooks of the models (feed invalidation) need.
+    """
+    with app.app_context():
+        engines = db.engines
+        engine = engines[None]
+        connection = engine.connect()
+        transaction = connection.begin()
+        # Flask-SQLAlchemy binds sessions to the engines of the app; a connection works in their place.
+        engines[None] = connection
+        try:
+            yield connection
+        finally:
+            engines[None] = engine
+            transaction.rollback()
+            connection.close()
+
+
+@pytest.fixture
+def scratch_app():
+    """
+    ``scratch_app(shards=0)`` creates an app on a database cloned from the template for this test, and on
+    ``shards`` more as its shards ``shard1``, ``shard2``, ...; the test then runs in its app context.
+    Everything commits for real, from any thread or connection. Call it once per test.
+    """
+    server = _server_url()
+    databases, contexts = [], []
+
+    def make(shards=0):
+        database = _worker_database(server, '_scratch')
+        shard_databases = {f'shard{n}': f'{database}_shard{n}' for n in range(1, shards + 1)}
+        for name in [database, *shard_databases.values()]:
+            _clone_template(server, name).dispose()
+            databases.append(name)
+        app = create_app(_test_config(server, database, shard_databases))
+        contexts.append(app.app_context())
+        contexts[-1].push()
+        return app
+
+    yield make
+
+    for context in reversed(contexts):
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+        context.pop()
+    admin_engine = create_engine(server.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    with admin_engine.connect() as connection:
+        for name in databases:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    admin_engine.dispose()
+
+
+@pytest.fixture
+def session(connection):
+    """
+    A session for test code, on the test's connection; its objects stay usable after commits.
+    """
+    with Session(bind=connection, join_transaction_mode='create_savepoint', expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture
+def factories(session):
+    return Factories(session)
+
+
+@pytest.fixture
+def client(app, connection):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    with app.app_context():
+        token = create_access_token(identity='test-user')
+    return {'Authorization': f'Bearer {token}'}
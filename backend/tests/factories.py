@@ -0,0 +1,80 @@
+"""
+Factories for the event models.
+
+Each method creates one row with valid defaults, overridden by keyword arguments, and commits it - which
+only releases a SAVEPOINT of the test transaction - so requests of the same test see it. Related rows that
+are not given are created too.
+"""
+import itertools
+from datetime import datetime, timedelta
+
+from backend.events.models import Event, EventParticipant, MealsOnEvent, Participant, ParticipantMealsOnEvent
+
+# Far enough ahead to be upcoming, one week apart so enrolments never conflict by default.
+FIRST_EVENT_DATE = datetime(2040, 1, 1, 9, 0)
+
+
+class Factories:
+    def __init__(self, session):
+        self.session = session
+        self._sequence = itertools.count(1)
+
+    def _create(self, model, values):
+        obj = model(**values)
+        self.session.add(obj)
+        self.session.commit()
+        return obj
+
+    def event(self, **values):
+        n = next(self._sequence)
+        return self._create(Event, {
+            'name': f'Event {n}',
+            'date': FIRST_EVENT_DATE + timedelta(weeks=n),
+            'duration': 2,
+            'location': 'Main hall',
+            **values,
+        })
+
+    def participant(self, **values):
+        n = next(self._sequence)
+        return self._create(Participant, {
+            'first_name': 'Participant',
+            'last_name': str(n),
+            'email': f'participant{n}@example.com',
+            'is_vegetarian': False,
+            **values,
+        })
+
+    def event_participant(self, event=None, participant=None, **values):
+        event = event or self.event()
+        participant = participant or self.participant()
+        days = values.pop('attendance_days', range(1, event.duration + 1))
+        return self._create(EventParticipant, {
+            'event_id': event.id,
+            'participant_id': participant.id,
+            'days_in_event': len(days),
+            'attendance_mask': EventParticipant.attendance_mask_of(days),
+            'is_event_organizer': False,
+            **values,
+        })
+
+    def meal(self, event=None, **values):
+        event = event or self.event()
+        return self._create(MealsOnEvent, {
+            'event_id': event.id,
+            'name': 'Lunch',
+            'meal_type': 'lunch',
+            'is_vegetarian': False,
+            **values,
+        })
+
+    def participant_meal(self, meal=None, participant=None, **values):
+        meal = meal or self.meal()
+        participant = participant or self.participant()
+        return self._create(ParticipantMealsOnEvent, {
+            'meal_id': meal.id,
+            'participant_id': participant.id,
+            'day': 1,
+            'is_special_request': False,
+            **values,
+        })
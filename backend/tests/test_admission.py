@@ -0,0 +1,92 @@
+import time
+
+import pytest
+from flask import Flask
+
+from backend.config import Config
+from backend.util.admission import AdmissionControl, LocalTokenBuckets
+
+
+@pytest.fixture
+def admitted_app():
+    """
+    A bare app with admission control and one route of each class, so the limits do not depend on the
+    database or the login endpoints.
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(
+        ADMISSION_ENABLED=True,
+        RATELIMIT_STORAGE_URL=None,
+        RATELIMIT_RATES={'auth': (1, 1), 'write': (1, 2), 'read': (100, 100)},
+        ADMISSION_CONCURRENCY={'auth': 1, 'write': 1, 'read': 1},
+        ADMISSION_QUEUE_BUDGET={'auth': 0.1, 'write': 0.1, 'read': 0.1},
+    )
+    app.add_url_rule('/items', 'items', lambda: 'ok', methods=['GET', 'POST'])
+    admission = AdmissionControl(app)
+    app.extensions['admission'] = admission
+    return app
+
+
+def test_local_buckets_refill_over_time():
+    buckets = LocalTokenBuckets()
+
+    assert [buckets.take('key', 1000, 2)[0] for _ in range(3)] == [True, True, False]
+    time.sleep(0.01)
+    assert buckets.take('key', 1000, 2)[0]
+
+
+def test_local_buckets_forget_least_recently_used_keys():
+    buckets = LocalTokenBuckets(max_keys=1)
+    buckets.take('first', 1, 1)
+    buckets.take('second', 1, 1)
+
+    assert buckets.take('first', 1, 1)[0]
+
+
+def test_rate_limited_request_gets_429(admitted_app):
+    client = admitted_app.test_client()
+
+    statuses = [client.post('/items').status_code for _ in range(2)]
+    response = client.post('/items')
+
+    assert statuses == [200, 200]
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_rate_limits_are_per_route_class(admitted_app):
+    client = admitted_app.test_client()
+    for _ in range(3):
+        client.post('/items')
+
+    assert client.get('/items').status_code == 200
+
+
+def test_request_queued_past_its_budget_is_shed(admitted_app):
+    client = admitted_app.test_client()
+    accepted = f't={int((time.time() - 1) * 1000)}'
+
+    response = client.get('/items', headers={'X-Request-Start': accepted})
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+
+
+def test_request_without_free_slot_is_shed(admitted_app):
+    client = admitted_app.test_client()
+    slots = admitted_app.extensions['admission']._slots['read']
+    slots.acquire()
+    try:
+        assert client.get('/items').status_code == 503
+    finally:
+        slots.release()
+
+    assert client.get('/items').status_code == 200
+
+
+def test_unreachable_rate_limit_store_falls_back_to_local_buckets(admitted_app):
+    admitted_app.config['RATELIMIT_STORAGE_URL'] = 'redis://127.0.0.1:1/0'
+    client = admitted_app.test_client()
+
+    assert [client.post('/items').status_code for _ in range(3)] == [200, 200, 429]
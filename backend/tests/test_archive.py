@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.archive.db_utils import archive_events
+from backend.archive.export import export_year, read_archive
+from backend.archive.models import ArchivedEvent, ArchivedEventParticipant
+from backend.extensions import db
+from backend.sharding.moves import move_event
+from backend.sharding.routing import shard_engine, shard_names
+from backend.util.db import commit_section
+from .factories import Factories
+
+
+@pytest.fixture
+def archive_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'ARCHIVE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def archive(*events):
+    with commit_section():
+        return archive_events([event.id for event in events])
+
+
+def archived_names(year):
+    return sorted(row['name'] for row in read_archive(year, 'events'))
+
+
+def test_export_writes_archived_rows(archive_dir, factories):
+    enrolment = factories.event_participant(event=factories.event(name='Old', date=datetime(2020, 5, 1)))
+    moved = archive(enrolment.event)
+
+    exported = export_year(2020)
+
+    assert moved['events'] == 1
+    assert moved['event_participants'] == 1
+    assert exported['events'] == 1
+    assert exported['event_participants'] == 1
+    assert archived_names(2020) == ['Old']
+
+
+def test_export_after_purge_keeps_purged_rows(archive_dir, factories):
+    first = factories.event(name='First', date=datetime(2020, 5, 1))
+    archive(first)
+    export_year(2020, purge=True)
+    assert export_year(2020)['events'] == 1
+
+    archive(factories.event(name='Second', date=datetime(2020, 6, 1)))
+    export_year(2020)
+
+    assert archived_names(2020) == ['First', 'Second']
+
+
+def test_export_purge_deletes_archived_rows_on_every_shard(scratch_app, tmp_path):
+    app = scratch_app(shards=1)
+    app.config['ARCHIVE_DIR'] = str(tmp_path)
+    factories = Factories(Session(db.engine, expire_on_commit=False))
+    on_primary, on_shard = (
+        factories.event_participant(event=factories.event(name=name, date=datetime(2020, 5, 1))).event_id
+        for name in ('Primary', 'Shard')
+    )
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['shards', 'init']).exit_code == 0
+    move_event(on_shard, 'shard1')
+    assert runner.invoke(args=['archive', 'run']).exit_code == 0
+
+    result = runner.invoke(args=['archive', 'export', '2020', '--purge'])
+
+    assert result.exit_code == 0, result.output
+    assert archived_names(2020) == ['Primary', 'Shard']
+    for shard in shard_names():
+        with shard_engine(shard).connect() as connection:
+            assert connection.scalar(select(func.count()).select_from(ArchivedEvent)) == 0
+            assert connection.scalar(select(func.count()).select_from(ArchivedEventParticipant)) == 0
@@ -0,0 +1,37 @@
+from backend.events.models import ATTENDANCE_MAX_DAYS, EventParticipant
+
+
+def test_daily_headcount_counts_attended_days(client, auth_headers, factories):
+    event = factories.event(duration=3)
+    factories.event_participant(event=event, attendance_days=[1, 2, 3])
+    factories.event_participant(event=event, attendance_days=[2], participant=factories.participant(is_vegetarian=True))
+    factories.event_participant(attendance_days=[1])
+
+    response = client.get(f'/events/events/{event.id}/attendance', headers=auth_headers)
+
+    assert response.json == [
+        {'day': 1, 'headcount': 1, 'vegetarian_headcount': 0},
+        {'day': 2, 'headcount': 2, 'vegetarian_headcount': 1},
+        {'day': 3, 'headcount': 1, 'vegetarian_headcount': 0},
+    ]
+
+
+def test_enrolment_stores_attendance_days(client, auth_headers, factories, session):
+    event, participant = factories.event(duration=3), factories.participant()
+
+    response = client.post(f'/events/events/{event.id}/participants', headers=auth_headers, json={
+        'event_id': event.id, 'participant_id': participant.id, 'days_in_event': 2, 'attendance_days': [3, 1],
+        'is_event_organizer': False,
+    })
+
+    assert response.status_code == 201
+    enrolment = session.get(EventParticipant, response.json['event_participant']['id'])
+    assert enrolment.attendance_mask == 0b101
+    assert enrolment.attendance_days == [1, 3]
+
+
+def test_attendance_mask_holds_the_last_day():
+    enrolment = EventParticipant(attendance_mask=EventParticipant.attendance_mask_of(range(1, ATTENDANCE_MAX_DAYS + 1)))
+
+    assert enrolment.attendance_mask == 2 ** 63 - 1
+    assert enrolment.attendance_days == list(range(1, ATTENDANCE_MAX_DAYS + 1))
@@ -0,0 +1,67 @@
+from flask_jwt_extended import create_access_token, view_decorators
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from backend.batch.views import _begin_snapshot_transaction, _export_snapshot
+from backend.events.models import Event
+from backend.extensions import db
+from backend.sharding.session import DEFAULT_SHARD
+from .factories import Factories
+
+
+def batch(client, headers, *paths):
+    return client.post('/batch', headers=headers, json={
+        'requests': [{'id': str(n), 'path': path} for n, path in enumerate(paths)],
+    })
+
+
+def test_batch_verifies_the_token_once(scratch_app, monkeypatch):
+    app = scratch_app()
+    factories = Factories(Session(db.engine, expire_on_commit=False))
+    first, second = factories.event(name='First'), factories.event(name='Second')
+    headers = {'Authorization': f"Bearer {create_access_token(identity='test-user')}"}
+    decode = view_decorators._decode_jwt_from_request
+    decoded = []
+    monkeypatch.setattr(view_decorators, '_decode_jwt_from_request', lambda *args, **kwargs: (
+        decoded.append(args) or decode(*args, **kwargs)
+    ))
+
+    response = batch(app.test_client(), headers, f'/events/events/{first.id}', f'/events/events/{second.id}')
+
+    assert response.status_code == 200
+    assert [(r['status'], r['body']['name']) for r in response.json['responses']] == [(200, 'First'), (200, 'Second')]
+    assert len(decoded) == 1
+
+
+def test_batch_answers_sub_requests_separately(scratch_app):
+    app = scratch_app()
+    event = Factories(Session(db.engine, expire_on_commit=False)).event()
+    headers = {'Authorization': f"Bearer {create_access_token(identity='test-user')}"}
+
+    response = batch(app.test_client(), headers, f'/events/events/{event.id}', '/events/events/0', '/jobs/1')
+
+    assert [r['status'] for r in response.json['responses']] == [200, 404, 404]
+    assert response.json['responses'][2]['body'] == {'message': 'Not batchable'}
+
+
+def test_sub_requests_read_the_exported_snapshot(scratch_app):
+    app = scratch_app()
+    event = Factories(Session(db.engine, expire_on_commit=False)).event(name='Before')
+    snapshot_id = _export_snapshot(DEFAULT_SHARD)
+    with db.engine.begin() as connection:
+        connection.execute(update(Event).where(Event.id == event.id).values(name='After'))
+
+    # A sub-request's session, in an app context of its own.
+    with app.app_context():
+        _begin_snapshot_transaction(snapshot_id)
+        name = db.session.scalar(select(Event.name).where(Event.id == event.id))
+        db.session.remove()
+
+    assert name == 'Before'
+    assert db.session.scalar(select(Event.name).where(Event.id == event.id)) == 'Before'
+
+
+def test_batch_requires_a_token(client):
+    response = batch(client, {}, '/events/events')
+
+    assert response.status_code == 401
@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import select
+
+from backend.events.models import EventParticipant, ParticipantMealsOnEvent
+
+
+def enrolment_ids(session, event_id):
+    return session.scalars(
+        select(EventParticipant.id).where(EventParticipant.event_id == event_id).order_by(EventParticipant.id)
+    ).all()
+
+
+@pytest.fixture
+def enrolments(factories):
+    event = factories.event(duration=3)
+    return [
+        factories.event_participant(event=event, attendance_days=[1, 2, 3]),
+        factories.event_participant(event=event, attendance_days=[1]),
+        factories.event_participant(event=event, attendance_days=[2, 3]),
+    ]
+
+
+def test_bulk_patch_enrolments_by_ids(client, auth_headers, session, enrolments):
+    first, second, third = enrolments
+
+    response = client.patch(f'/events/events/{first.event_id}/participants', headers=auth_headers, json={
+        'ids': [first.id, third.id], 'patch': {'is_event_organizer': True},
+    })
+
+    assert response.status_code == 200
+    assert sorted(response.json['ids']) == [first.id, third.id]
+    session.expire_all()
+    assert [(e.is_event_organizer, e.version) for e in enrolments] == [(True, 2), (False, 1), (True, 2)]
+
+
+def test_bulk_patch_enrolments_by_filter(client, auth_headers, session, enrolments):
+    event_id = enrolments[0].event_id
+
+    response = client.patch(f'/events/events/{event_id}/participants', headers=auth_headers, json={
+        'filter': {'attends_day': 2}, 'patch': {'days_in_event': 1, 'attendance_days': [3]},
+    })
+
+    assert response.json['updated'] == 2
+    session.expire_all()
+    assert [(e.days_in_event, e.version) for e in enrolments] == [(1, 2), (1, 1), (1, 2)]
+    assert enrolments[0].attendance_mask == EventParticipant.attendance_mask_of([3])
+
+
+def test_bulk_patch_only_touches_the_event(client, auth_headers, factories, session, enrolments):
+    other = factories.event_participant()
+
+    client.patch(f'/events/events/{enrolments[0].event_id}/participants', headers=auth_headers, json={
+        'ids': [other.id], 'patch': {'is_event_organizer': True},
+    })
+
+    session.expire_all()
+    assert (other.is_event_organizer, other.version) == (False, 1)
+
+
+def test_bulk_delete_enrolments_by_filter(client, auth_headers, session, enrolments):
+    first, second, third = enrolments
+
+    response = client.delete(f'/events/events/{first.event_id}/participants', headers=auth_headers, json={
+        'filter': {'participant_ids': [second.participant_id, third.participant_id]},
+    })
+
+    assert response.status_code == 200
+    assert sorted(response.json['ids']) == [second.id, third.id]
+    assert enrolment_ids(session, first.event_id) == [first.id]
+
+
+@pytest.mark.parametrize('method', ['patch', 'delete'])
+def test_bulk_enrolments_reject_empty_filter(client, auth_headers, session, enrolments, method):
+    body = {'filter': {}}
+    if method == 'patch':
+        body['patch'] = {'is_event_organizer': True}
+
+    response = client.open(
+        f'/events/events/{enrolments[0].event_id}/participants', method=method.upper(), headers=auth_headers,
+        json=body,
+    )
+
+    assert response.status_code == 400
+    assert enrolment_ids(session, enrolments[0].event_id) == [enrolment.id for enrolment in enrolments]
+
+
+def test_bulk_patch_meal_plans(client, auth_headers, factories, session):
+    meal = factories.meal()
+    plans = [factories.participant_meal(meal=meal, day=day) for day in (1, 2)]
+
+    response = client.patch(f'/events/events/{meal.event_id}/meal-plans', headers=auth_headers, json={
+        'filter': {'day': 2}, 'patch': {'is_special_request': True},
+    })
+
+    assert response.json['ids'] == [plans[1].id]
+    session.expire_all()
+    assert [(plan.is_special_request, plan.version) for plan in plans] == [(False, 1), (True, 2)]
+
+
+def test_bulk_patch_meal_plans_rejects_meal_of_other_event(client, auth_headers, factories):
+    plan = factories.participant_meal()
+    other_meal = factories.meal()
+
+    response = client.patch(f'/events/events/{plan.meal.event_id}/meal-plans', headers=auth_headers, json={
+        'ids': [plan.id], 'patch': {'meal_id': other_meal.id},
+    })
+
+    assert response.status_code == 400
+
+
+def test_bulk_delete_meal_plans(client, auth_headers, factories, session):
+    meal = factories.meal()
+    kept, deleted = (factories.participant_meal(meal=meal) for _ in range(2))
+
+    response = client.delete(f'/events/events/{meal.event_id}/meal-plans', headers=auth_headers, json={
+        'ids': [deleted.id],
+    })
+
+    assert response.json['deleted'] == 1
+    assert session.scalars(
+        select(ParticipantMealsOnEvent.id).where(ParticipantMealsOnEvent.meal_id == meal.id)
+    ).all() == [kept.id]
@@ -0,0 +1,83 @@
+import logging
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.checkin.roster import CheckinWriter, RosterIndex
+from backend.events.models import EventParticipant
+from backend.extensions import db
+from .factories import Factories
+
+ARRIVAL = datetime(2040, 1, 8, 8, 0)
+
+
+@pytest.fixture
+def config(app):
+    return {**app.config, 'CHECKIN_ROSTER_MAX_EVENTS': 2}
+
+
+def test_roster_loads_enrolments_and_check_ins(factories, config):
+    event = factories.event()
+    arrived = factories.event_participant(event=event, checked_in_at=datetime(2040, 1, 8, 8, 0))
+    expected = factories.event_participant(event=event)
+
+    roster = RosterIndex().get(event.id, config)
+
+    assert roster.enrolled == {arrived.id, expected.id}
+    assert set(roster.checked_in) == {arrived.id}
+
+
+def test_roster_index_keeps_most_recently_used_events(factories, config):
+    index = RosterIndex()
+    first, second, third = (factories.event() for _ in range(3))
+
+    kept = index.get(first.id, config)
+    evicted = index.get(second.id, config)
+    index.get(first.id, config)
+    index.get(third.id, config)
+
+    assert index.get(first.id, config) is kept
+    assert index.get(second.id, config) is not evicted
+
+
+def check_ins(*enrolments):
+    return db.session.execute(
+        select(EventParticipant.checked_in_at, EventParticipant.version)
+        .where(EventParticipant.id.in_([enrolment.id for enrolment in enrolments]))
+        .order_by(EventParticipant.id)
+    ).all()
+
+
+def test_writer_thread_writes_check_ins_once(scratch_app):
+    app = scratch_app()
+    factories = Factories(Session(db.engine, expire_on_commit=False))
+    enrolment = factories.event_participant(checked_in_at=None)
+    writer = CheckinWriter()
+
+    writer.submit(app, enrolment.event_id, enrolment.id, ARRIVAL)
+    writer.submit(app, enrolment.event_id, enrolment.id, datetime(2040, 1, 8, 9, 0))
+    writer._drain()
+
+    assert check_ins(enrolment) == [(ARRIVAL, 2)]
+
+
+def test_writer_drops_check_ins_that_keep_failing(scratch_app, caplog):
+    scratch_app()
+    factories = Factories(Session(db.engine, expire_on_commit=False))
+    enrolment, other = factories.event_participant(), factories.event_participant()
+    writer = CheckinWriter()
+    # Not a time, so its write always fails.
+    bad = (other.event_id, other.id, 'soon', 0)
+
+    assert not writer._write_batch([(enrolment.event_id, enrolment.id, ARRIVAL, 0), bad], 2)
+    assert check_ins(enrolment, other) == [(ARRIVAL, 2), (None, 1)]
+    retried = writer._queue.get_nowait()
+    assert retried == bad[:3] + (1,)
+
+    with caplog.at_level(logging.ERROR, logger='backend.checkin.roster'):
+        assert not writer._write_batch([retried], 2)
+
+    assert writer._queue.empty()
+    assert 'Dropped 1 check-ins that failed 2 times' in caplog.text
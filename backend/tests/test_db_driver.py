@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import select, text, update
+
+from backend.config import Config, _database_url, _engine_options
+from backend.events.models import Participant
+from backend.extensions import db
+from backend.util.db import pipeline
+
+psycopg_only = pytest.mark.skipif(Config.DB_DRIVER != 'psycopg', reason='needs DB_DRIVER=psycopg')
+
+
+@pytest.mark.parametrize('url, driver, expected', [
+    ('postgresql://u@h/db', 'psycopg2', 'postgresql://u@h/db'),
+    ('postgresql://u@h/db', 'psycopg', 'postgresql+psycopg://u@h/db'),
+    ('postgresql+psycopg2://u@h/db', 'psycopg', 'postgresql+psycopg://u@h/db'),
+    (None, 'psycopg', None),
+])
+def test_database_url_follows_driver(url, driver, expected):
+    assert _database_url(url, driver) == expected
+
+
+def test_engine_options():
+    assert _engine_options('psycopg2', 2) == {}
+    assert _engine_options('psycopg', None) == {'connect_args': {'prepare_threshold': None}}
+
+
+def test_pipeline_runs_statements(connection, factories):
+    participants = [factories.participant(), factories.participant()]
+
+    with pipeline():
+        for participant in participants:
+            db.session.execute(
+                update(Participant).where(Participant.id == participant.id).values(first_name='Piped'),
+                execution_options={'synchronize_session': False},
+            )
+
+    assert db.session.scalars(
+        select(Participant.first_name).where(Participant.id.in_([p.id for p in participants]))
+    ).all() == ['Piped', 'Piped']
+
+
+def test_pipeline_raises_errors(connection):
+    with pytest.raises(Exception, match='division by zero'):
+        with pipeline():
+            db.session.execute(text('SELECT 1 / 0'))
+
+
+@psycopg_only
+def test_repeated_queries_are_prepared(connection, factories):
+    participant = factories.participant()
+    query = select(Participant.email).where(Participant.id == participant.id)
+
+    for _ in range(Config.DB_PREPARE_THRESHOLD + 1):
+        db.session.execute(query)
+
+    prepared = db.session.scalars(text('SELECT statement FROM pg_prepared_statements')).all()
+    assert any('FROM participants' in statement for statement in prepared)
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import select
+
+from backend.dedupe.merge import merge_participants
+from backend.events.models import EventParticipant, Participant, ParticipantMealsOnEvent
+
+
+def enrolments_of(session, participant_id):
+    return session.execute(
+        select(EventParticipant.id, EventParticipant.event_id, EventParticipant.version)
+        .where(EventParticipant.participant_id == participant_id)
+        .order_by(EventParticipant.id)
+    ).all()
+
+
+def exists(session, model, id_):
+    return session.scalar(select(model.id).where(model.id == id_)) is not None
+
+
+def test_merge_moves_rows_to_survivor(factories, session):
+    survivor, duplicate = factories.participant(), factories.participant()
+    enrolment = factories.event_participant(participant=duplicate)
+
+    counts = merge_participants({duplicate.id: survivor.id})
+
+    assert counts['event_participants'] == (1, 0)
+    assert enrolments_of(session, survivor.id) == [(enrolment.id, enrolment.event_id, 2)]
+    assert not exists(session, Participant, duplicate.id)
+
+
+def test_merge_keeps_survivors_own_row_on_collision(factories, session):
+    survivor, duplicate = factories.participant(), factories.participant()
+    event = factories.event()
+    duplicates_row = factories.event_participant(event=event, participant=duplicate)
+    survivors_row = factories.event_participant(event=event, participant=survivor)
+
+    counts = merge_participants({duplicate.id: survivor.id})
+
+    assert counts['event_participants'] == (0, 1)
+    assert enrolments_of(session, survivor.id) == [(survivors_row.id, event.id, 1)]
+    assert not exists(session, EventParticipant, duplicates_row.id)
+
+
+def test_merge_keeps_one_row_of_several_duplicates(factories, session):
+    survivor, first, second = factories.participant(), factories.participant(), factories.participant()
+    meal = factories.meal()
+    kept = factories.participant_meal(meal=meal, participant=first, day=1)
+    factories.participant_meal(meal=meal, participant=second, day=1)
+    other_day = factories.participant_meal(meal=meal, participant=second, day=2)
+
+    counts = merge_participants({first.id: survivor.id, second.id: survivor.id})
+
+    assert counts['participant_meals_on_event'] == (2, 1)
+    assert session.scalars(
+        select(ParticipantMealsOnEvent.id)
+        .where(ParticipantMealsOnEvent.participant_id == survivor.id)
+        .order_by(ParticipantMealsOnEvent.id)
+    ).all() == [kept.id, other_day.id]
+
+
+def test_merge_rejects_chained_survivors(factories):
+    first, second, third = factories.participant(), factories.participant(), factories.participant()
+
+    with pytest.raises(ValueError):
+        merge_participants({first.id: second.id, second.id: third.id})
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+import time
+
+import pytest
+
+from backend.feeds.tokens import make_feed_token
+
+
+def feed_path(kind, feed_id):
+    return f'/feeds/{make_feed_token(kind, feed_id)}.ics'
+
+
+def test_participant_feed_lists_enrolled_events(client, factories):
+    enrolment = factories.event_participant(event=factories.event(name='Camp'))
+    factories.event(name='Other')
+
+    response = client.get(feed_path('participant', enrolment.participant_id))
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/calendar'
+    assert 'SUMMARY:Camp' in response.text
+    assert 'SUMMARY:Other' not in response.text
+
+
+def test_feed_with_bad_token(client):
+    assert client.get('/feeds/not-a-token.ics').status_code == 404
+
+
+def test_feed_revalidates_with_etag(client, factories):
+    event = factories.event()
+    path = feed_path('event', event.id)
+    etag = client.get(path).headers['ETag']
+
+    response = client.get(path, headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+
+
+def test_feed_changes_after_event_update(client, auth_headers, factories):
+    enrolment = factories.event_participant()
+    path = feed_path('participant', enrolment.participant_id)
+    etag = client.get(path).headers['ETag']
+
+    client.patch(f'/events/events/{enrolment.event_id}', headers=auth_headers, json={
+        'name': 'Moved', 'date': '2041-03-01T09:00:00', 'location': 'Lake', 'duration': 2,
+    })
+    response = client.get(path, headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert 'SUMMARY:Moved' in response.text
+
+
+def test_feed_url_requires_login(client, factories):
+    participant = factories.participant()
+
+    assert client.get(f'/feeds/participants/{participant.id}').status_code == 401
+
+
+def test_feed_url(client, auth_headers, factories):
+    participant = factories.participant()
+
+    response = client.get(f'/feeds/participants/{participant.id}', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json['url'].endswith(feed_path('participant', participant.id))
+
+
+@pytest.fixture
+def pacific_time(monkeypatch):
+    monkeypatch.setenv('TZ', 'America/Los_Angeles')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_feed_reports_local_audit_dates_in_utc(client, factories, pacific_time):
+    event = factories.event(creation_date=datetime(2040, 1, 15, 9, 30))
+
+    response = client.get(feed_path('event', event.id))
+
+    assert 'LAST-MODIFIED:20400115T173000Z' in response.text
+    assert response.last_modified == datetime(2040, 1, 15, 17, 30, tzinfo=timezone.utc)
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from backend.forecasting import history
+from backend.forecasting.history import refresh_history
+
+
+def finished_event_with_check_in(factories):
+    enrolment = factories.event_participant(
+        event=factories.event(date=datetime(2020, 5, 1)), checked_in_at=datetime(2020, 5, 1, 8, 0)
+    )
+    factories.participant_meal(meal=factories.meal(event=enrolment.event), participant=enrolment.participant)
+    return enrolment.event
+
+
+def test_refresh_history_adds_finished_events_once(factories):
+    finished_event_with_check_in(factories)
+
+    assert refresh_history() == 1
+    assert refresh_history() == 0
+
+
+def test_refresh_history_skips_rows_added_concurrently(factories, monkeypatch):
+    finished_event_with_check_in(factories)
+    refresh_history()
+    # As if another refresh added the event after this one read the history.
+    shard_history = history._shard_history
+    monkeypatch.setattr(history, '_shard_history', lambda known_ids, now: shard_history(set(), now))
+
+    assert refresh_history() == 0
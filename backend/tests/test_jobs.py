@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import func, text
+
+from backend.jobs.models import Job, QUEUED, RUNNING
+from backend.jobs.registry import load_job_types
+from backend.jobs.worker import requeue_lost_jobs
+
+
+@pytest.fixture(autouse=True)
+def job_types():
+    return load_job_types()
+
+
+def running_job(session, seconds_since_heartbeat):
+    job = Job(
+        type='event_delete', status=RUNNING, payload={},
+        heartbeat_at=func.now() - func.make_interval(0, 0, 0, 0, 0, 0, seconds_since_heartbeat),
+    )
+    session.add(job)
+    session.commit()
+    return job
+
+
+def test_requeue_lost_jobs(session):
+    alive = running_job(session, 60)
+    lost = running_job(session, 7200)
+
+    requeue_lost_jobs()
+
+    session.expire_all()
+    assert session.get(Job, alive.id).status == RUNNING
+    assert session.get(Job, lost.id).status == QUEUED
+
+
+def test_requeue_lost_jobs_in_time_zone_behind_utc(session):
+    # Heartbeats are written in database time, which is local time of the session's zone.
+    session.execute(text("SET TIME ZONE 'America/Los_Angeles'"))
+    alive = running_job(session, 60)
+
+    requeue_lost_jobs()
+
+    session.expire_all()
+    assert session.get(Job, alive.id).status == RUNNING
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import select
+
+from backend.events.models import MealsOnEvent, ParticipantMealsOnEvent
+from backend.jobs.models import Job
+
+
+def planned(session, event_id):
+    return set(session.execute(
+        select(ParticipantMealsOnEvent.participant_id, ParticipantMealsOnEvent.day, ParticipantMealsOnEvent.meal_id)
+        .join(ParticipantMealsOnEvent.meal)
+        .where(MealsOnEvent.event_id == event_id)
+    ).all())
+
+
+@pytest.fixture
+def event(factories):
+    return factories.event(duration=2)
+
+
+@pytest.fixture
+def meals(factories, event):
+    return {
+        'lunch': factories.meal(event=event, meal_type='lunch', is_vegetarian=False),
+        'veggie_lunch': factories.meal(event=event, meal_type='lunch', is_vegetarian=True),
+        'dinner': factories.meal(event=event, meal_type='dinner', is_vegetarian=True),
+    }
+
+
+def generate(client, auth_headers, event_id, **param):
+    return client.post(f'/events/events/{event_id}/meal-plans/generate', headers=auth_headers, json=param)
+
+
+def test_generate_plans_attended_days(client, auth_headers, factories, session, event, meals):
+    meat_eater = factories.event_participant(event=event, attendance_days=[2]).participant_id
+    vegetarian = factories.event_participant(
+        event=event, participant=factories.participant(is_vegetarian=True), attendance_days=[1, 2]
+    ).participant_id
+
+    response = generate(client, auth_headers, event.id)
+
+    assert response.status_code == 201
+    assert response.json['created'] == 6
+    assert planned(session, event.id) == {
+        (meat_eater, 2, meals['lunch'].id),
+        (meat_eater, 2, meals['dinner'].id),
+        (vegetarian, 1, meals['veggie_lunch'].id),
+        (vegetarian, 1, meals['dinner'].id),
+        (vegetarian, 2, meals['veggie_lunch'].id),
+        (vegetarian, 2, meals['dinner'].id),
+    }
+
+
+def test_generate_skips_planned_meal_types(client, auth_headers, factories, session, event, meals):
+    enrolment = factories.event_participant(event=event, attendance_days=[1])
+    factories.participant_meal(meal=meals['veggie_lunch'], participant=enrolment.participant, day=1)
+
+    response = generate(client, auth_headers, event.id)
+
+    assert response.json['per_meal'] == [{'meal_id': meals['dinner'].id, 'count': 1}]
+    assert generate(client, auth_headers, event.id).json['created'] == 0
+
+
+def test_generate_dry_run_writes_nothing(client, auth_headers, factories, session, event, meals):
+    factories.event_participant(event=event)
+
+    response = generate(client, auth_headers, event.id, dry_run=True)
+
+    assert response.status_code == 200
+    assert response.json['created'] == 4
+    assert planned(session, event.id) == set()
+
+
+def test_generate_in_background(client, auth_headers, session, event):
+    response = generate(client, auth_headers, event.id, background=True)
+
+    assert response.status_code == 202
+    assert session.get(Job, response.json['job_id']).type == 'generate_meal_plans'
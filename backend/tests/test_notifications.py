@@ -0,0 +1,53 @@
+from sqlalchemy import select
+
+from backend.extensions import db
+from backend.notifications.db_utils import pending_recipients_select, record_deliveries
+from backend.notifications.models import FAILED, MEAL_PLAN_CONFIRMATION, REMINDER, SENT, NotificationDelivery
+
+
+def pending(event_id, kind=REMINDER):
+    return [row.participant_id for row in db.session.execute(pending_recipients_select(event_id, kind))]
+
+
+def deliveries(event_id):
+    return {
+        delivery.participant_id: (delivery.status, delivery.attempts, delivery.error)
+        for delivery in db.session.scalars(select(NotificationDelivery).where(NotificationDelivery.event_id == event_id))
+    }
+
+
+def test_pending_recipients_skip_sent(factories):
+    event = factories.event()
+    sent, failed, new = (factories.event_participant(event=event) for _ in range(3))
+    record_deliveries(event.id, REMINDER, [(sent.participant_id, None), (failed.participant_id, 'bounced')])
+
+    assert pending(event.id) == [failed.participant_id, new.participant_id]
+    assert pending(event.id, MEAL_PLAN_CONFIRMATION) == [
+        sent.participant_id, failed.participant_id, new.participant_id
+    ]
+
+
+def test_participant_enrolled_twice_is_a_recipient_once(factories):
+    enrolment = factories.event_participant()
+    factories.event_participant(event=enrolment.event, participant=enrolment.participant)
+
+    assert pending(enrolment.event_id) == [enrolment.participant_id]
+
+
+def test_record_deliveries_upserts(factories):
+    enrolment = factories.event_participant()
+    record_deliveries(enrolment.event_id, REMINDER, [(enrolment.participant_id, 'timeout')])
+
+    record_deliveries(enrolment.event_id, REMINDER, [(enrolment.participant_id, None)])
+
+    assert deliveries(enrolment.event_id) == {enrolment.participant_id: (SENT, 2, None)}
+
+
+def test_record_deliveries_with_repeated_participant(factories):
+    enrolment = factories.event_participant()
+
+    record_deliveries(enrolment.event_id, REMINDER, [
+        (enrolment.participant_id, None), (enrolment.participant_id, 'timeout'),
+    ])
+
+    assert deliveries(enrolment.event_id) == {enrolment.participant_id: (FAILED, 1, 'timeout')}
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import Column, Integer, text
+from sqlalchemy.exc import OperationalError
+
+from backend.extensions import db
+from backend.util import online_migrations
+
+
+@pytest.fixture
+def migration(scratch_app):
+    """
+    Runs the helpers against a scratch database as a migration would, in a transaction they step out of.
+    """
+    scratch_app()
+    with db.engine.connect() as connection:
+        connection.execute(text('CREATE TABLE items (id integer PRIMARY KEY, size integer)'))
+        connection.execute(text('INSERT INTO items SELECT n, NULL FROM generate_series(1, 25) n'))
+        connection.commit()
+        context = MigrationContext.configure(connection)
+        with Operations.context(context), context.begin_transaction():
+            yield connection
+
+
+def scalar(sql):
+    with db.engine.connect() as connection:
+        return connection.scalar(text(sql))
+
+
+def test_batched_backfill_updates_rows_in_batches(migration):
+    updated = online_migrations.batched_backfill('items', 'size = id * 2', 'size IS NULL', batch_size=10, pause=0)
+
+    assert updated == 25
+    assert scalar('SELECT sum(size) FROM items') == 2 * sum(range(1, 26))
+    assert online_migrations.batched_backfill('items', 'size = 0', 'size IS NULL', batch_size=10, pause=0) == 0
+
+
+def test_set_not_null_online(migration):
+    online_migrations.batched_backfill('items', 'size = 1', batch_size=100, pause=0)
+
+    online_migrations.set_not_null_online('items', 'size')
+
+    assert scalar("SELECT attnotnull FROM pg_attribute WHERE attrelid = 'items'::regclass AND attname = 'size'")
+    assert scalar("SELECT count(*) FROM pg_constraint WHERE conrelid = 'items'::regclass") == 1
+
+
+def test_add_column_retries_while_the_table_is_locked(migration):
+    engine = db.engine
+    locked, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with engine.connect() as connection:
+            connection.execute(text('LOCK TABLE items IN ACCESS SHARE MODE'))
+            locked.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    assert locked.wait(5)
+    threading.Timer(0.3, release.set).start()
+
+    online_migrations.add_column_online(
+        'items', Column('weight', Integer, nullable=True), lock_timeout='50ms', attempts=10, backoff=0.05
+    )
+
+    holder.join()
+    assert scalar("SELECT count(*) FROM information_schema.columns WHERE table_name = 'items'") == 3
+
+
+def test_add_column_gives_up_after_its_attempts(migration):
+    with db.engine.connect() as connection:
+        connection.execute(text('LOCK TABLE items IN ACCESS SHARE MODE'))
+
+        with pytest.raises(OperationalError):
+            online_migrations.add_column_online(
+                'items', Column('weight', Integer, nullable=True), lock_timeout='50ms', attempts=2, backoff=0
+            )
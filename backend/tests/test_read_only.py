@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import InternalError, OperationalError
+
+from backend.events.models import Participant
+from backend.extensions import db
+from backend.util.db import pin_transaction, read_only
+
+
+def show(*settings):
+    return tuple(db.session.scalar(text(f'SHOW {setting}')) for setting in settings)
+
+
+def test_read_only_view_cannot_write(connection):
+    @read_only()
+    def view():
+        assert show('transaction_read_only') == ('on',)
+        db.session.execute(insert(Participant).values(
+            first_name='Ada', last_name='Lovelace', email='ada@example.com', is_vegetarian=False,
+        ))
+
+    with pytest.raises((InternalError, OperationalError), match='read-only transaction'):
+        view()
+
+
+def test_read_only_view_does_not_autoflush(connection):
+    @read_only()
+    def view():
+        db.session.add(Participant(first_name='Ada', last_name='Lovelace', email='ada@example.com',
+                                   is_vegetarian=False))
+        return db.session.scalar(select(Participant.id).where(Participant.email == 'ada@example.com'))
+
+    assert view() is None
+
+
+def test_read_only_view_closes_the_session(connection, factories):
+    participant_id = factories.participant().id
+
+    @read_only()
+    def view():
+        return db.session.get(Participant, participant_id)
+
+    participant = view()
+
+    assert participant not in db.session
+    assert 'transaction_mode' not in db.session.info
+    assert show('transaction_read_only') == ('off',)
+
+
+def test_pinned_transaction_stays_open(connection):
+    db.session.execute(text('SELECT 1'))
+    pin_transaction()
+
+    @read_only()
+    def view():
+        return show('transaction_read_only')
+
+    try:
+        assert view() == ('off',)
+        assert db.session().in_transaction()
+    finally:
+        db.session.info.pop('pinned_transaction')
+        db.session.close()
+
+
+def test_deferrable_view_reads_a_serializable_snapshot(scratch_app):
+    scratch_app()
+
+    @read_only(deferrable=True)
+    def view():
+        return show('transaction_isolation', 'transaction_read_only', 'transaction_deferrable')
+
+    assert view() == ('serializable', 'on', 'on')
@@ -0,0 +1,89 @@
+import threading
+from datetime import datetime
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.events.db_utils import SCHEDULE_LOCK_CLASS
+from backend.events.models import EventParticipant
+from backend.extensions import db
+from .factories import Factories
+
+
+def enrol(client, headers, event, participant, **values):
+    return client.post(f'/events/events/{event.id}/participants', headers=headers, json={
+        'event_id': event.id, 'participant_id': participant.id, 'days_in_event': 1, 'is_event_organizer': False,
+        **values,
+    })
+
+
+def test_enrolment_in_overlapping_event_conflicts(client, auth_headers, factories):
+    enrolled = factories.event_participant(event=factories.event(date=datetime(2040, 6, 1), duration=3))
+    overlapping = factories.event(date=datetime(2040, 6, 3), duration=1)
+
+    response = enrol(client, auth_headers, overlapping, enrolled.participant)
+
+    assert response.status_code == 409
+    assert [event['id'] for event in response.json['conflicts']] == [enrolled.event_id]
+
+
+def test_enrolment_after_event_ends_does_not_conflict(client, auth_headers, factories):
+    enrolled = factories.event_participant(event=factories.event(date=datetime(2040, 6, 1), duration=3))
+    following = factories.event(date=datetime(2040, 6, 4), duration=1)
+
+    assert enrol(client, auth_headers, following, enrolled.participant).status_code == 201
+
+
+def test_enrolment_can_ignore_conflicts(client, auth_headers, factories):
+    enrolled = factories.event_participant(event=factories.event(date=datetime(2040, 6, 1), duration=3))
+    overlapping = factories.event(date=datetime(2040, 6, 2), duration=1)
+
+    response = enrol(client, auth_headers, overlapping, enrolled.participant, ignore_conflicts=True)
+
+    assert response.status_code == 201
+
+
+def test_availability_splits_window_into_busy_and_free(client, auth_headers, factories):
+    enrolled = factories.event_participant(event=factories.event(date=datetime(2040, 6, 2), duration=2))
+
+    response = client.get(
+        f'/events/participants/{enrolled.participant_id}/availability', headers=auth_headers,
+        query_string={'start': '2040-06-01T00:00:00', 'end': '2040-06-10T00:00:00'},
+    )
+
+    assert response.json == {
+        'busy': [{'start': '2040-06-02T00:00:00', 'end': '2040-06-04T00:00:00'}],
+        'free': [
+            {'start': '2040-06-01T00:00:00', 'end': '2040-06-02T00:00:00'},
+            {'start': '2040-06-04T00:00:00', 'end': '2040-06-10T00:00:00'},
+        ],
+    }
+
+
+def test_concurrent_enrolment_waits_for_the_schedule_lock(scratch_app):
+    app = scratch_app()
+    factories = Factories(Session(db.engine, expire_on_commit=False))
+    participant = factories.participant()
+    first, second = factories.event(date=datetime(2040, 6, 1)), factories.event(date=datetime(2040, 6, 2))
+    headers = {'Authorization': f"Bearer {create_access_token(identity='test-user')}"}
+    responses = []
+
+    # Stands in for another request enrolling the participant in ``first``, between its check and commit.
+    with db.engine.connect() as other:
+        other.execute(select(func.pg_advisory_xact_lock(SCHEDULE_LOCK_CLASS, participant.id)))
+        request = threading.Thread(
+            target=lambda: responses.append(enrol(app.test_client(), headers, second, participant))
+        )
+        request.start()
+        request.join(timeout=0.5)
+        assert request.is_alive()
+
+        other.execute(EventParticipant.__table__.insert().values(
+            event_id=first.id, participant_id=participant.id, days_in_event=1, attendance_mask=1,
+            is_event_organizer=False,
+        ))
+        other.commit()
+        request.join(timeout=10)
+
+    assert [response.status_code for response in responses] == [409]
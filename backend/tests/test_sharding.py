@@ -0,0 +1,83 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.events.models import Event, EventParticipant, MealsOnEvent, ParticipantMealsOnEvent
+from backend.extensions import db
+from backend.sharding.models import EventShard
+from backend.sharding.moves import move_event, plan_rebalance
+from backend.sharding.routing import shard_engine, use_shard
+from backend.sharding.session import EventMoved
+from .factories import Factories
+
+
+def count(shard, model, **criteria):
+    with shard_engine(shard).connect() as connection:
+        return connection.scalar(select(func.count()).select_from(model).filter_by(**criteria))
+
+
+@pytest.fixture
+def sharded(scratch_app):
+    app = scratch_app(shards=2)
+    factories = Factories(Session(db.engine, expire_on_commit=False))
+    factories.participant()
+    assert app.test_cli_runner().invoke(args=['shards', 'init']).exit_code == 0
+    headers = {'Authorization': f'Bearer {create_access_token(identity="test-user")}'}
+    return app, factories, headers
+
+
+def test_plan_rebalance_moves_events_that_narrow_the_gap():
+    weights = {'default': {1: 10, 2: 4, 3: 1}, 'shard1': {}, 'shard2': {4: 6}}
+
+    # After the first move shard1 is heaviest, and moving its only event back would not narrow the gap.
+    assert plan_rebalance(weights, max_moves=10) == [(1, 'default', 'shard1', 10)]
+    assert plan_rebalance(weights, max_moves=0) == []
+
+
+def test_new_events_go_to_their_shard(sharded):
+    app, factories, headers = sharded
+    app.config['SHARD_NEW_EVENTS'] = ['shard2']
+    client = app.test_client()
+    on_primary = factories.event(name='Primary')
+
+    response = client.post('/events/events', headers=headers, json={
+        'name': 'Sharded', 'date': '2040-07-01T09:00:00', 'location': 'Lake', 'duration': 3,
+    })
+
+    event_id = response.json['event']['id']
+    assert db.session.get(EventShard, event_id).shard == 'shard2'
+    assert (count('default', Event, id=event_id), count('shard2', Event, id=event_id)) == (0, 1)
+    assert client.get(f'/events/events/{event_id}', headers=headers).json['name'] == 'Sharded'
+    listed = client.get('/events/events?fields=id', headers=headers).json
+    assert {on_primary.id, event_id} <= {event['id'] for event in listed}
+
+
+def test_move_event_takes_its_rows_along(sharded):
+    app, factories, headers = sharded
+    enrolment = factories.event_participant()
+    meal = factories.meal(event=enrolment.event)
+    plan = factories.participant_meal(meal=meal, participant=enrolment.participant)
+
+    moved = move_event(enrolment.event_id, 'shard1')
+
+    assert moved['event_participants'] == 1
+    assert moved['participant_meals_on_event'] == 1
+    for model, criteria in [(Event, {'id': enrolment.event_id}), (EventParticipant, {'id': enrolment.id}),
+                            (MealsOnEvent, {'id': plan.meal_id}), (ParticipantMealsOnEvent, {'id': plan.id})]:
+        assert (count('default', model, **criteria), count('shard1', model, **criteria)) == (0, 1)
+    response = app.test_client().get(f'/events/events/{enrolment.event_id}/participants', headers=headers)
+    assert [row['id'] for row in response.json] == [enrolment.id]
+    assert move_event(enrolment.event_id, 'shard1') == {}
+
+
+def test_write_routed_before_a_move_fails(sharded):
+    app, factories, headers = sharded
+    event = factories.event()
+    move_event(event.id, 'shard1')
+
+    use_shard('default', [event.id])
+
+    with pytest.raises(EventMoved):
+        db.session.execute(select(Event.name).where(Event.id == event.id))
+    db.session.rollback()
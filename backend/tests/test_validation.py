@@ -0,0 +1,43 @@
+import io
+import json
+
+import pytest
+
+
+@pytest.fixture
+def small_bodies(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'MAX_JSON_BODY_BYTES', 100)
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 100)
+
+
+def event_body(size):
+    return json.dumps({
+        'name': 'x' * size, 'date': '2040-07-01T09:00:00', 'location': 'Lake', 'duration': 3,
+    }).encode()
+
+
+def post_chunked(client, headers, body):
+    # Servers decoding chunked bodies mark the input as terminated, which lets Werkzeug read it.
+    return client.post('/events/events', input_stream=io.BytesIO(body), environ_overrides={
+        'wsgi.input_terminated': True,
+    }, headers={**headers, 'Content-Type': 'application/json', 'Transfer-Encoding': 'chunked'})
+
+
+def test_rejects_body_over_limit(client, auth_headers, small_bodies):
+    response = client.post('/events/events', headers=auth_headers, data=event_body(200),
+                           content_type='application/json')
+
+    assert response.status_code == 413
+
+
+def test_rejects_chunked_body_over_limit(client, auth_headers, small_bodies):
+    response = post_chunked(client, auth_headers, event_body(200))
+
+    assert response.status_code == 413
+    assert response.is_json
+
+
+def test_accepts_chunked_body_under_limit(client, auth_headers, small_bodies):
+    response = post_chunked(client, auth_headers, event_body(1))
+
+    assert response.status_code == 201
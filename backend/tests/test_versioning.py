@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm.exc import StaleDataError
+
+from backend.events.models import Participant
+
+PARTICIPANT = {'first_name': 'Ada', 'last_name': 'Lovelace', 'email': 'ada@example.com', 'is_vegetarian': False}
+
+
+def patch_participant(client, auth_headers, participant_id, if_match=None):
+    headers = {**auth_headers, 'If-Match': if_match} if if_match else auth_headers
+    return client.patch(f'/events/participants/{participant_id}', headers=headers, json=PARTICIPANT)
+
+
+def test_patch_bumps_version(client, auth_headers, factories):
+    participant = factories.participant()
+
+    first = patch_participant(client, auth_headers, participant.id, '"1"')
+    second = patch_participant(client, auth_headers, participant.id, first.headers['ETag'])
+
+    assert first.headers['ETag'] == '"2"'
+    assert second.status_code == 200
+    assert second.json['participant']['version'] == 3
+
+
+@pytest.mark.parametrize('if_match', ['*', '"9", "1"'])
+def test_patch_with_matching_if_match(client, auth_headers, factories, if_match):
+    participant = factories.participant()
+
+    assert patch_participant(client, auth_headers, participant.id, if_match).status_code == 200
+
+
+def test_patch_with_foreign_etag(client, auth_headers, factories):
+    participant = factories.participant()
+
+    response = patch_participant(client, auth_headers, participant.id, '"abc"')
+
+    assert response.status_code == 412
+    assert 'ETag' not in response.headers
+
+
+def test_patch_missing_row(client, auth_headers):
+    assert patch_participant(client, auth_headers, 0, '"1"').status_code == 404
+
+
+def test_delete_with_stale_version(client, auth_headers, factories, session):
+    participant = factories.participant()
+
+    response = client.delete(f'/events/participants/{participant.id}', headers={**auth_headers, 'If-Match': '"2"'})
+
+    assert response.status_code == 412
+    assert response.headers['ETag'] == '"1"'
+    assert session.get(Participant, participant.id) is not None
+
+
+def test_if_match_required(app, client, auth_headers, factories, monkeypatch):
+    monkeypatch.setitem(app.config, 'REQUIRE_IF_MATCH', True)
+    participant = factories.participant()
+
+    assert patch_participant(client, auth_headers, participant.id).status_code == 428
+    assert patch_participant(client, auth_headers, participant.id, '"1"').status_code == 200
+
+
+def test_orm_flush_of_stale_row_fails(factories, session):
+    participant = factories.participant()
+    session.execute(
+        update(Participant).where(Participant.id == participant.id).values(version=Participant.version + 1),
+        execution_options={'synchronize_session': False},
+    )
+
+    participant.first_name = 'Stale'
+    with pytest.raises(StaleDataError):
+        session.flush()
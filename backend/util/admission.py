@@ -0,0 +1,188 @@
+"""
+Admission control for the Flask app: rate limiting, per-route-class concurrency caps and load shedding.
+
+Every request is put into a route class - ``auth`` (password hashing), ``write`` (any mutating or bulk
+request) or ``read`` - and then, before the view runs:
+
+1. its token bucket, keyed by JWT identity (or client address), route class and endpoint, must have a
+   token, or the request gets ``429``. Buckets live in Redis when ``RATELIMIT_STORAGE_URL`` is set, so all
+   workers share them, and in process memory otherwise or while Redis is unreachable;
+2. it must get one of the class's concurrency slots within the class's queue budget, or it gets ``503``.
+   Requests that already waited longer than the budget in front of the app (``X-Request-Start``) are
+   shed straight away.
+
+Each class has its own slots, so a flood of logins or bulk writes cannot starve cheap reads.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+logger = logging.getLogger(__name__)
+
+AUTH_ENDPOINTS = ('auth.login', 'auth.register')
+READ_METHODS = ('GET', 'HEAD')
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class LocalTokenBuckets:
+    """
+    In-process token buckets, bounded to ``max_keys`` least recently used keys.
+    """
+
+    def __init__(self, max_keys=100000):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class RedisTokenBuckets:
+    """
+    Token buckets shared by all workers, updated atomically by a Lua script.
+    """
+
+    def __init__(self, url, key_prefix='ratelimit:'):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.05)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._key_prefix = key_prefix
+        self.error = redis.RedisError
+
+    def take(self, key, rate, burst):
+        allowed, tokens = self._script(keys=[self._key_prefix + key], args=[rate, burst])
+        return bool(allowed), float(tokens)
+
+
+class AdmissionControl:
+    def __init__(self, app=None):
+        self._local = LocalTokenBuckets()
+        self._shared = None
+        self._shared_down_until = 0
+        self._slots = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['ADMISSION_ENABLED']:
+            return
+
+        self._slots = {
+            route_class: threading.BoundedSemaphore(limit)
+            for route_class, limit in app.config['ADMISSION_CONCURRENCY'].items()
+        }
+        self._config = app.config
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    @staticmethod
+    def route_class():
+        if request.endpoint in AUTH_ENDPOINTS:
+            return 'auth'
+        if request.method in READ_METHODS:
+            return 'read'
+        return 'write'
+
+    @staticmethod
+    def _client_key():
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            identity = None
+        return f'user:{identity}' if identity is not None else f'addr:{request.remote_addr}'
+
+    def _shared_buckets(self):
+        # Connected on first use, so processes that never serve a request do not import redis.
+        storage_url = self._config['RATELIMIT_STORAGE_URL']
+        if self._shared is None and storage_url:
+            self._shared = RedisTokenBuckets(storage_url)
+        return self._shared
+
+    def _take_token(self, key, rate, burst):
+        if self._shared_buckets() is not None and time.monotonic() >= self._shared_down_until:
+            try:
+                return self._shared.take(key, rate, burst)
+            except self._shared.error:
+                logger.warning('Rate limit store unavailable, using local buckets')
+                self._shared_down_until = time.monotonic() + self._config['RATELIMIT_STORAGE_RETRY_SECONDS']
+        return self._local.take(key, rate, burst)
+
+    @staticmethod
+    def _queued_seconds():
+        # Set by the proxy as "t=<epoch milliseconds>" when the request was accepted.
+        header = request.headers.get('X-Request-Start', '')
+        try:
+            return max(0.0, time.time() - float(header.removeprefix('t=')) / 1000)
+        except ValueError:
+            return 0.0
+
+    @staticmethod
+    def _reject(status, message, retry_after):
+        response = jsonify({"message": message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def _admit(self):
+        if request.method == 'OPTIONS' or request.endpoint in (None, 'static'):
+            return None
+
+        route_class = self.route_class()
+        client_key = self._client_key()
+        rate, burst = self._config['RATELIMIT_RATES'][route_class]
+        allowed, tokens = self._take_token(f'{client_key}:{route_class}:{request.endpoint}', rate, burst)
+        if not allowed:
+            logger.info('Rate limited %s on %s', client_key, request.endpoint)
+            return self._reject(429, 'Too many requests', (1 - tokens) / rate)
+
+        budget = self._config['ADMISSION_QUEUE_BUDGET'][route_class]
+        remaining = budget - self._queued_seconds()
+        slots = self._slots[route_class]
+        if remaining <= 0 or not slots.acquire(timeout=remaining):
+            logger.warning('Shedding %s request to %s', route_class, request.endpoint)
+            return self._reject(503, 'Server is busy, try again later', budget)
+
+        g._admission_slot = slots
+        return None
+
+    @staticmethod
+    def _release(exc):
+        slots = g.pop('_admission_slot', None)
+        if slots is not None:
+            slots.release()
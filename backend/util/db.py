@@ -1,7 +1,9 @@
 import contextlib
+import functools
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, Sequence
+from sqlalchemy import Column, Integer, DateTime, Sequence, event
 from sqlalchemy.ext.declarative import declared_attr
+from sqlalchemy.orm import Session
 
 from backend.extensions import db
 
@@ -30,6 +32,112 @@ def commit_section():
         raise e
 
 
+@contextlib.contextmanager
+def pipeline():
+    """
+    Sends the statements executed in the block without waiting for each result, in one round trip,
+    when the engine uses psycopg 3; a no-op with psycopg2.
+
+    Results are only available once the block exits: rows, ``rowcount`` and ORM flushes that check
+    updated row counts must not be used inside it, and ORM bulk ``UPDATE``/``DELETE`` statements need
+    ``synchronize_session=False``. Errors of any statement are raised on exit.
+
+    The connection pipelined is the one to the shard the session is routed to (the primary database
+    without sharding), so the statements in the block must all be on event data.
+    """
+    session = db.session()
+    driver_connection = session.connection(
+        bind_arguments={'bind': session.shard_engine()}
+    ).connection.driver_connection
+    if not hasattr(driver_connection, 'pipeline'):
+        yield None
+        return
+    with driver_connection.pipeline():
+        yield None
+
+
+READ_ONLY = 'read_only'
+READ_ONLY_DEFERRABLE = 'read_only_deferrable'
+
+_TRANSACTION_MODES = {
+    READ_ONLY: "SET TRANSACTION READ ONLY",
+    # DEFERRABLE only applies to SERIALIZABLE transactions: it waits for a snapshot that cannot cause
+    # serialization failures, then runs without any predicate locking overhead.
+    READ_ONLY_DEFERRABLE: "SET TRANSACTION ISOLATION LEVEL SERIALIZABLE, READ ONLY, DEFERRABLE",
+}
+
+
+@event.listens_for(Session, 'after_begin')
+def _set_transaction_mode(session, transaction, connection):
+    mode = session.info.get('transaction_mode')
+    if mode is None:
+        return
+    if connection.in_nested_transaction():
+        # Joined to an outer transaction (the test harness), the session runs in a SAVEPOINT: the isolation
+        # level is already fixed, but read-only still applies and ends with the SAVEPOINT.
+        connection.exec_driver_sql(_TRANSACTION_MODES[READ_ONLY])
+    else:
+        connection.exec_driver_sql(_TRANSACTION_MODES[mode])
+
+
+def pin_transaction():
+    """
+    Marks the session's current transaction as owned by the caller, so ``read_only`` views and
+    ``fetch_rows`` run inside it instead of ending it (used by batch requests reading one snapshot).
+    """
+    db.session.info['pinned_transaction'] = True
+
+
+def _release():
+    if not db.session.info.get('pinned_transaction'):
+        db.session.close()
+
+
+def read_only(deferrable=False):
+    """
+    Runs a GET view in read-only mode.
+
+    Transactions the view opens are ``READ ONLY`` - and ``SERIALIZABLE DEFERRABLE`` with
+    ``deferrable=True``, meant for longer reporting queries that may wait briefly for a safe snapshot -
+    autoflush is off, and the session is closed as soon as the view returns, which hands the connection
+    back to the pool and drops the identity map before the response is sent.
+
+    Args:
+        deferrable (bool): Use ``SERIALIZABLE READ ONLY DEFERRABLE`` transactions.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            session = db.session()
+            if session.info.get('pinned_transaction'):
+                with session.no_autoflush:
+                    return fn(*args, **kwargs)
+
+            # A transaction opened before the view (e.g. by authentication) would keep its mode.
+            session.close()
+            session.info['transaction_mode'] = READ_ONLY_DEFERRABLE if deferrable else READ_ONLY
+            try:
+                with session.no_autoflush:
+                    return fn(*args, **kwargs)
+            finally:
+                session.info.pop('transaction_mode', None)
+                session.close()
+        return wrapper
+    return decorator
+
+
+def fetch_rows(stmt):
+    """
+    Executes a select of columns and returns its rows as plain, untracked tuples, ending the transaction
+    right away so the connection goes back to the pool before the rows are serialized.
+
+    Only meant for ``read_only`` views: ORM instances loaded earlier in the request are detached.
+    """
+    rows = db.session.execute(stmt).all()
+    _release()
+    return rows
+
+
 def _current_user_id():
     # TODO
     # from auth.db_utils import get_current_user_id
@@ -46,7 +154,7 @@ class CreateModifyMixin:
 
     @declared_attr
     def creation_date(self):
-        return Column(DateTime, nullable=False, default=datetime.now())
+        return Column(DateTime, nullable=False, default=datetime.now)
 
     @declared_attr
     def updated_by(self):
@@ -54,4 +162,4 @@ class CreateModifyMixin:
 
     @declared_attr
     def update_date(self):
-        return Column(DateTime, onupdate=datetime.now())
+        return Column(DateTime, onupdate=datetime.now)
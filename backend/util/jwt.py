@@ -1,9 +1,56 @@
+from functools import wraps
+
+from flask import current_app, g
+from flask_jwt_extended import jwt_required as verified_jwt_required
+
 from backend.extensions import jwt
 
 BLACKLIST = set()
 
+# Where flask_jwt_extended keeps the token of a request once it verified it.
+_JWT_CONTEXT = ('_jwt_extended_jwt', '_jwt_extended_jwt_header', '_jwt_extended_jwt_user', '_jwt_extended_jwt_location')
+
 
 @jwt.token_in_blocklist_loader
 def check_if_token_in_blacklist(jwt_header, jwt_payload):
     jti = jwt_payload['jti']
     return jti in BLACKLIST
+
+
+def get_verified_jwt():
+    """
+    Returns the access token verified for the current request, to hand to ``use_verified_jwt``.
+    """
+    return {name: g.get(name) for name in _JWT_CONTEXT}
+
+
+def use_verified_jwt(verified):
+    """
+    Makes the current request context use a token already verified by an enclosing request (the batch
+    view for its sub-requests): ``jwt_required`` views accept it without decoding it again, and
+    ``get_jwt_identity`` returns its identity.
+    """
+    for name, value in verified.items():
+        setattr(g, name, value)
+    g.jwt_verified = True
+
+
+def jwt_required(optional=False, fresh=False, refresh=False, **kwargs):
+    """
+    ``flask_jwt_extended.jwt_required`` that trusts a plain access token passed in with ``use_verified_jwt``.
+    Views of batchable blueprints use it.
+    """
+    def wrapper(fn):
+        verifying = verified_jwt_required(optional, fresh, refresh, **kwargs)(fn)
+        if fresh or refresh:
+            return verifying
+
+        @wraps(fn)
+        def decorator(*args, **kw):
+            if g.get('jwt_verified'):
+                return current_app.ensure_sync(fn)(*args, **kw)
+            return verifying(*args, **kw)
+
+        return decorator
+
+    return wrapper
@@ -0,0 +1,117 @@
+"""
+Fast path for loading request payloads with Marshmallow schemas.
+
+A schema is compiled once into a plain function that checks exact JSON types field by field. Valid
+payloads - the vast majority - are returned straight from it; anything the fast path does not accept
+exactly (wrong types, coercible strings, unknown keys) makes it bail out, and the caller falls back to
+``schema.load``, so results and error messages are always those of Marshmallow itself.
+"""
+from marshmallow import fields, missing, RAISE, ValidationError
+
+
+class Fallback(Exception):
+    """Raised by a compiled loader when the payload must go through ``schema.load``."""
+
+
+def _exact_type(json_type):
+    def check(value):
+        if type(value) is not json_type:
+            raise Fallback
+        return value
+    return check
+
+
+def _with_validators(check, field):
+    if not field.validators:
+        return check
+
+    def validate(value):
+        value = check(value)
+        try:
+            field._validate(value)
+        except ValidationError:
+            raise Fallback
+        return value
+    return validate
+
+
+def _deserializer(field, name):
+    def deserialize(value):
+        try:
+            return field.deserialize(value, name)
+        except ValidationError:
+            raise Fallback
+    return deserialize
+
+
+def _compile_field(field, name):
+    if field.allow_none:
+        return _deserializer(field, name)
+
+    if isinstance(field, fields.Boolean):
+        return _with_validators(_exact_type(bool), field)
+    if isinstance(field, fields.Integer):
+        return _with_validators(_exact_type(int), field)
+    if type(field) in (fields.String, fields.Email):
+        return _with_validators(_exact_type(str), field)
+
+    if isinstance(field, fields.Nested) and not field.many:
+        nested = compile_schema(field.schema)
+        if nested is not None:
+            return _with_validators(nested, field)
+
+    if isinstance(field, fields.List) and isinstance(field.inner, fields.Nested) and not field.inner.many:
+        item = compile_schema(field.inner.schema)
+        if item is not None:
+            def load_list(value):
+                if type(value) is not list:
+                    raise Fallback
+                return [item(entry) for entry in value]
+            return _with_validators(load_list, field)
+
+    # ``Field.deserialize`` runs the field validators itself.
+    return _deserializer(field, name)
+
+
+def compile_schema(schema):
+    """
+    Compiles a schema instance into a loader function, or returns None if it has hooks or options the
+    fast path cannot reproduce (``post_load``, ``validates_schema``, ``only``, non-raising ``unknown``...).
+    """
+    if any(schema._hooks.values()) or schema.unknown != RAISE or schema.only or schema.exclude or schema.partial:
+        return None
+
+    compiled = []
+    for name, field in schema.load_fields.items():
+        data_key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        compiled.append((data_key, attribute, field.required, field.load_default, _compile_field(field, name)))
+    known_keys = frozenset(data_key for data_key, *_ in compiled)
+
+    def load(data):
+        if type(data) is not dict or not known_keys.issuperset(data):
+            raise Fallback
+
+        result = {}
+        for data_key, attribute, required, load_default, check in compiled:
+            if data_key in data:
+                result[attribute] = check(data[data_key])
+            elif required:
+                raise Fallback
+            elif load_default is not missing:
+                result[attribute] = load_default() if callable(load_default) else load_default
+        return result
+
+    return load
+
+
+def list_keys(schema):
+    """
+    Returns the input keys of top-level list fields, so oversized lists can be rejected before any item
+    is validated.
+    """
+    return [
+        field.data_key if field.data_key is not None else name
+        for name, field in schema.load_fields.items()
+        if isinstance(field, fields.List)
+    ]
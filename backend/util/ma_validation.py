@@ -1,23 +1,68 @@
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from marshmallow import ValidationError
 
+from .ma_compiled import Fallback, compile_schema, list_keys
 
-def validate_request(schema):
+
+def _load(schema, compiled, data):
+    if compiled is not None:
+        try:
+            return compiled(data)
+        except Fallback:
+            pass
+    return schema.load(data)
+
+
+def _too_large(max_body):
+    return jsonify({"errors": {"_schema": [f"Request body larger than {max_body} bytes."]}}), 413
+
+
+def validate_request(schema, max_items=None):
     """
     Decorator to validate the incoming request data against a Marshmallow schema.
 
+    The schema is compiled once into a fast loader (see ``ma_compiled``); payloads it cannot handle
+    exactly go through ``schema.load``. Bodies over ``MAX_JSON_BODY_BYTES`` (by their Content-Length, or
+    once read when chunked) and top-level lists with more than ``max_items`` (default
+    ``MAX_JSON_LIST_ITEMS``) entries are rejected before validation.
+
     Args:
         schema (Schema): A Marshmallow schema to validate the incoming data.
+        max_items (int): Maximum length of top-level list fields.
 
     Returns:
         A wrapped function that validates the request before proceeding.
     """
+    compiled = compile_schema(schema)
+    limited_keys = list_keys(schema)
+
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
+            max_body = current_app.config['MAX_JSON_BODY_BYTES']
+            if request.content_length is not None and request.content_length > max_body:
+                return _too_large(max_body)
+
+            if request.content_length is None:
+                # A chunked body is read up to MAX_CONTENT_LENGTH and cut off there, so one that fills it
+                # is taken for larger.
+                if len(request.get_data(cache=True)) >= max_body:
+                    return _too_large(max_body)
+
+            data = request.get_json()
+            if limited_keys and isinstance(data, dict):
+                limit = max_items or current_app.config['MAX_JSON_LIST_ITEMS']
+                errors = {
+                    key: [f"Longer than maximum length {limit}."]
+                    for key in limited_keys
+                    if isinstance(data.get(key), list) and len(data[key]) > limit
+                }
+                if errors:
+                    return jsonify({"errors": errors}), 400
+
             try:
-                validated_data = schema.load(request.get_json())
+                validated_data = _load(schema, compiled, data)
             except ValidationError as err:
                 return jsonify({"errors": err.messages}), 400
 
@@ -25,3 +70,27 @@ def validate_request(schema):
 
         return wrapper
     return decorator
+
+
+def validate_query(schema):
+    """
+    Decorator to validate the request query string against a Marshmallow schema.
+
+    Args:
+        schema (Schema): A Marshmallow schema to validate the query parameters.
+
+    Returns:
+        A wrapped function that validates the query string before proceeding.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                validated_data = schema.load(request.args)
+            except ValidationError as err:
+                return jsonify({"errors": err.messages}), 400
+
+            return fn(*args, query=validated_data, **kwargs)
+
+        return wrapper
+    return decorator
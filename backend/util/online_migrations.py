@@ -0,0 +1,165 @@
+"""
+Helpers for zero-downtime Alembic migrations on large tables.
+
+Schema changes follow the expand/contract workflow:
+
+1. expand - add nullable columns, new tables and indexes (``create_index_concurrently``) that the
+   currently deployed code simply ignores;
+2. migrate - deploy code that writes both shapes and fill old rows with ``batched_backfill``;
+3. contract - once nothing reads the old shape, tighten constraints (``set_not_null_online``,
+   ``add_foreign_key_online``) and drop what is no longer used, in a separate revision.
+
+Every helper that needs a lock runs its statements outside the migration transaction, under a short
+``lock_timeout`` and with retries, so a busy table makes the migration wait instead of queueing all
+application traffic behind an ``ACCESS EXCLUSIVE`` lock.
+"""
+import contextlib
+import logging
+import time
+
+from alembic import op
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def _is_lock_timeout(err):
+    # psycopg2 errors carry ``pgcode``, psycopg 3 errors ``sqlstate``.
+    code = getattr(err.orig, 'pgcode', None) or getattr(err.orig, 'sqlstate', None)
+    return code == LOCK_NOT_AVAILABLE
+
+
+@contextlib.contextmanager
+def autocommit(lock_timeout='2s'):
+    """
+    Leaves the migration transaction; every statement inside commits on its own.
+
+    Args:
+        lock_timeout (str): PostgreSQL ``lock_timeout`` applied while the block runs; ``'0'`` waits
+            indefinitely, which is fine for locks that do not conflict with reads and writes.
+    """
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        previous = bind.exec_driver_sql("SHOW lock_timeout").scalar()
+        bind.exec_driver_sql(f"SET lock_timeout = '{lock_timeout}'")
+        try:
+            yield bind
+        finally:
+            bind.exec_driver_sql(f"SET lock_timeout = '{previous}'")
+
+
+def run_with_lock_retry(fn, *, lock_timeout='2s', attempts=10, backoff=0.5):
+    """
+    Runs ``fn`` in autocommit mode, retrying when it gives up waiting for a lock.
+
+    ``fn`` should issue one short DDL statement: each retry repeats all of it.
+
+    Args:
+        fn (callable): Issues the statement, e.g. ``lambda: op.add_column(...)``.
+        lock_timeout (str): How long a single attempt may wait for its lock.
+        attempts (int): Maximum number of attempts.
+        backoff (float): Seconds to sleep after the first failure, growing linearly.
+    """
+    with autocommit(lock_timeout):
+        for attempt in range(1, attempts + 1):
+            try:
+                return fn()
+            except OperationalError as err:
+                if not _is_lock_timeout(err) or attempt == attempts:
+                    raise
+                logger.warning('Lock not available (attempt %d/%d), retrying', attempt, attempts)
+                time.sleep(backoff * attempt)
+
+
+def create_index_concurrently(index_name, table_name, columns, **kw):
+    """
+    ``CREATE INDEX CONCURRENTLY IF NOT EXISTS``, which only blocks schema changes, not writes.
+
+    A failed concurrent build leaves an invalid index behind; ``IF NOT EXISTS`` alone does not repair
+    it, so drop it with ``drop_index_concurrently`` before re-running the revision.
+    """
+    with autocommit(lock_timeout='0'):
+        op.create_index(index_name, table_name, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def drop_index_concurrently(index_name, table_name):
+    with autocommit(lock_timeout='0'):
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def add_column_online(table_name, column, **retry_kw):
+    """
+    Adds a column under a short lock timeout.
+
+    Expand step: the column must be nullable or have a constant server default, so PostgreSQL does
+    not rewrite the table.
+    """
+    run_with_lock_retry(lambda: op.add_column(table_name, column), **retry_kw)
+
+
+def batched_backfill(table_name, set_clause, where_clause='TRUE', *, batch_size=5000, pause=0.1, key='id'):
+    """
+    Updates a table in key ranges of ``batch_size`` rows, committing and sleeping between batches.
+
+    Args:
+        table_name (str): The table to update.
+        set_clause (str): SQL after ``SET``, e.g. ``"attendance_mask = 0"``.
+        where_clause (str): Extra SQL filter, e.g. ``"attendance_mask IS NULL"``; keeps reruns cheap.
+        batch_size (int): Width of one key range.
+        pause (float): Seconds to sleep between batches, to let replicas and vacuum keep up.
+        key (str): Integer key column used to split the table.
+
+    Returns:
+        int: Number of updated rows.
+    """
+    with autocommit() as bind:
+        low, high = bind.execute(text(f'SELECT min({key}), max({key}) FROM {table_name}')).one()
+        if low is None:
+            return 0
+
+        update = text(
+            f'UPDATE {table_name} SET {set_clause} '
+            f'WHERE {key} >= :start AND {key} < :stop AND ({where_clause})'
+        )
+        updated = 0
+        for start in range(low, high + 1, batch_size):
+            updated += bind.execute(update, {'start': start, 'stop': start + batch_size}).rowcount
+            logger.info('Backfilled %s up to %s=%d (%d rows)', table_name, key, start + batch_size, updated)
+            time.sleep(pause)
+
+    return updated
+
+
+def set_not_null_online(table_name, column_name, **retry_kw):
+    """
+    Contract step: ``SET NOT NULL`` without a full-table scan under ``ACCESS EXCLUSIVE``.
+
+    A ``NOT VALID`` check constraint is validated under a weaker lock first; PostgreSQL 12+ then
+    uses it to skip the scan when setting ``NOT NULL``.
+    """
+    constraint = f'{table_name}_{column_name}_not_null'
+    run_with_lock_retry(lambda: op.execute(
+        f'ALTER TABLE {table_name} ADD CONSTRAINT {constraint} CHECK ({column_name} IS NOT NULL) NOT VALID'
+    ), **retry_kw)
+    with autocommit(lock_timeout='0'):
+        op.execute(f'ALTER TABLE {table_name} VALIDATE CONSTRAINT {constraint}')
+    run_with_lock_retry(lambda: op.alter_column(table_name, column_name, nullable=False), **retry_kw)
+    run_with_lock_retry(lambda: op.drop_constraint(constraint, table_name, type_='check'), **retry_kw)
+
+
+def add_foreign_key_online(constraint_name, source_table, referent_table, local_cols, remote_cols, **retry_kw):
+    """
+    Adds a foreign key as ``NOT VALID`` and validates it separately, so existing rows are checked
+    without blocking writes.
+    """
+    columns = ', '.join(local_cols)
+    remote = ', '.join(remote_cols)
+    run_with_lock_retry(lambda: op.execute(
+        f'ALTER TABLE {source_table} ADD CONSTRAINT {constraint_name} '
+        f'FOREIGN KEY ({columns}) REFERENCES {referent_table} ({remote}) NOT VALID'
+    ), **retry_kw)
+    with autocommit(lock_timeout='0'):
+        op.execute(f'ALTER TABLE {source_table} VALIDATE CONSTRAINT {constraint_name}')
@@ -0,0 +1,83 @@
+from marshmallow import Schema, fields, post_load, validates_schema, ValidationError
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsetSchema(Schema):
+    """
+    Parses ``fields=`` and ``include=`` query parameters.
+
+    Subclasses set ``serializer`` (the serialization schema of the resource) and ``relations`` (names of
+    nested serializer fields that may be included, mapped to their serialization schemas).
+    ``default_include`` keeps relations in the response when ``include`` is not given at all.
+    Once ``fields`` is given, a response only has the fields it names and ``id``; a relation without
+    named fields is included whole.
+    """
+    serializer = None
+    relations = {}
+    default_include = ()
+
+    field_names = fields.String(data_key='fields')
+    include = fields.String()
+
+    @validates_schema
+    def validate_names(self, data, **kwargs):
+        include = _split(data['include']) if 'include' in data else list(self.default_include)
+        unknown_relations = [name for name in include if name not in self.relations]
+        if unknown_relations:
+            raise ValidationError(f'Unknown relations: {", ".join(unknown_relations)}', 'include')
+
+        unknown_fields = []
+        for name in _split(data.get('field_names', '')):
+            relation, _, nested = name.partition('.')
+            if not nested:
+                if relation not in self.serializer._declared_fields:
+                    unknown_fields.append(name)
+            elif relation not in include or nested not in self.relations[relation]._declared_fields:
+                unknown_fields.append(name)
+        if unknown_fields:
+            raise ValidationError(f'Unknown fields: {", ".join(unknown_fields)}', 'fields')
+
+    @post_load
+    def to_fieldset(self, data, **kwargs):
+        include = _split(data['include']) if 'include' in data else list(self.default_include)
+        requested = _split(data.get('field_names', ''))
+
+        if requested:
+            # Only what was asked for, with the id to tell the rows apart.
+            top_level = [name for name in requested if '.' not in name]
+            if 'id' in self.serializer._declared_fields and 'id' not in top_level:
+                top_level.insert(0, 'id')
+        else:
+            top_level = [name for name in self.serializer._declared_fields if name not in self.relations]
+        nested = {
+            relation: [name.partition('.')[2] for name in requested if name.startswith(f'{relation}.')]
+            for relation in include
+        }
+
+        only = [name for name in top_level if name not in self.relations]
+        for relation, names in nested.items():
+            if names:
+                only.extend(f'{relation}.{name}' for name in names)
+            else:
+                only.append(relation)
+
+        return {'only': only, 'include': include, 'nested': nested}
+
+
+def load_only_columns(model, field_names, column_map=None):
+    """
+    Maps serializer field names to mapped columns of ``model`` for ``load_only``.
+
+    Fields computed from another column are resolved through ``column_map``; names that are neither
+    columns nor mapped (relations, properties) are skipped.
+    """
+    column_map = column_map or {}
+    columns = []
+    for name in field_names:
+        name = column_map.get(name, name)
+        if name in model.__table__.columns:
+            columns.append(getattr(model, name))
+    return columns
@@ -0,0 +1,118 @@
+"""
+Optimistic concurrency control for versioned models.
+
+Versioned models have an integer ``version`` column registered as the mapper's ``version_id_col``,
+so ORM flushes and deletes only touch the row version they loaded. Views expose the version as a strong
+``ETag`` and accept it back in ``If-Match``; ``update_versioned`` applies a PATCH as a single
+compare-and-swap ``UPDATE ... WHERE version = :expected RETURNING``, without reading the row first.
+"""
+from flask import abort, current_app, jsonify, request
+from sqlalchemy import select, update
+
+from backend.extensions import db
+
+
+class VersionConflict(Exception):
+    """The row changed since the client read it; ``current_version`` is None when it is unknown."""
+
+    def __init__(self, current_version=None):
+        super().__init__(current_version)
+        self.current_version = current_version
+
+
+class PreconditionRequired(Exception):
+    """A write came without ``If-Match`` while ``REQUIRE_IF_MATCH`` is on."""
+
+
+def etag(version):
+    return f'"{version}"'
+
+
+def with_etag(response, version):
+    """
+    Sets the ``ETag`` header on a ``(response, status)`` view result.
+    """
+    body, status = response
+    body.headers['ETag'] = etag(version)
+    return body, status
+
+
+def expected_versions():
+    """
+    Versions allowed by the request's ``If-Match`` header.
+
+    Returns:
+        list: The versions, or None when any version is fine (no header, or ``*``).
+    """
+    if not request.headers.get('If-Match'):
+        if current_app.config['REQUIRE_IF_MATCH']:
+            raise PreconditionRequired()
+        return None
+
+    if_match = request.if_match
+    if if_match.star_tag:
+        return None
+    versions = [int(tag) for tag in if_match.as_set() if tag.isdigit()]
+    if not versions:
+        # Nothing we ever issued, so it cannot match.
+        raise VersionConflict()
+    return versions
+
+
+def check_version(obj):
+    """
+    Checks a loaded row against ``If-Match`` before it is deleted.
+    """
+    versions = expected_versions()
+    if versions is not None and obj.version not in versions:
+        raise VersionConflict(obj.version)
+
+
+def update_versioned(model, criteria, values):
+    """
+    Updates one row of a versioned model with a single compare-and-swap statement.
+
+    Only when no row was updated is the row read, to tell a missing row (404) from a stale version.
+
+    Args:
+        model: The versioned model class.
+        criteria (list): Expressions identifying the row.
+        values (dict): Column values to set.
+
+    Returns:
+        The updated instance, loaded from ``RETURNING``.
+    """
+    versions = expected_versions()
+    stmt = (
+        update(model)
+        .where(*criteria)
+        .values(version=model.version + 1, **values)
+        .returning(model)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    if versions is not None:
+        stmt = stmt.where(model.version.in_(versions))
+
+    obj = db.session.execute(stmt).scalar_one_or_none()
+    if obj is None:
+        current_version = db.session.scalar(select(model.version).where(*criteria))
+        db.session.rollback()
+        if current_version is None:
+            abort(404)
+        raise VersionConflict(current_version)
+    return obj
+
+
+def handle_version_conflict(e):
+    response = jsonify({"message": "The resource was modified by someone else; reload it and try again"})
+    response.status_code = 412
+    current_version = getattr(e, 'current_version', None)
+    if current_version is not None:
+        response.headers['ETag'] = etag(current_version)
+    return response
+
+
+def handle_precondition_required(e):
+    response = jsonify({"message": "This request requires an If-Match header"})
+    response.status_code = 428
+    return response
@@ -0,0 +1,15 @@
+"""
+Entry point of the processes started from ``entrypoint.sh`` (``FLASK_APP``) and of ``python -m backend.wsgi``:
+configures logging for the process, then creates the app.
+"""
+import logging
+
+from .app import create_app
+from .config import Config
+
+logging.basicConfig(level=Config.LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s')
+
+app = create_app()
+
+if __name__ == '__main__':
+    app.run(debug=True)
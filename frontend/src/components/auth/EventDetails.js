@@ -5,8 +5,8 @@ import { Container, Typography, Table, TableBody, TableCell, TableContainer, Tab
 import EditIcon from '@mui/icons-material/Edit';
 import DeleteIcon from '@mui/icons-material/Delete';
 import RestaurantIcon from '@mui/icons-material/Restaurant';
-import { fetchEvent, fetchEventParticipants, fetchMealsForEvent, removeParticipantFromEvent,
-         addParticipantMealsToEvent, fetchParticipantMealsOnEvent, updateEventParticipant } from './api';
+import { fetchEventParticipants, removeParticipantFromEvent, addParticipantMealsToEvent,
+         updateEventParticipant, fetchBatch } from './api';
 import AddParticipantToEvent from './AddParticipantToEvent';
 import ModalWithForm from './ModalWithForm';
 import ConfirmationModal from './ConfirmationModal';
@@ -26,10 +26,11 @@ function EventDetails() {
   useEffect(() => {
     const getEventDetails = async () => {
       try {
-        const eventData = await fetchEvent(eventId);
+        const { event: eventData, participants: participantsData } = await fetchBatch([
+          { id: 'event', path: `/events/events/${eventId}` },
+          { id: 'participants', path: `/events/events/${eventId}/participants` },
+        ]);
         setEvent(eventData);
-
-        const participantsData = await fetchEventParticipants(eventId);
         setParticipants(participantsData);
       } catch (error) {
         console.error('Failed to fetch event details:', error);
@@ -86,10 +87,11 @@ function EventDetails() {
   const handleShowMeals = async (participant) => {
     setSelectedParticipant(participant);
     try {
-      const mealsData = await fetchMealsForEvent(eventId);
+      const { meals: mealsData, participantMeals: participantMealsData } = await fetchBatch([
+        { id: 'meals', path: `/events/events/${eventId}/meals` },
+        { id: 'participantMeals', path: `/events/events/${eventId}/participants/${participant.participant.id}/meals` },
+      ]);
       setMeals(mealsData);
-      
-      const participantMealsData = await fetchParticipantMealsOnEvent(eventId, participant.participant.id);
     
   
       const initialMeals = Array(participant.days_in_event).fill(null).map((_, index) => {
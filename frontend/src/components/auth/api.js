@@ -339,6 +339,21 @@ export const deleteParticipantMealOnEvent = async (eventId, participantMealId) =
   }
 };
 
+// Runs several GET requests in one round trip; resolves to an object keyed by request id.
+export const fetchBatch = async (requests) => {
+  try {
+    const response = await axiosInstance.post('batch', { requests });
+    return response.data.responses.reduce((result, { id, status, body }) => {
+      if (status >= 400) {
+        throw new Error(body?.message || `Batch request ${id} failed.`);
+      }
+      return { ...result, [id]: body };
+    }, {});
+  } catch (error) {
+    throw new Error(error.response?.data.message || error.message || 'Failed to run batch request.');
+  }
+};
+
 axiosInstance.interceptors.request.use(
   async (config) => {
     let accessToken = localStorage.getItem('access_token');
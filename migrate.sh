@@ -1,4 +1,4 @@
 #!/bin/bash
 
 docker compose exec web flask db migrate -m "$1"
-docker compose exec web flask db upgrade
+docker compose run --rm migrate